@@ -0,0 +1 @@
+# Benchmarks del compilador (python -m benchmarks.<modulo>)
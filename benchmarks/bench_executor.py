@@ -0,0 +1,108 @@
+import argparse
+import sys
+import time
+
+from compiler.executor import VM, assemble
+from compiler.intermediate import generate
+from compiler.lexer import Lexer
+from compiler.native import compile_program as compile_native, run_native
+from compiler.parser import Parser
+
+
+# =========================
+# MÁQUINA VIRTUAL
+# Instrucciones de bytecode por segundo e iteraciones de while por
+# segundo sobre un ciclo con aritmética entera y flotante, comparadas
+# con el backend nativo (code object de CPython).
+#
+# Objetivo: TARGET_ITERATIONS iteraciones del ciclo por segundo (unas
+# 10 instrucciones de bytecode cada una). El resultado dice si cada
+# backend lo alcanza y la salida es 1 si la VM no llega.
+# =========================
+
+TARGET_ITERATIONS = 1_000_000
+
+LOOP_PROGRAM = """
+int i = 0;
+int s = 0;
+float f = 0.0;
+while (i < {iterations}) {{
+    s = s + i * 3 - (i / 2);
+    if (s > 1000000) {{ s = s - 1000000; }}
+    f = f + 0.5;
+    i = i + 1;
+}}
+"""
+
+
+def compile_program(code):
+    tree = Parser(Lexer(code).tokenize()).parse()
+    return assemble(generate(tree))
+
+
+def measure(iterations, repeat):
+
+    bytecode = compile_program(LOOP_PROGRAM.format(iterations=iterations))
+    vm = VM(bytecode)
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        vm.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, vm.steps, len(bytecode)
+
+
+def measure_native(iterations, repeat):
+
+    code = LOOP_PROGRAM.format(iterations=iterations)
+    tree = Parser(Lexer(code).tokenize()).parse()
+    code_object, variables = compile_native(tree)
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_native(code_object, variables)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmark del ejecutor")
+    parser.add_argument("--iterations", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--target", type=float, default=TARGET_ITERATIONS / 1e6,
+                        help="objetivo en millones de iteraciones por segundo")
+    args = parser.parse_args()
+
+    elapsed, steps, size = measure(args.iterations, args.repeat)
+    vm_rate = args.iterations / elapsed / 1e6
+
+    print(f"bytecode:      {size} instrucciones")
+    print(f"ejecutadas:    {steps} en {elapsed:.3f} s")
+    print(f"velocidad:     {steps / elapsed / 1e6:.2f} M instrucciones/s")
+    print(f"iteraciones:   {vm_rate:.2f} M/s")
+
+    native = measure_native(args.iterations, args.repeat)
+    native_rate = args.iterations / native / 1e6
+    print(f"nativo:        {native:.3f} s, "
+          f"{native_rate:.2f} M iteraciones/s "
+          f"({elapsed / native:.1f}x la VM)")
+
+    def verdict(rate):
+        return "cumple" if rate >= args.target else "no cumple"
+
+    print(f"objetivo:      {args.target:.2f} M iteraciones/s: "
+          f"VM {verdict(vm_rate)} ({vm_rate:.2f}), "
+          f"nativo {verdict(native_rate)} ({native_rate:.2f})")
+
+    return 0 if vm_rate >= args.target else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
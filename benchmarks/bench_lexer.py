@@ -0,0 +1,114 @@
+import argparse
+import re
+import time
+import tracemalloc
+
+from benchmarks.generator import generate_source
+from compiler.lexer import Lexer
+from compiler.tokens import TOKEN_TYPES
+
+
+# =========================
+# LEXER ANTERIOR (referencia)
+# Un re.compile + match por cada tipo de token en cada posición.
+# =========================
+
+class LegacyLexer:
+
+    def __init__(self, code):
+        self.code = code
+        self.tokens = []
+
+    def tokenize(self):
+
+        position = 0
+
+        while position < len(self.code):
+
+            match = None
+
+            if self.code[position].isspace():
+                position += 1
+                continue
+
+            for token_type, pattern in TOKEN_TYPES.items():
+
+                regex = re.compile(pattern)
+                match = regex.match(self.code, position)
+
+                if match:
+                    self.tokens.append((token_type, match.group(0)))
+                    position = match.end()
+                    break
+
+            if not match:
+                raise SyntaxError(
+                    f"Token desconocido: {self.code[position]}"
+                )
+
+        return self.tokens
+
+
+def measure(lexer_class, code, repeat):
+
+    best = None
+    count = 0
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(lexer_class(code).tokenize())
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return count, best
+
+
+# memoria por token: TokenBuffer frente a la lista de tuplas anterior
+def measure_memory(code):
+
+    tracemalloc.start()
+    tokens = Lexer(code).tokenize()
+    buffer_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    as_tuples = [(t.type, t.lexeme) for t in tokens]
+    tuple_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return len(as_tuples), buffer_bytes, tuple_bytes
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmark del lexer")
+    parser.add_argument("--size-mb", type=float, default=4.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    code = generate_source(int(args.size_mb * 1024 * 1024))
+    print(f"Entrada: {len(code) / (1024 * 1024):.2f} MB")
+
+    count, elapsed = measure(Lexer, code, args.repeat)
+    new_rate = count / elapsed
+    print(f"Lexer      : {count} tokens en {elapsed:.3f} s "
+          f"({new_rate:,.0f} tokens/s)")
+
+    count, buffer_bytes, tuple_bytes = measure_memory(code)
+    print(f"Memoria    : TokenBuffer {buffer_bytes / count:.1f} B/token, "
+          f"tuplas {tuple_bytes / count:.1f} B/token "
+          f"({tuple_bytes / buffer_bytes:.1f}x)")
+
+    if not args.skip_legacy:
+        count, elapsed = measure(LegacyLexer, code, 1)
+        old_rate = count / elapsed
+        print(f"LegacyLexer: {count} tokens en {elapsed:.3f} s "
+              f"({old_rate:,.0f} tokens/s)")
+        print(f"Mejora     : {new_rate / old_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import time
+
+from benchmarks.generator import generate_program
+from compiler.executor import VM, assemble
+from compiler.intermediate import generate
+from compiler.lexer import Lexer
+from compiler.optimizer import LEVELS, format_stats, optimize
+from compiler.parser import Parser
+
+
+# =========================
+# OPTIMIZADOR
+# Tiempo del ejecutor con cada nivel sobre un ciclo con constantes,
+# cálculos repetidos y expresiones invariantes, y costo de cada pasada
+# sobre un programa grande.
+# =========================
+
+LOOP_PROGRAM = """
+int n = 40;
+int k = 3;
+int i = 0;
+int s = 0;
+float f = 0.0;
+while (i < {iterations}) {{
+    s = s + (n * k) + (n * k) / 2 + 2 * 8;
+    if (s > 1000000) {{ s = s - n * k * 1000; }}
+    f = f + k * 0.5;
+    i = i + 1;
+}}
+"""
+
+
+def measure_execution(iterations, repeat):
+
+    code = LOOP_PROGRAM.format(iterations=iterations)
+    ir = generate(Parser(Lexer(code).tokenize()).parse())
+    rows = []
+
+    for level in sorted(LEVELS):
+        optimized, _ = optimize(ir, level)
+        vm = VM(assemble(optimized))
+
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            vm.run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        rows.append((level, len(optimized), vm.steps, best))
+
+    return rows
+
+
+def measure_passes(statements):
+    code = generate_program(statements)
+    ir = generate(Parser(Lexer(code).tokenize()).parse())
+    return len(ir), optimize(ir, max(LEVELS))[1]
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmark del optimizador")
+    parser.add_argument("--iterations", type=int, default=300_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--statements", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = measure_execution(args.iterations, args.repeat)
+    base = rows[0][3]
+
+    for level, size, steps, elapsed in rows:
+        print(f"-O{level}: {size:>3} instrucciones, {steps:>10} ejecutadas, "
+              f"{elapsed:.3f} s ({base / elapsed:.2f}x)")
+
+    size, stats = measure_passes(args.statements)
+    print(f"\npasadas -O{max(LEVELS)} sobre {size} instrucciones:")
+    print(format_stats(stats))
+
+
+if __name__ == "__main__":
+    main()
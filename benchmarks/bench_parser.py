@@ -0,0 +1,47 @@
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.generator import generate_program
+from compiler.ast_nodes import count_nodes
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmark del parser")
+    parser.add_argument("--statements", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    code = generate_program(args.statements)
+    tokens = Lexer(code).tokenize()
+    print(f"Entrada: {len(code) / (1024 * 1024):.2f} MB, "
+          f"{len(tokens)} tokens")
+
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        tree = Parser(tokens).parse()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    statements = len(tree.body)
+    print(f"Parser : {statements} sentencias en {best:.3f} s "
+          f"({statements / best:,.0f} sentencias/s)")
+
+    # memoria del AST: lo que queda reservado tras construir el árbol
+    tree = None
+    tracemalloc.start()
+    tree = Parser(tokens).parse()
+    tree_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    nodes = count_nodes(tree)
+    print(f"AST    : {nodes} nodos, {tree_bytes / nodes:.1f} B/nodo")
+
+
+if __name__ == "__main__":
+    main()
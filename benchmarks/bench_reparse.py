@@ -0,0 +1,56 @@
+import argparse
+import re
+import time
+
+from benchmarks.generator import generate_program
+from compiler.lexer import Lexer
+from compiler.parser import Parser, reparse
+
+
+# =========================
+# REANÁLISIS INCREMENTAL
+# Costo por edición (agregar un dígito a un número en medio del
+# archivo) frente a volver a analizar todo, para varios tamaños.
+# =========================
+
+def measure(statements, edits, in_place):
+
+    code = generate_program(statements)
+
+    start = time.perf_counter()
+    program = Parser(Lexer(code).tokenize()).parse()
+    full = time.perf_counter() - start
+
+    middle = program.start(len(program.body) // 2)
+    position = re.compile(r"\b\d").search(code, middle).start()
+
+    incremental = 0.0
+    for i in range(edits):
+        code = code[:position] + str(i % 9 + 1) + code[position:]
+
+        start = time.perf_counter()
+        program, errors = reparse(program, code, position, 0, 1, in_place)
+        incremental += time.perf_counter() - start
+
+    incremental /= edits
+
+    return full, incremental
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmark de reanálisis")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--edits", type=int, default=200)
+    args = parser.parse_args()
+
+    for statements in map(int, args.sizes.split(",")):
+        full, copied = measure(statements, args.edits, False)
+        _, in_place = measure(statements, args.edits, True)
+        print(f"{statements:>8} sentencias: completo {full * 1000:9.1f} ms, "
+              f"por edición {copied * 1000:7.3f} ms (árbol nuevo) "
+              f"{in_place * 1000:7.3f} ms (en el lugar)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import random
+import re
+
+
+# =========================
+# PROGRAMAS SINTÉTICOS
+# Genera código válido del lenguaje (pasa el análisis semántico) de un
+# tamaño dado en bytes, con una mezcla configurable de sentencias:
+#
+#   assign   v = expresión;
+#   decl     { int d = expresión; v = d; }   (declaración en un bloque)
+#   if       if (cond) { v = ...; } else { v = ...; }
+#   while    while (v > 100) { v = v / 2; }
+#
+# terms es el número de operandos por expresión y floats la fracción de
+# sentencias sobre variables float (más NUMBER con punto decimal).
+#
+# Las declaraciones de nivel superior van solo al inicio, así un
+# segmento del cuerpo se puede repetir: los tamaños grandes (cientos de
+# MB) se arman copiando un segmento en lugar de sortear cada sentencia.
+# =========================
+
+MIXES = {
+    "mixed": {"assign": 6, "decl": 1, "if": 2, "while": 1, "terms": 3, "floats": 0.2},
+    "arithmetic": {"assign": 1, "decl": 0, "if": 0, "while": 0, "terms": 8, "floats": 0.3},
+    "control": {"assign": 1, "decl": 1, "if": 4, "while": 3, "terms": 2, "floats": 0.1},
+    "declarations": {"assign": 1, "decl": 6, "if": 0, "while": 0, "terms": 2, "floats": 0.5},
+}
+
+KINDS = ("assign", "decl", "if", "while")
+
+INT_VARIABLES = [f"i{n}" for n in range(32)]
+FLOAT_VARIABLES = [f"f{n}" for n in range(16)]
+
+# tamaño del segmento que se repite
+SEGMENT_BYTES = 1 << 20
+
+SIZE_UNITS = {"": 1, "B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+
+
+# "512KB", "1.5MB", "2048" -> bytes
+def parse_size(text):
+
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*", text.upper())
+
+    if not match:
+        raise ValueError(f"Tamaño no válido: {text}")
+
+    # "K", "M" y "G" sin la B valen lo mismo que con ella
+    unit = match[2].rstrip("B") + "B"
+    return int(float(match[1]) * SIZE_UNITS[unit])
+
+
+def format_size(size_bytes):
+
+    for unit in ("GB", "MB", "KB"):
+        if size_bytes >= SIZE_UNITS[unit] and size_bytes % SIZE_UNITS[unit] == 0:
+            return f"{size_bytes // SIZE_UNITS[unit]}{unit}"
+
+    return f"{size_bytes}B"
+
+
+# "mixed" o "control,terms=4,while=0": una mezcla con valores cambiados
+def parse_mix(text):
+
+    name, _, overrides = text.partition(",")
+
+    if "=" in name:
+        name, overrides = "mixed", text
+
+    if name not in MIXES:
+        raise ValueError(f"Mezcla desconocida: {name} ({', '.join(MIXES)})")
+
+    mix = dict(MIXES[name])
+
+    for item in filter(None, overrides.split(",")):
+        key, _, value = item.partition("=")
+        if key not in mix:
+            raise ValueError(f"Parámetro de mezcla desconocido: {key}")
+        mix[key] = float(value) if key == "floats" else int(value)
+
+    return mix
+
+
+class ProgramGenerator:
+
+    def __init__(self, mix, seed=0):
+        self.rng = random.Random(seed)
+        self.weights = [mix[kind] for kind in KINDS]
+        self.terms = max(1, mix["terms"])
+        self.floats = mix["floats"]
+
+        if not any(self.weights):
+            raise ValueError("La mezcla no tiene ninguna sentencia")
+
+    def prelude(self):
+        lines = [f"int {name} = {n};" for n, name in enumerate(INT_VARIABLES)]
+        lines += [f"float {name} = {n}.5;" for n, name in enumerate(FLOAT_VARIABLES)]
+        return "\n".join(lines) + "\n"
+
+    # =========================
+    # EXPRESIONES
+    # Las de tipo int solo usan variables y literales int: asignar un
+    # float a un int es un error semántico.
+    # =========================
+    def operand(self, is_float):
+
+        rng = self.rng
+
+        if rng.random() < 0.6:
+            if is_float and rng.random() < 0.5:
+                return rng.choice(FLOAT_VARIABLES)
+            return rng.choice(INT_VARIABLES)
+
+        if is_float:
+            return f"{rng.randint(0, 999)}.{rng.randint(0, 99)}"
+        return str(rng.randint(0, 9999))
+
+    def expression(self, is_float):
+
+        rng = self.rng
+        parts = [self.operand(is_float)]
+
+        for _ in range(self.terms - 1):
+            op = rng.choice("+-*/")
+            if op == "/":
+                # divisor constante distinto de cero
+                parts.append(f"/ {rng.randint(1, 99)}")
+            elif rng.random() < 0.2:
+                parts.append(f"{op} ( {self.operand(is_float)} + {self.operand(is_float)} )")
+            else:
+                parts.append(f"{op} {self.operand(is_float)}")
+
+        return " ".join(parts)
+
+    def assignment(self):
+        is_float = self.rng.random() < self.floats
+        target = self.rng.choice(FLOAT_VARIABLES if is_float else INT_VARIABLES)
+        return f"{target} = {self.expression(is_float)};"
+
+    # =========================
+    # SENTENCIAS
+    # =========================
+    def statement(self):
+
+        rng = self.rng
+        kind = rng.choices(KINDS, self.weights)[0]
+
+        if kind == "assign":
+            return self.assignment()
+
+        if kind == "decl":
+            if rng.random() < self.floats:
+                target = rng.choice(FLOAT_VARIABLES)
+                return f"{{ float d = {self.expression(True)}; {target} = d * 0.5; }}"
+            target = rng.choice(INT_VARIABLES)
+            return f"{{ int d = {self.expression(False)}; {target} = d + 1; }}"
+
+        if kind == "if":
+            target = rng.choice(INT_VARIABLES)
+            relop = rng.choice(("<", ">", "<=", ">=", "==", "!="))
+            return (f"if ({target} {relop} {rng.randint(0, 999)}) "
+                    f"{{ {self.assignment()} }} else {{ {self.assignment()} }}")
+
+        target = rng.choice(INT_VARIABLES)
+        return f"while ({target} > 100) {{ {target} = {target} / 2; }}"
+
+    def segment(self, size_bytes):
+
+        lines = []
+        total = 0
+
+        while total < size_bytes:
+            line = self.statement() + "\n"
+            lines.append(line)
+            total += len(line)
+
+        return "".join(lines)
+
+    def generate(self, size_bytes):
+
+        prelude = self.prelude()
+        body_bytes = max(size_bytes - len(prelude), 1)
+        segment = self.segment(min(body_bytes, SEGMENT_BYTES))
+
+        if len(segment) >= body_bytes:
+            return prelude + segment
+
+        # segmento repetido y un trozo final cortado en un salto de línea
+        copies, rest = divmod(body_bytes, len(segment))
+        tail = segment[:segment.rfind("\n", 0, rest) + 1]
+        return prelude + segment * copies + tail
+
+
+def generate_source(size_bytes, mix="mixed", seed=0):
+
+    if isinstance(mix, str):
+        mix = parse_mix(mix)
+
+    return ProgramGenerator(mix, seed).generate(size_bytes)
+
+
+# programa con un número fijo de sentencias de nivel superior,
+# contando las declaraciones iniciales (para medir por sentencia en
+# lugar de por byte)
+def generate_program(statements, mix="mixed", seed=0):
+
+    if isinstance(mix, str):
+        mix = parse_mix(mix)
+
+    generator = ProgramGenerator(mix, seed)
+    count = max(statements - len(INT_VARIABLES) - len(FLOAT_VARIABLES), 0)
+    body = [generator.statement() + "\n" for _ in range(count)]
+    return generator.prelude() + "".join(body)
@@ -0,0 +1,308 @@
+import argparse
+import gc
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.generator import (
+    MIXES, SIZE_UNITS, format_size, generate_source, parse_mix, parse_size,
+)
+from compiler.intermediate import generate
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+from compiler.semantic import SemanticAnalyzer
+
+
+# =========================
+# SUITE DE BENCHMARKS
+#   python -m benchmarks.suite [--sizes 1KB,1MB,16MB] [--mix mixed]
+#                              [--save base.json] [--compare base.json]
+#
+# Para cada tamaño y mezcla de programa sintético mide cada fase:
+#   lexer         tokens/s
+#   parser        sentencias/s (de nivel superior)
+#   semantic      sentencias/s
+#   intermediate  instrucciones/s
+# y la memoria máxima reservada durante la fase (tracemalloc, en una
+# corrida aparte para no inflar los tiempos).
+#
+# --save escribe los resultados en JSON; --compare los contrasta con un
+# archivo guardado y termina con código 1 si algún rendimiento cae más
+# de --threshold (por defecto 10 %).
+# =========================
+
+PHASES = ("lexer", "parser", "semantic", "intermediate")
+
+# unidad de rendimiento de cada fase
+UNITS = {
+    "lexer": "tokens",
+    "parser": "sentencias",
+    "semantic": "sentencias",
+    "intermediate": "instrucciones",
+}
+
+DEFAULT_SIZES = "1KB,64KB,1MB,16MB"
+
+# por encima de este tamaño solo corre el lexer: el AST de cientos de
+# MB no entra en memoria en una máquina común
+TREE_LIMIT = "64MB"
+
+# duración mínima de una muestra de tiempo
+MIN_SAMPLE = 0.2
+
+BASELINE_VERSION = 1
+
+
+# =========================
+# FASES
+# Cada una recibe la salida de la anterior y devuelve (salida, cantidad
+# de unidades procesadas).
+# =========================
+
+def run_lexer(code):
+    tokens = Lexer(code).tokenize()
+    return tokens, len(tokens)
+
+
+def run_parser(tokens):
+    tree = Parser(tokens).parse()
+    return tree, len(tree.body)
+
+
+def run_semantic(tree):
+    SemanticAnalyzer().analyze(tree)
+    return tree, len(tree.body)
+
+
+def run_intermediate(tree):
+    ir = generate(tree)
+    return ir, len(ir)
+
+
+RUNNERS = {
+    "lexer": run_lexer,
+    "parser": run_parser,
+    "semantic": run_semantic,
+    "intermediate": run_intermediate,
+}
+
+
+# mejor tiempo por corrida entre repeat muestras; con entradas chicas
+# cada muestra repite la fase hasta durar al menos MIN_SAMPLE segundos
+def best_time(runner, value, repeat):
+
+    gc.collect()
+    start = time.perf_counter()
+    output, count = runner(value)
+    first = time.perf_counter() - start
+
+    loops = max(1, math.ceil(MIN_SAMPLE / first)) if first else 1000
+    best = first
+
+    for _ in range(repeat - 1 if loops == 1 else repeat):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(loops):
+            runner(value)
+        best = min(best, (time.perf_counter() - start) / loops)
+
+    return output, count, best
+
+
+def peak_memory(runner, value):
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        output, _ = runner(value)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    del output
+    return peak
+
+
+def measure(code, phases, repeat, memory):
+
+    results = {}
+    value = code
+
+    for phase in PHASES:
+        if phase not in phases:
+            break
+
+        runner = RUNNERS[phase]
+        output, count, elapsed = best_time(runner, value, repeat)
+
+        entry = {
+            "count": count,
+            "elapsed": round(elapsed, 6),
+            "rate": round(count / elapsed, 1) if elapsed else None,
+        }
+
+        if memory:
+            entry["peak_bytes"] = peak_memory(runner, value)
+
+        results[phase] = entry
+        value = output
+
+    return results
+
+
+# =========================
+# LÍNEA BASE
+# =========================
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "implementation": sys.implementation.name,
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def save_baseline(path, results):
+
+    data = {
+        "version": BASELINE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "results": results,
+    }
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def load_baseline(path):
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Versión de línea base no soportada: {data.get('version')}")
+
+    return data["results"]
+
+
+# (caso, fase, base, actual, cambio) de cada rendimiento que cayó más
+# que threshold; los casos que no están en los dos archivos se ignoran
+def find_regressions(baseline, results, threshold):
+
+    regressions = []
+
+    for case, phases in results.items():
+        for phase, entry in phases.items():
+
+            before = baseline.get(case, {}).get(phase, {}).get("rate")
+            after = entry.get("rate")
+
+            if not before or after is None:
+                continue
+
+            change = after / before - 1
+            if change < -threshold:
+                regressions.append((case, phase, before, after, change))
+
+    return regressions
+
+
+# =========================
+# SALIDA
+# =========================
+
+def format_bytes(size):
+
+    for unit in ("GB", "MB", "KB"):
+        if size >= SIZE_UNITS[unit]:
+            return f"{size / SIZE_UNITS[unit]:.1f} {unit}"
+
+    return f"{size} B"
+
+
+def format_row(phase, entry):
+
+    text = (f"  {phase:<13}{entry['count']:>12} {UNITS[phase]:<13}"
+            f"{entry['elapsed']:>9.3f} s {entry['rate'] or 0:>14,.0f}/s")
+
+    if "peak_bytes" in entry:
+        text += f"   pico {format_bytes(entry['peak_bytes'])}"
+
+    return text
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Suite de benchmarks del compilador")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="tamaños separados por coma, de 1KB a 500MB")
+    parser.add_argument("--mix", action="append",
+                        help=f"mezcla de sentencias ({', '.join(MIXES)}; "
+                             "se pueden cambiar valores: control,terms=4)")
+    parser.add_argument("--phases", default=",".join(PHASES),
+                        help="fases a medir (cada una necesita las anteriores)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tree-limit", default=TREE_LIMIT,
+                        help="tamaño máximo para las fases después del lexer")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="no medir la memoria máxima")
+    parser.add_argument("--save", metavar="ARCHIVO", help="guardar los resultados en JSON")
+    parser.add_argument("--compare", metavar="ARCHIVO",
+                        help="comparar contra una línea base guardada")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="caída máxima de rendimiento permitida (0.10 = 10 %%)")
+    args = parser.parse_args()
+
+    try:
+        sizes = [parse_size(text) for text in args.sizes.split(",")]
+        mixes = {text: parse_mix(text) for text in (args.mix or ["mixed"])}
+        tree_limit = parse_size(args.tree_limit)
+    except ValueError as e:
+        parser.error(str(e))
+
+    phases = [phase for phase in args.phases.split(",") if phase]
+    unknown = [phase for phase in phases if phase not in PHASES]
+    if unknown:
+        parser.error(f"Fases desconocidas: {', '.join(unknown)}")
+
+    results = {}
+
+    for mix_name, mix in mixes.items():
+        for size in sizes:
+
+            code = generate_source(size, mix, args.seed)
+            case = f"{format_size(size)}/{mix_name}"
+            selected = phases if size <= tree_limit else [p for p in phases if p == "lexer"]
+
+            print(f"{case} ({format_bytes(len(code))})")
+            results[case] = measure(code, selected, args.repeat, not args.no_memory)
+            code = None
+
+            for phase, entry in results[case].items():
+                print(format_row(phase, entry))
+
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"\nResultados guardados en {args.save}")
+
+    if args.compare:
+        regressions = find_regressions(load_baseline(args.compare), results, args.threshold)
+
+        if regressions:
+            print(f"\nRegresiones (más de {args.threshold:.0%} más lento):")
+            for case, phase, before, after, change in regressions:
+                print(f"  {case} {phase}: {before:,.0f}/s -> {after:,.0f}/s ({change:+.1%})")
+            sys.exit(1)
+
+        print(f"\nSin regresiones respecto a {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from .disk_cache import DiskCache
+    from .optimizer import DEFAULT_LEVEL
+    from .pipeline import PHASES, phase_output, use_disk_cache
+except ImportError:
+    from disk_cache import DiskCache
+    from optimizer import DEFAULT_LEVEL
+    from pipeline import PHASES, phase_output, use_disk_cache
+
+
+# =========================
+# COMPILACIÓN POR LOTES
+#   python -m compiler [--phase FASE] [-O0|-O1|-O2] rutas...
+#
+# Las rutas pueden ser archivos, carpetas (se recorren completas) o
+# patrones glob. Cada archivo se analiza hasta la fase pedida en un
+# proceso del pool y cada error sale como una línea JSON:
+#   {"file": ..., "phase": ..., "line": ..., "col": ..., "message": ...}
+# El código de salida es 1 si hubo algún error.
+# =========================
+
+DEFAULT_EXTENSIONS = (".txt",)
+
+
+def expand_paths(paths, extensions):
+
+    files = []
+    seen = set()
+
+    def add(path):
+        path = os.path.normpath(path)
+        if path not in seen:
+            seen.add(path)
+            files.append(path)
+
+    for pattern in paths:
+
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+
+        for path in sorted(matches):
+            if os.path.isdir(path):
+                for root, dirs, names in os.walk(path):
+                    dirs.sort()
+                    for name in sorted(names):
+                        if name.endswith(extensions):
+                            add(os.path.join(root, name))
+            else:
+                add(path)
+
+    return files
+
+
+# =========================
+# TRABAJO DE CADA PROCESO
+# Solo vuelven al proceso principal los diagnósticos, no los tokens
+# ni el árbol.
+# =========================
+
+def init_worker(cache_root):
+    if cache_root is not None:
+        use_disk_cache(DiskCache(cache_root))
+
+
+def check_file(job):
+
+    path, phase, level = job
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            code = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return path, [{"line": None, "col": None, "message": f"No se pudo leer: {e}"}]
+
+    # un error inesperado en un archivo no corta el lote: sale como
+    # diagnóstico de ese archivo
+    try:
+        result = phase_output(phase, code, level=level)
+    except Exception as e:
+        return path, [{"line": None, "col": None, "message": f"Error interno: {type(e).__name__}: {e}"}]
+
+    return path, [
+        {"line": e["line"], "col": e["col"], "message": e["message"]}
+        for e in result["errors"]
+    ]
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog="python -m compiler",
+        description="Compila archivos por lotes y reporta los errores en JSON lines",
+    )
+    parser.add_argument("paths", nargs="+", help="archivos, carpetas o patrones glob")
+    parser.add_argument("--phase", choices=list(PHASES), default="semantic",
+                        help="última fase a correr (las anteriores también corren)")
+    parser.add_argument("-O", dest="level", type=int, choices=(0, 1, 2),
+                        default=DEFAULT_LEVEL, help="nivel de optimización")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument("--ext", action="append",
+                        help="extensión de los archivos de una carpeta (por defecto .txt)")
+    parser.add_argument("--output", "-o", help="archivo JSON lines (por defecto stdout)")
+    parser.add_argument("--cache", metavar="DIR",
+                        help="reutilizar resultados guardados en esta carpeta")
+    args = parser.parse_args(argv)
+
+    extensions = tuple(args.ext) if args.ext else DEFAULT_EXTENSIONS
+    files = expand_paths(args.paths, extensions)
+
+    if not files:
+        print("No se encontraron archivos", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    jobs = [(path, args.phase, args.level) for path in files]
+
+    # lotes de varios archivos por viaje al proceso: con miles de archivos
+    # chicos el costo de comunicación domina
+    workers = max(1, min(args.jobs, len(files)))
+    chunksize = max(1, len(files) // (workers * 8))
+
+    failed = 0
+    errors = 0
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker, initargs=(args.cache,)
+        ) as pool:
+            for path, diagnostics in pool.map(check_file, jobs, chunksize=chunksize):
+
+                if diagnostics:
+                    failed += 1
+                    errors += len(diagnostics)
+
+                for diagnostic in diagnostics:
+                    out.write(json.dumps(
+                        {"file": path, "phase": args.phase, **diagnostic},
+                        ensure_ascii=False,
+                    ) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(files)} archivos, {failed} con errores, {errors} errores "
+        f"en {elapsed:.2f} s ({workers} procesos)",
+        file=sys.stderr,
+    )
+
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+import sys
+from array import array
+
+
+# =========================
+# NODOS DEL AST
+# Clases con __slots__: sin __dict__ por nodo, así un nodo ocupa unos
+# 50-70 bytes. pos es el desplazamiento del primer token del nodo
+# relativo al inicio de su sentencia de nivel superior (ver Program),
+# de modo que un subárbol no depende de dónde está en el archivo.
+# =========================
+
+class Node:
+
+    __slots__ = ("pos",)
+
+    # atributos que son nodos hijos (o listas de nodos), en orden
+    children = ()
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name)
+            for name in self.__slots__
+        )
+
+    __hash__ = object.__hash__
+
+
+class Block(Node):
+    __slots__ = ("body",)
+    children = ("body",)
+
+    def __init__(self, body, pos=None):
+        self.body = body
+        self.pos = pos
+
+
+class Decl(Node):
+    __slots__ = ("type_name", "name", "value")
+    children = ("value",)
+
+    def __init__(self, type_name, name, value=None, pos=None):
+        self.type_name = type_name
+        self.name = name
+        self.value = value
+        self.pos = pos
+
+
+class Assign(Node):
+    __slots__ = ("name", "value")
+    children = ("value",)
+
+    def __init__(self, name, value, pos=None):
+        self.name = name
+        self.value = value
+        self.pos = pos
+
+
+class If(Node):
+    __slots__ = ("cond", "then", "orelse")
+    children = ("cond", "then", "orelse")
+
+    def __init__(self, cond, then, orelse=None, pos=None):
+        self.cond = cond
+        self.then = then
+        self.orelse = orelse
+        self.pos = pos
+
+
+class While(Node):
+    __slots__ = ("cond", "body")
+    children = ("cond", "body")
+
+    def __init__(self, cond, body, pos=None):
+        self.cond = cond
+        self.body = body
+        self.pos = pos
+
+
+class BinOp(Node):
+    __slots__ = ("op", "left", "right")
+    children = ("left", "right")
+
+    def __init__(self, op, left, right, pos=None):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.pos = pos
+
+
+class UnaryOp(Node):
+    __slots__ = ("op", "operand")
+    children = ("operand",)
+
+    def __init__(self, op, operand, pos=None):
+        self.op = op
+        self.operand = operand
+        self.pos = pos
+
+
+# los int del lenguaje son de 64 bits con complemento a dos: un
+# resultado fuera de rango da la vuelta, como en Java (y en C con
+# -fwrapv), igual en el plegado, la máquina virtual y el backend nativo
+INT_BITS = 64
+INT_MIN = -(1 << (INT_BITS - 1))
+INT_MAX = (1 << (INT_BITS - 1)) - 1
+
+
+def wrap_int(value):
+    return ((value - INT_MIN) & ((1 << INT_BITS) - 1)) + INT_MIN
+
+
+class Num(Node):
+    __slots__ = ("value",)
+
+    def __init__(self, value, pos=None):
+        self.value = value
+        self.pos = pos
+
+
+class Var(Node):
+    __slots__ = ("name",)
+
+    def __init__(self, name, pos=None):
+        self.name = name
+        self.pos = pos
+
+
+# =========================
+# PROGRAMA
+# Lista de sentencias de nivel superior y, en arrays, el rango
+# [inicio, fin) de cada una en el código fuente.
+#
+# Tras un reanálisis incremental los rangos posteriores a la edición no
+# se corrigen uno por uno: a partir del índice shift_from se les suma
+# shift al leerlos (start(i), end(i)).
+# =========================
+
+class Program:
+
+    __slots__ = ("body", "starts", "ends", "shift_from", "shift")
+
+    def __init__(self, body=None, starts=None, ends=None,
+                 shift_from=0, shift=0):
+        self.body = body if body is not None else []
+        self.starts = starts if starts is not None else array("i")
+        self.ends = ends if ends is not None else array("i")
+        self.shift_from = shift_from
+        self.shift = shift
+
+    def start(self, index):
+        if index >= self.shift_from:
+            return self.starts[index] + self.shift
+        return self.starts[index]
+
+    def end(self, index):
+        if index >= self.shift_from:
+            return self.ends[index] + self.shift
+        return self.ends[index]
+
+    # primera sentencia cuyo final es >= offset
+    def find(self, offset):
+
+        lo, hi = 0, len(self.body)
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.end(mid) < offset:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return lo
+
+    # bytes que ocupan los nodos, sus listas y los arrays de rangos
+    # (recorrido iterativo: el árbol puede ser más profundo que el
+    # límite de recursión)
+    def nbytes(self):
+
+        size = sys.getsizeof(self.body) + sum(
+            a.itemsize * len(a) for a in (self.starts, self.ends)
+        )
+        getsize = sys.getsizeof
+        stack = list(self.body)
+
+        while stack:
+            node = stack.pop()
+            size += getsize(node)
+
+            for name in node.children:
+                child = getattr(node, name)
+                if type(child) is list:
+                    size += getsize(child)
+                    stack.extend(child)
+                elif child is not None:
+                    stack.append(child)
+
+        return size
+
+    # mueve el inicio del desplazamiento pendiente a otro índice,
+    # corrigiendo solo los rangos que quedan entre ambos
+    def move_shift(self, index):
+
+        shift = self.shift
+
+        if shift:
+            if index > self.shift_from:
+                for i in range(self.shift_from, index):
+                    self.starts[i] += shift
+                    self.ends[i] += shift
+            else:
+                for i in range(index, self.shift_from):
+                    self.starts[i] -= shift
+                    self.ends[i] -= shift
+
+        self.shift_from = index
+
+    # sentencias [first, last) reemplazadas y los rangos siguientes
+    # desplazados delta. Por defecto devuelve un programa nuevo que
+    # comparte los nodos no tocados con este (copiar la lista de
+    # sentencias es una copia en C); con in_place=True modifica este
+    # programa y el costo depende solo del tramo reemplazado.
+    def splice(self, first, last, body, starts, ends, delta, in_place=False):
+
+        program = self
+        if not in_place:
+            program = Program(
+                list(self.body), self.starts[:], self.ends[:],
+                self.shift_from, self.shift,
+            )
+
+        program.move_shift(last)
+
+        program.body[first:last] = body
+        program.starts[first:last] = array("i", starts)
+        program.ends[first:last] = array("i", ends)
+
+        program.shift_from = first + len(body)
+        program.shift += delta
+        return program
+
+    def __eq__(self, other):
+        return isinstance(other, Program) and self.body == other.body
+
+    __hash__ = object.__hash__
+
+
+# =========================
+# RECORRIDO
+# =========================
+
+def iter_children(node):
+
+    for name in node.children:
+        child = getattr(node, name)
+
+        if child is None:
+            continue
+
+        if isinstance(child, list):
+            yield from child
+        else:
+            yield child
+
+
+# todos los nodos del árbol (preorden), con una pila explícita
+def walk(node):
+
+    stack = list(reversed(node.body)) if isinstance(node, Program) else [node]
+
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(list(iter_children(node))))
+
+
+def count_nodes(tree):
+    return sum(1 for _ in walk(tree))
+
+
+# árbol como texto indentado (dock Sintáctico)
+def dump(tree):
+
+    lines = ["Program"]
+    stack = [(node, 1) for node in reversed(tree.body)]
+
+    while stack:
+        node, depth = stack.pop()
+        lines.append("  " * depth + describe(node))
+
+        children = list(iter_children(node))
+        stack.extend((child, depth + 1) for child in reversed(children))
+
+    return "\n".join(lines)
+
+
+def describe(node):
+
+    name = type(node).__name__
+
+    if isinstance(node, Decl):
+        return f"{name} {node.type_name} {node.name}"
+    if isinstance(node, (Assign, Var)):
+        return f"{name} {node.name}"
+    if isinstance(node, (BinOp, UnaryOp)):
+        return f"{name} {node.op}"
+    if isinstance(node, Num):
+        return f"{name} {node.value}"
+
+    return name
@@ -0,0 +1,55 @@
+import threading
+from collections import OrderedDict
+
+
+# =========================
+# CACHÉ DE RESULTADOS POR FASE
+# LRU con límite de entradas y de tamaño (en bytes de lo que guarda
+# cada entrada, ver result_size en pipeline). Se usa desde los hilos
+# del servicio del compilador, por eso lleva un lock.
+# =========================
+
+class PhaseCache:
+
+    def __init__(self, max_entries=32, max_size=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+
+            self.entries[key] = (value, size)
+            self.size += size
+
+            # expulsar las menos usadas recientemente
+            while self.entries and (
+                len(self.entries) > self.max_entries
+                or self.size > self.max_size
+            ):
+                _, (_, old_size) = self.entries.popitem(last=False)
+                self.size -= old_size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
@@ -0,0 +1,354 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+try:
+    from .ast_nodes import Node, Program
+    from .intermediate import IRCode, constant_key
+    from .semantic import Symbol
+    from .token_buffer import TokenBuffer
+    from .tokens import TOKEN_TYPES_VERSION
+except ImportError:
+    from ast_nodes import Node, Program
+    from intermediate import IRCode, constant_key
+    from semantic import Symbol
+    from token_buffer import TokenBuffer
+    from tokens import TOKEN_TYPES_VERSION
+
+
+# huella de las fuentes del compilador: cualquier cambio en el lexer,
+# el parser o el formato invalida las entradas sin tener que acordarse
+# de subir un número. Sin las fuentes (p. ej. solo .pyc) queda la
+# versión de TOKEN_TYPES.
+def compiler_fingerprint():
+
+    folder = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha1()
+
+    try:
+        names = sorted(name for name in os.listdir(folder) if name.endswith(".py"))
+        for name in names:
+            with open(os.path.join(folder, name), "rb") as f:
+                digest.update(name.encode("utf-8") + b"\0" + f.read())
+    except OSError:
+        names = []
+
+    if not names:
+        return f"3-{TOKEN_TYPES_VERSION}"
+
+    return digest.hexdigest()[:16]
+
+
+# las entradas de otra versión se ignoran y prune() las borra
+COMPILER_VERSION = compiler_fingerprint()
+
+
+# carpeta de caché del usuario (como el diario del IDE, no la carpeta
+# desde donde se corre: el IDE, las terminales y los benchmarks
+# comparten las entradas y no dejan carpetas sueltas)
+def user_cache_dir():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "IDECompilador", "cache")
+
+
+CACHE_DIR = os.environ.get("IDECACHE_DIR") or user_cache_dir()
+CACHE_MAX_BYTES = int(os.environ.get("IDECACHE_MAX_MB", "256")) * 1024 * 1024
+
+# prune() recorre toda la carpeta: corre con la primera entrada que se
+# guarda en el proceso y después cada vez que lo escrito pasa de esta
+# fracción del límite
+PRUNE_FRACTION = 16
+
+SUFFIX = ".entry"
+
+# los archivos .pickle de versiones anteriores se borran con prune()
+OLD_SUFFIXES = (".pickle",)
+
+
+# =========================
+# FORMATO DE LAS ENTRADAS
+#   MAGIC, largo del encabezado, encabezado JSON, arrays en binario
+#
+# El encabezado tiene los datos del resultado en listas etiquetadas
+# (["L", ...] lista, ["N", clase, campos...] nodo, ["A", tipo, n] el
+# array n, etc.). Los nodos se guardan por nombre de clase, no por
+# ruta de módulo: una entrada escrita por "python compiler/parser.py"
+# (módulo ast_nodes) la lee el IDE (compiler.ast_nodes) y al revés.
+# Cargar una entrada no ejecuta nada, a diferencia de pickle o
+# marshal: la carpeta de caché puede venir con cualquier repositorio.
+# El backend nativo (code objects) no se guarda en disco.
+# =========================
+
+MAGIC = b"IDECACH3"
+HEADER = struct.Struct("<Q")
+
+
+def all_subclasses(cls):
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from all_subclasses(sub)
+
+
+# clases con __slots__ que pueden ir en una entrada -> sus campos
+SLOT_CLASSES = {
+    cls.__name__: cls
+    for cls in (Program, Symbol, *all_subclasses(Node))
+}
+SLOT_FIELDS = {
+    cls: tuple(
+        name
+        for base in reversed(cls.__mro__)
+        for name in base.__dict__.get("__slots__", ())
+    )
+    for cls in SLOT_CLASSES.values()
+}
+
+
+def encode(value, buffers):
+
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+
+    if isinstance(value, list):
+        return ["L", *(encode(item, buffers) for item in value)]
+
+    if isinstance(value, tuple):
+        return ["T", *(encode(item, buffers) for item in value)]
+
+    if isinstance(value, dict):
+        items = ["D"]
+        for key, item in value.items():
+            items.append(encode(key, buffers))
+            items.append(encode(item, buffers))
+        return items
+
+    if isinstance(value, array):
+        buffers.append(value.tobytes())
+        return ["A", value.typecode, len(buffers) - 1]
+
+    if isinstance(value, TokenBuffer):
+        return ["K", *(encode(column, buffers) for column in (value.kinds, value.starts, value.ends))]
+
+    if isinstance(value, IRCode):
+        return ["I", *(
+            encode(getattr(value, name), buffers)
+            for name in ("ops", "arg1", "arg2", "result", "constants", "names", "types")
+        )]
+
+    fields = SLOT_FIELDS.get(SLOT_CLASSES.get(type(value).__name__))
+    if fields is None:
+        raise TypeError(f"no se puede guardar {type(value).__name__}")
+
+    return ["N", type(value).__name__, *(
+        encode(getattr(value, name, None), buffers) for name in fields
+    )]
+
+
+def decode(value, buffers, code):
+
+    if not isinstance(value, list):
+        return value
+
+    tag = value[0]
+    items = value[1:]
+
+    if tag == "L":
+        return [decode(item, buffers, code) for item in items]
+
+    if tag == "T":
+        return tuple(decode(item, buffers, code) for item in items)
+
+    if tag == "D":
+        return {
+            decode(items[i], buffers, code): decode(items[i + 1], buffers, code)
+            for i in range(0, len(items), 2)
+        }
+
+    if tag == "A":
+        column = array(items[0])
+        column.frombytes(buffers[items[1]])
+        return column
+
+    if tag == "K":
+        kinds, starts, ends = (decode(item, buffers, code) for item in items)
+        return TokenBuffer.load(code, (kinds.tobytes(), starts.tobytes(), ends.tobytes()))
+
+    if tag == "I":
+        ir = IRCode()
+        (ir.ops, ir.arg1, ir.arg2, ir.result,
+         ir.constants, ir.names, ir.types) = (decode(item, buffers, code) for item in items)
+        ir.constant_ids = {
+            constant_key(constant): -i - 1 for i, constant in enumerate(ir.constants)
+        }
+        return ir
+
+    if tag == "N":
+        cls = SLOT_CLASSES[items[0]]
+        node = cls.__new__(cls)
+        for name, item in zip(SLOT_FIELDS[cls], items[1:]):
+            setattr(node, name, decode(item, buffers, code))
+        return node
+
+    raise ValueError(f"etiqueta desconocida: {tag!r}")
+
+
+def dump_entry(result):
+
+    buffers = []
+    header = json.dumps(encode(result, buffers), separators=(",", ":")).encode("utf-8", "surrogatepass")
+    sizes = json.dumps([len(buffer) for buffer in buffers]).encode("utf-8")
+
+    return b"".join((
+        MAGIC, HEADER.pack(len(header)), header,
+        HEADER.pack(len(sizes)), sizes, *buffers,
+    ))
+
+
+def load_entry(data, code):
+
+    if not data.startswith(MAGIC):
+        raise ValueError("no es una entrada de la caché")
+
+    offset = len(MAGIC)
+    (size,) = HEADER.unpack_from(data, offset)
+    offset += HEADER.size
+    header = json.loads(data[offset:offset + size].decode("utf-8", "surrogatepass"))
+    offset += size
+
+    (size,) = HEADER.unpack_from(data, offset)
+    offset += HEADER.size
+    sizes = json.loads(data[offset:offset + size])
+    offset += size
+
+    buffers = []
+    for size in sizes:
+        buffers.append(data[offset:offset + size])
+        offset += size
+
+    if offset != len(data):
+        raise ValueError("entrada incompleta")
+
+    return decode(header, buffers, code)
+
+
+class DiskCache:
+
+    def __init__(self, root=None, max_bytes=CACHE_MAX_BYTES):
+        self.root = root or CACHE_DIR
+        self.max_bytes = max_bytes
+        # bytes escritos desde el último prune(); None: todavía no corrió
+        self.written = None
+
+    # los tokens ocupan unas 3 veces el tamaño del código; los archivos
+    # más grandes se procesan por bloques sin pasar por la caché
+    def fits(self, source_size):
+        return source_size * 4 <= self.max_bytes
+
+    def path(self, digest, phase):
+        return os.path.join(
+            self.root, f"{digest}-{phase}-{COMPILER_VERSION}{SUFFIX}"
+        )
+
+    def load(self, digest, phase, code):
+
+        path = self.path(digest, phase)
+
+        # una entrada dañada o de otro formato es como no tenerla
+        try:
+            with open(path, "rb") as f:
+                data = load_entry(f.read(), code)
+            os.utime(path)
+        except Exception:
+            return None
+
+        return data
+
+    def store(self, digest, phase, result):
+
+        # los code objects solo se pueden leer ejecutando marshal: el
+        # backend nativo se recompila en cada sesión
+        if result.get("code_object") is not None:
+            return
+
+        data = dict(result)
+        data.pop("key", None)
+
+        try:
+            entry = dump_entry(data)
+        except (TypeError, ValueError, RecursionError):
+            return
+
+        try:
+            os.makedirs(self.root, exist_ok=True)
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(entry)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path(digest, phase))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+        except OSError:
+            # la caché es opcional: un disco lleno no rompe la compilación
+            return
+
+        if self.written is None or self.written + len(entry) > self.max_bytes // PRUNE_FRACTION:
+            self.prune()
+        else:
+            self.written += len(entry)
+
+    # borrar las entradas menos usadas hasta quedar bajo el límite
+    def prune(self):
+
+        self.written = 0
+        entries = []
+        total = 0
+
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return
+
+        current = f"-{COMPILER_VERSION}{SUFFIX}"
+
+        for name in names:
+            if name.endswith(OLD_SUFFIXES) or (
+                name.endswith(SUFFIX) and not name.endswith(current)
+            ):
+                try:
+                    os.unlink(os.path.join(self.root, name))
+                except OSError:
+                    pass
+                continue
+            if not name.endswith(SUFFIX):
+                continue
+            try:
+                info = os.stat(os.path.join(self.root, name))
+            except OSError:
+                continue
+            entries.append((info.st_mtime, info.st_size, name))
+            total += info.st_size
+
+        entries.sort()
+
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(os.path.join(self.root, name))
+            except OSError:
+                pass
+            total -= size
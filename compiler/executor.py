@@ -0,0 +1,323 @@
+import sys
+from array import array
+
+try:
+    from .ast_nodes import INT_MAX, INT_MIN, wrap_int
+    from .intermediate import (
+        ADD, COPY, DIV, EQ, FLOAT, GE, GOTO, GT, IDIV, IFFALSE, LE, LT,
+        MUL, NE, NEG, NONE, SUB,
+    )
+except ImportError:
+    from ast_nodes import INT_MAX, INT_MIN, wrap_int
+    from intermediate import (
+        ADD, COPY, DIV, EQ, FLOAT, GE, GOTO, GT, IDIV, IFFALSE, LE, LT,
+        MUL, NE, NEG, NONE, SUB,
+    )
+
+
+# =========================
+# BYTECODE
+# Cada instrucción ocupa 4 enteros seguidos (op, a, b, c) en un solo
+# array. a, b y c ya son índices del banco de registros: las variables
+# y temporales conservan su casilla y las constantes se cargan en
+# registros propios al crear el marco, así la máquina nunca busca un
+# nombre ni distingue tipos de operando. En los saltos c es la posición
+# del destino dentro del array.
+#
+# Una comparación seguida del iffalse que consume su temporal se
+# fusiona en un salto condicional (JNLT = saltar si no a < b, ...).
+# El temporal no se escribe: los temporales mueren en la instrucción
+# que los consume.
+# =========================
+
+(JNLT, JNGT, JNLE, JNGE, JNEQ, JNNE) = range(16, 22)
+
+FUSED = {LT: JNLT, GT: JNGT, LE: JNLE, GE: JNGE, EQ: JNEQ, NE: JNNE}
+
+# saltos hacia atrás permitidos antes de cortar un ciclo infinito
+MAX_JUMPS = 100_000_000
+
+
+class ExecutionError(Exception):
+    pass
+
+
+class Bytecode:
+
+    def __init__(self, code, registers, names, types):
+        self.code = code
+        self.registers = registers
+        self.names = names
+        self.types = types
+
+    def __len__(self):
+        return len(self.code) // 4
+
+    # casillas de variables del programa (sin temporales)
+    def variables(self):
+        return [
+            (slot, name)
+            for slot, name in enumerate(self.names)
+            if self.types[slot] is not None
+        ]
+
+
+def assemble(ir):
+
+    slot_count = ir.slot_count
+    ops, arg1, arg2, result = ir.ops, ir.arg1, ir.arg2, ir.result
+    count = len(ir)
+
+    def register(operand):
+        if operand < 0:
+            return slot_count - operand - 1
+        return operand
+
+    targets = {result[i] for i in range(count) if ops[i] in (GOTO, IFFALSE)}
+
+    # índice de instrucción intermedia -> índice en el bytecode
+    index_map = array("i", [0]) * (count + 1)
+    fused = set()
+    position = 0
+
+    for i in range(count):
+        index_map[i] = position
+
+        if i in fused:
+            continue
+
+        if (
+            ops[i] in FUSED
+            and i + 1 < count
+            and ops[i + 1] == IFFALSE
+            and arg1[i + 1] == result[i]
+            and ir.types[result[i]] is None
+            and i + 1 not in targets
+        ):
+            fused.add(i + 1)
+
+        position += 1
+
+    index_map[count] = position
+
+    code = array("i")
+
+    for i in range(count):
+
+        if i in fused:
+            continue
+
+        op = ops[i]
+
+        if i + 1 in fused:
+            code.extend((
+                FUSED[op], register(arg1[i]), register(arg2[i]),
+                index_map[result[i + 1]] * 4,
+            ))
+        elif op in (GOTO, IFFALSE):
+            code.extend((
+                op, register(arg1[i]), NONE, index_map[result[i]] * 4,
+            ))
+        else:
+            code.extend((
+                op, register(arg1[i]), register(arg2[i]), register(result[i]),
+            ))
+
+    # marco inicial: variables en cero de su tipo, luego las constantes
+    registers = [
+        0.0 if type_name == "float" else 0 for type_name in ir.types
+    ]
+    registers.extend(ir.constants)
+
+    return Bytecode(code, registers, list(ir.names), list(ir.types))
+
+
+# =========================
+# MÁQUINA VIRTUAL DE REGISTROS
+# El banco de registros se reserva una vez por programa y se reinicia
+# copiando el marco inicial. El ciclo de despacho solo indexa listas
+# locales; las operaciones más frecuentes van primero.
+#
+# Los registros no llevan tipo: tras +, -, * y negar, un resultado
+# fuera del rango de 64 bits se ajusta con wrap_int si es int (un float
+# fuera de ese rango queda igual).
+# =========================
+
+class VM:
+
+    def __init__(self, bytecode, max_jumps=MAX_JUMPS):
+        self.bytecode = bytecode
+        self.code = bytecode.code.tolist()
+        self.registers = list(bytecode.registers)
+        self.max_jumps = max_jumps
+        self.steps = 0
+
+    def reset(self):
+        self.registers[:] = self.bytecode.registers
+
+    def run(self):
+
+        self.reset()
+
+        code = self.code
+        r = self.registers
+        end = len(code)
+        jumps = self.max_jumps
+        low = INT_MIN
+        high = INT_MAX
+        steps = 0
+        pc = 0
+
+        try:
+            while pc < end:
+                op = code[pc]
+                steps += 1
+
+                if op < GOTO:
+
+                    if op == ADD:
+                        v = r[code[pc + 1]] + r[code[pc + 2]]
+                        if not low <= v <= high and v.__class__ is int:
+                            v = wrap_int(v)
+                        r[code[pc + 3]] = v
+                    elif op == SUB:
+                        v = r[code[pc + 1]] - r[code[pc + 2]]
+                        if not low <= v <= high and v.__class__ is int:
+                            v = wrap_int(v)
+                        r[code[pc + 3]] = v
+                    elif op == MUL:
+                        v = r[code[pc + 1]] * r[code[pc + 2]]
+                        if not low <= v <= high and v.__class__ is int:
+                            v = wrap_int(v)
+                        r[code[pc + 3]] = v
+                    elif op == COPY:
+                        r[code[pc + 3]] = r[code[pc + 1]]
+                    elif op == IDIV:
+                        a = r[code[pc + 1]]
+                        b = r[code[pc + 2]]
+                        q = a // b
+                        # división entera truncada hacia cero, como en C
+                        if q < 0 and q * b != a:
+                            q += 1
+                        # INT_MIN / -1
+                        if q > high:
+                            q = wrap_int(q)
+                        r[code[pc + 3]] = q
+                    elif op == DIV:
+                        r[code[pc + 3]] = r[code[pc + 1]] / r[code[pc + 2]]
+                    elif op == NEG:
+                        v = -r[code[pc + 1]]
+                        if v > high and v.__class__ is int:
+                            v = wrap_int(v)
+                        r[code[pc + 3]] = v
+                    elif op == FLOAT:
+                        r[code[pc + 3]] = float(r[code[pc + 1]])
+                    elif op == LT:
+                        r[code[pc + 3]] = 1 if r[code[pc + 1]] < r[code[pc + 2]] else 0
+                    elif op == GT:
+                        r[code[pc + 3]] = 1 if r[code[pc + 1]] > r[code[pc + 2]] else 0
+                    elif op == LE:
+                        r[code[pc + 3]] = 1 if r[code[pc + 1]] <= r[code[pc + 2]] else 0
+                    elif op == GE:
+                        r[code[pc + 3]] = 1 if r[code[pc + 1]] >= r[code[pc + 2]] else 0
+                    elif op == EQ:
+                        r[code[pc + 3]] = 1 if r[code[pc + 1]] == r[code[pc + 2]] else 0
+                    else:
+                        r[code[pc + 3]] = 1 if r[code[pc + 1]] != r[code[pc + 2]] else 0
+
+                    pc += 4
+
+                elif op == GOTO:
+                    target = code[pc + 3]
+                    if target < pc:
+                        jumps -= 1
+                        if not jumps:
+                            raise ExecutionError(
+                                "Límite de iteraciones alcanzado (¿ciclo infinito?)"
+                            )
+                    pc = target
+
+                elif op == JNLT:
+                    pc = pc + 4 if r[code[pc + 1]] < r[code[pc + 2]] else code[pc + 3]
+                elif op == JNGT:
+                    pc = pc + 4 if r[code[pc + 1]] > r[code[pc + 2]] else code[pc + 3]
+                elif op == JNLE:
+                    pc = pc + 4 if r[code[pc + 1]] <= r[code[pc + 2]] else code[pc + 3]
+                elif op == JNGE:
+                    pc = pc + 4 if r[code[pc + 1]] >= r[code[pc + 2]] else code[pc + 3]
+                elif op == JNEQ:
+                    pc = pc + 4 if r[code[pc + 1]] == r[code[pc + 2]] else code[pc + 3]
+                elif op == JNNE:
+                    pc = pc + 4 if r[code[pc + 1]] != r[code[pc + 2]] else code[pc + 3]
+
+                else:   # IFFALSE
+                    pc = code[pc + 3] if r[code[pc + 1]] == 0 else pc + 4
+
+        except ZeroDivisionError:
+            raise ExecutionError("División entre cero") from None
+
+        except OverflowError:
+            raise ExecutionError("Desbordamiento numérico") from None
+
+        finally:
+            self.steps = steps
+
+        return self.values()
+
+    # valores finales de las variables del programa
+    def values(self):
+        registers = self.registers
+        return [
+            (name, registers[slot])
+            for slot, name in self.bytecode.variables()
+        ]
+
+
+def execute(ir, max_jumps=MAX_JUMPS):
+    return VM(assemble(ir), max_jumps).run()
+
+
+# =========================
+# EJECUCIÓN DESDE TERMINAL
+# =========================
+
+def main():
+
+    # pipeline importa este módulo: se carga recién al correr main()
+    try:
+        from .optimizer import level_from_args
+        from .pipeline import phase_output, use_disk_cache
+    except ImportError:
+        from optimizer import level_from_args
+        from pipeline import phase_output, use_disk_cache
+
+    level, args = level_from_args(sys.argv[1:])
+
+    # --native: code object de CPython en lugar de la máquina virtual
+    phase = "execution"
+    if "--native" in args:
+        args.remove("--native")
+        phase = "native-execution"
+
+    if not args:
+        print("Uso: python executor.py [-O0|-O1|-O2] [--native] archivo.txt")
+        return
+
+    with open(args[0], "r", encoding="utf-8") as f:
+        code = f.read()
+
+    use_disk_cache()
+    result = phase_output(phase, code, level=level)
+
+    for name, value in result["values"]:
+        print(f"{name} = {value}")
+
+    for error in result["errors"]:
+        print(f" Error: {error['message']}")
+
+    if result["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+from array import array
+from bisect import bisect_left
+
+try:
+    from .lexer import MASTER_PATTERN, LOOKAHEAD
+    from .tokens import TOKEN_IDS
+    from .token_buffer import TokenBuffer
+except ImportError:
+    from lexer import MASTER_PATTERN, LOOKAHEAD
+    from tokens import TOKEN_IDS
+    from token_buffer import TokenBuffer
+
+
+# número de grupo del patrón maestro -> id del tipo (incluye MISMATCH)
+GROUP_KINDS = {
+    index: TOKEN_IDS[name]
+    for name, index in MASTER_PATTERN.groupindex.items()
+}
+
+# tamaño de los bloques de texto: uno que pasa de CHUNK_MAX se parte y
+# uno que baja de CHUNK_MIN se junta con el vecino
+CHUNK_SIZE = 4096
+CHUNK_MAX = 2 * CHUNK_SIZE
+CHUNK_MIN = CHUNK_SIZE // 4
+
+# texto que se lee después de la edición en el primer intento; si no
+# alcanza para volver a sincronizar se duplica
+WINDOW = 256
+
+
+# =========================
+# SUMAS ACUMULADAS (árbol de Fenwick)
+# Largo de cada bloque de texto: el inicio de un bloque y el bloque que
+# contiene un desplazamiento se calculan en O(log n), y cambiar el largo
+# de un bloque también cuesta O(log n).
+# =========================
+
+class Fenwick:
+
+    def __init__(self, values):
+        tree = [0]
+        tree.extend(values)
+
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+
+        self.tree = tree
+        self.total = self.prefix(len(tree) - 1)
+
+    def add(self, index, delta):
+
+        tree = self.tree
+        index += 1
+        self.total += delta
+
+        while index < len(tree):
+            tree[index] += delta
+            index += index & -index
+
+    # suma de los primeros count valores
+    def prefix(self, count):
+
+        tree = self.tree
+        total = 0
+
+        while count:
+            total += tree[count]
+            count -= count & -count
+
+        return total
+
+    # cuántos valores del principio suman <= offset, y cuánto suman
+    def search(self, offset):
+
+        tree = self.tree
+        index = 0
+        total = 0
+        step = 1 << (len(tree).bit_length() - 1)
+
+        while step:
+            candidate = index + step
+            if candidate < len(tree) and total + tree[candidate] <= offset:
+                index = candidate
+                total += tree[candidate]
+            step >>= 1
+
+        return index, total
+
+
+# =========================
+# LEXER INCREMENTAL
+# Mantiene los tokens al día aplicando las ediciones del documento.
+# Solo se vuelve a escanear desde el último token estable antes de la
+# edición hasta que la secuencia nueva coincide otra vez con la
+# anterior.
+#
+# El texto se guarda en bloques de unos CHUNK_SIZE caracteres y cada
+# token va en el bloque donde empieza, con sus desplazamientos
+# relativos al inicio del bloque. Una edición reescribe solo los
+# bloques que toca: los tokens de los bloques siguientes no cambian y
+# sus inicios salen del árbol de Fenwick. Así una edición cuesta lo
+# mismo en un archivo de 10 líneas que en uno de 50 000, y también
+# editar alternando entre dos puntos alejados.
+#
+# El texto completo y el TokenBuffer plano (source, token_buffer()) se
+# arman la primera vez que se piden después de una edición.
+# =========================
+
+class IncrementalLexer:
+
+    def __init__(self, source=""):
+        self.reset(source)
+
+    def reset(self, source):
+
+        texts = [
+            source[i:i + CHUNK_SIZE] for i in range(0, len(source), CHUNK_SIZE)
+        ] or [""]
+
+        kinds = [array("B") for _ in texts]
+        starts = [array("i") for _ in texts]
+        ends = [array("i") for _ in texts]
+        group_kinds = GROUP_KINDS
+
+        for match in MASTER_PATTERN.finditer(source):
+            group = match.lastindex
+            start, end = match.span(group)
+            chunk = start // CHUNK_SIZE
+            base = chunk * CHUNK_SIZE
+
+            kinds[chunk].append(group_kinds[group])
+            starts[chunk].append(start - base)
+            ends[chunk].append(end - base)
+
+        self.texts = texts
+        self.kinds = kinds
+        self.starts = starts
+        self.ends = ends
+        self.sizes = Fenwick(len(text) for text in texts)
+
+        self._source = source
+        self._buffer = None
+
+    @property
+    def length(self):
+        return self.sizes.total
+
+    @property
+    def source(self):
+        if self._source is None:
+            self._source = "".join(self.texts)
+        return self._source
+
+    # bloque que contiene offset y su inicio (el final del texto cae en
+    # el último bloque)
+    def _locate(self, offset):
+
+        chunk, base = self.sizes.search(offset)
+
+        if chunk == len(self.texts):
+            chunk -= 1
+            base -= len(self.texts[chunk])
+
+        return chunk, base
+
+    def text(self, start, end):
+
+        chunk, base = self._locate(start)
+        texts = self.texts
+        parts = []
+
+        while chunk < len(texts) and base < end:
+            text = texts[chunk]
+            parts.append(text[max(start - base, 0):end - base])
+            base += len(text)
+            chunk += 1
+
+        return "".join(parts)
+
+    # (bloque, índice, inicio del bloque) del primer token cuyo final
+    # es >= offset; el índice puede ser el largo del bloque (el token
+    # está en un bloque siguiente o no hay más)
+    def _find(self, offset):
+
+        chunk, base = self._locate(offset)
+        index = bisect_left(self.ends[chunk], offset - base)
+
+        # un token largo que empieza en un bloque anterior puede
+        # terminar después de offset
+        while index == 0 and chunk > 0:
+            previous = base - len(self.texts[chunk - 1])
+            ends = self.ends[chunk - 1]
+
+            if ends and ends[-1] + previous < offset:
+                break
+
+            chunk -= 1
+            base = previous
+            index = bisect_left(ends, offset - base)
+
+        return chunk, index, base
+
+    # inicio de la palabra o número que contiene offset: una secuencia
+    # de letras, dígitos, "_" y "." se reconoce entera o carácter por
+    # carácter según cómo termina (\b), así que una edición al final
+    # puede cambiar sus primeros tokens
+    def _word_start(self, offset):
+
+        while offset:
+            chunk, base = self._locate(offset - 1)
+            text = self.texts[chunk]
+            index = offset - base
+
+            while index and (text[index - 1].isalnum() or text[index - 1] in "_."):
+                index -= 1
+
+            if index:
+                return base + index
+            offset = base
+
+        return 0
+
+    # (bloque, índice, inicio, final, tipo) de cada token desde
+    # (chunk, index), con desplazamientos absolutos
+    def _tokens_from(self, chunk, index, base):
+
+        texts = self.texts
+
+        while chunk < len(texts):
+            kinds = self.kinds[chunk]
+            starts = self.starts[chunk]
+            ends = self.ends[chunk]
+
+            for i in range(index, len(kinds)):
+                yield chunk, i, starts[i] + base, ends[i] + base, kinds[i]
+
+            base += len(texts[chunk])
+            chunk += 1
+            index = 0
+
+    # =========================
+    # EDICIÓN
+    # position, removed: rango reemplazado en el texto anterior
+    # added: texto insertado en su lugar
+    # =========================
+    def apply_edit(self, position, removed, added):
+
+        delta = len(added) - removed
+        length = self.length
+
+        # los tokens que terminan cerca de la edición pueden cambiar
+        # (p. ej. "3" seguido de ".5"), así que se retrocede LOOKAHEAD
+        first = self._find(self._word_start(max(position - LOOKAHEAD, 0)))
+        token = next(self._tokens_from(*first), None)
+        restart = position if token is None else min(token[2], position)
+
+        # el texto nuevo alrededor de la edición, con un carácter antes
+        # de restart (\b mira el carácter anterior); si el escaneo llega
+        # al final de la ventana sin sincronizar, se agranda
+        context = 1 if restart else 0
+        size = position + removed - restart + WINDOW
+
+        while True:
+            stop = min(restart + size, length)
+            window = self.text(restart - context, stop)
+            cut = position - restart + context
+            window = window[:cut] + added + window[cut + removed:]
+
+            scanned = self._scan(
+                window, restart - context, context, first,
+                position + len(added), delta, stop == length,
+            )
+            if scanned is not None:
+                break
+            size *= 2
+
+        kinds, starts, ends, last = scanned
+        self._splice(position, removed, added, restart, first, last, kinds, starts, ends)
+
+    # escanea la ventana hasta volver a sincronizar con los tokens
+    # anteriores (desde first) o hasta el final del texto; None si la
+    # ventana no alcanzó
+    def _scan(self, window, offset, pos, first, edit_end, delta, complete):
+
+        kinds = []
+        starts = []
+        ends = []
+        group_kinds = GROUP_KINDS
+
+        # una coincidencia que termina a menos de LOOKAHEAD del final
+        # de la ventana puede cambiar con el texto siguiente
+        limit = offset + len(window) - (0 if complete else LOOKAHEAD)
+
+        old = self._tokens_from(*first)
+        token = next(old, None)
+
+        for match in MASTER_PATTERN.finditer(window, pos):
+
+            group = match.lastindex
+            start, end = match.span(group)
+            start += offset
+            end += offset
+
+            if end > limit:
+                return None
+
+            kind = group_kinds[group]
+
+            if start >= edit_end:
+
+                # avanzar en los tokens anteriores hasta esta posición
+                old_start = start - delta
+                while token is not None and token[2] < old_start:
+                    token = next(old, None)
+
+                if (
+                    token is not None
+                    and token[2] == old_start
+                    and token[3] == end - delta
+                    and token[4] == kind
+                ):
+                    return kinds, starts, ends, (token[0], token[1])
+
+            kinds.append(kind)
+            starts.append(start)
+            ends.append(end)
+
+        if not complete:
+            return None
+
+        chunk = len(self.texts) - 1
+        return kinds, starts, ends, (chunk, len(self.kinds[chunk]))
+
+    # =========================
+    # BLOQUES
+    # Los bloques que tocan la edición (y los tokens quitados) se
+    # juntan en uno, se aplica la edición y se vuelve a partir si quedó
+    # grande. Los tokens anteriores a first y desde last se conservan
+    # con sus desplazamientos relativos al bloque nuevo.
+    # =========================
+    def _splice(self, position, removed, added, restart, first, last, kinds, starts, ends):
+
+        texts = self.texts
+        delta = len(added) - removed
+
+        low, base = self._locate(restart)
+        high, _ = self._locate(position + removed)
+
+        first_chunk, first_index, _ = first
+        last_chunk, last_index = last
+        high = max(high, last_chunk)
+
+        size = sum(len(texts[chunk]) for chunk in range(low, high + 1)) + delta
+
+        # un bloque chico se junta con el siguiente (o con el anterior
+        # si es el último)
+        if size < CHUNK_MIN:
+            if high + 1 < len(texts):
+                high += 1
+            elif low > 0:
+                low -= 1
+                base -= len(texts[low])
+
+        merged_kinds = array("B")
+        merged_starts = array("i")
+        merged_ends = array("i")
+
+        def keep(chunk, begin, end, shift):
+            merged_kinds.extend(self.kinds[chunk][begin:end])
+            if shift:
+                merged_starts.extend([offset + shift for offset in self.starts[chunk][begin:end]])
+                merged_ends.extend([offset + shift for offset in self.ends[chunk][begin:end]])
+            else:
+                merged_starts.extend(self.starts[chunk][begin:end])
+                merged_ends.extend(self.ends[chunk][begin:end])
+
+        # tokens anteriores a la edición
+        chunk_base = base
+        for chunk in range(low, high + 1):
+            if chunk > first_chunk:
+                break
+            end = first_index if chunk == first_chunk else len(self.kinds[chunk])
+            keep(chunk, 0, end, chunk_base - base)
+            chunk_base += len(texts[chunk])
+
+        # tokens nuevos
+        merged_kinds.extend(kinds)
+        merged_starts.extend(start - base for start in starts)
+        merged_ends.extend(end - base for end in ends)
+
+        # tokens posteriores, corridos por delta
+        chunk_base = base
+        for chunk in range(low, high + 1):
+            if chunk >= last_chunk:
+                begin = last_index if chunk == last_chunk else 0
+                keep(chunk, begin, len(self.kinds[chunk]), chunk_base - base + delta)
+            chunk_base += len(texts[chunk])
+
+        text = "".join(texts[low:high + 1])
+        cut = position - base
+        text = text[:cut] + added + text[cut + removed:]
+
+        # partir en bloques parejos si quedó grande
+        count = -(-len(text) // CHUNK_SIZE) if len(text) > CHUNK_MAX else 1
+        step = -(-len(text) // count)
+
+        new_texts = []
+        new_kinds = []
+        new_starts = []
+        new_ends = []
+
+        for i in range(count):
+            begin = i * step
+            end = len(text) if i == count - 1 else begin + step
+            a = bisect_left(merged_starts, begin) if i else 0
+            b = bisect_left(merged_starts, end) if i < count - 1 else len(merged_starts)
+
+            new_texts.append(text[begin:end])
+            new_kinds.append(merged_kinds[a:b])
+            if begin:
+                new_starts.append(array("i", [offset - begin for offset in merged_starts[a:b]]))
+                new_ends.append(array("i", [offset - begin for offset in merged_ends[a:b]]))
+            else:
+                new_starts.append(merged_starts[a:b])
+                new_ends.append(merged_ends[a:b])
+
+        old_sizes = [len(texts[chunk]) for chunk in range(low, high + 1)]
+
+        texts[low:high + 1] = new_texts
+        self.kinds[low:high + 1] = new_kinds
+        self.starts[low:high + 1] = new_starts
+        self.ends[low:high + 1] = new_ends
+
+        # mismo número de bloques: solo cambian sus largos
+        if count == len(old_sizes):
+            for i, old_size in enumerate(old_sizes):
+                if len(new_texts[i]) != old_size:
+                    self.sizes.add(low + i, len(new_texts[i]) - old_size)
+        else:
+            self.sizes = Fenwick(len(text) for text in texts)
+
+        self._source = None
+        self._buffer = None
+
+    # TokenBuffer con los desplazamientos absolutos
+    def token_buffer(self):
+
+        if self._buffer is None:
+            buffer = TokenBuffer(self.source)
+            base = 0
+
+            for text, kinds, starts, ends in zip(self.texts, self.kinds, self.starts, self.ends):
+                buffer.kinds.extend(kinds)
+                if base:
+                    buffer.starts.extend([offset + base for offset in starts])
+                    buffer.ends.extend([offset + base for offset in ends])
+                else:
+                    buffer.starts.extend(starts)
+                    buffer.ends.extend(ends)
+                base += len(text)
+
+            self._buffer = buffer
+
+        return self._buffer
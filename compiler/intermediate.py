@@ -0,0 +1,399 @@
+import math
+import sys
+from array import array
+
+try:
+    from .ast_nodes import Assign, BinOp, Block, Decl, If, Num, Var, While
+    from .semantic import SymbolTable, combine
+except ImportError:
+    from ast_nodes import Assign, BinOp, Block, Decl, If, Num, Var, While
+    from semantic import SymbolTable, combine
+
+
+# =========================
+# CÓDIGO INTERMEDIO (CUÁDRUPLOS)
+# Cada instrucción es (op, arg1, arg2, resultado) guardada por columnas
+# en cuatro arrays: unos 13 bytes por instrucción en lugar de un objeto
+# o una tupla por cuádruplo.
+#
+# Operandos:
+#   0       sin operando
+#   n > 0   casilla n (variable o temporal, ver names)
+#   n < 0   constante -n - 1 de la tabla de constantes
+# En los saltos el resultado es el índice de la instrucción destino.
+# =========================
+
+NONE = 0
+
+(COPY, ADD, SUB, MUL, DIV, IDIV, LT, GT, LE, GE, EQ, NE,
+ NEG, FLOAT, GOTO, IFFALSE) = range(16)
+
+OPCODE_NAMES = (
+    "copy", "add", "sub", "mul", "div", "idiv", "lt", "gt", "le", "ge",
+    "eq", "ne", "neg", "float", "goto", "iffalse",
+)
+
+# operador del AST -> código de operación (la división entera se elige
+# según los tipos)
+BINARY_OPS = {
+    "+": ADD, "-": SUB, "*": MUL, "/": DIV,
+    "<": LT, ">": GT, "<=": LE, ">=": GE, "==": EQ, "!=": NE,
+}
+
+SYMBOLS = {
+    ADD: "+", SUB: "-", MUL: "*", DIV: "/", IDIV: "/",
+    LT: "<", GT: ">", LE: "<=", GE: ">=", EQ: "==", NE: "!=",
+}
+
+
+# clave de una constante en la tabla: lleva el tipo porque 1 == 1.0, y
+# en los float el signo porque -0.0 == 0.0 (1 / -0.0 no es 1 / 0.0)
+def constant_key(value):
+    if isinstance(value, float):
+        return (float, value, math.copysign(1.0, value))
+    return (type(value), value)
+
+
+class IRCode:
+
+    def __init__(self):
+        self.ops = array("B")
+        self.arg1 = array("i")
+        self.arg2 = array("i")
+        self.result = array("i")
+
+        # tabla de constantes (ver constant_key)
+        self.constants = []
+        self.constant_ids = {}
+
+        # casilla -> nombre y tipo ("int", "float"; None en temporales)
+        self.names = [None]
+        self.types = [None]
+
+    def __len__(self):
+        return len(self.ops)
+
+    def emit(self, op, arg1=NONE, arg2=NONE, result=NONE):
+        self.ops.append(op)
+        self.arg1.append(arg1)
+        self.arg2.append(arg2)
+        self.result.append(result)
+        return len(self.ops) - 1
+
+    def constant(self, value):
+
+        key = constant_key(value)
+        operand = self.constant_ids.get(key)
+
+        if operand is None:
+            self.constants.append(value)
+            operand = -len(self.constants)
+            self.constant_ids[key] = operand
+
+        return operand
+
+    def slot(self, name, type_name=None):
+        self.names.append(name)
+        self.types.append(type_name)
+        return len(self.names) - 1
+
+    @property
+    def slot_count(self):
+        return len(self.names)
+
+    # columnas más las tablas de constantes y casillas
+    def nbytes(self):
+        tables = (self.constants, self.names, self.types)
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.ops, self.arg1, self.arg2, self.result)
+        ) + sum(sys.getsizeof(table) for table in tables) + sum(
+            sys.getsizeof(item) for item in self.constants + self.names
+        )
+
+    # =========================
+    # TEXTO
+    # Las líneas se arman solo cuando se piden: el dock y la terminal
+    # las consumen por partes.
+    # =========================
+    def operand(self, operand):
+        if operand < 0:
+            return repr(self.constants[-operand - 1])
+        return self.names[operand]
+
+    def format(self, index):
+
+        op = self.ops[index]
+        result = self.result[index]
+        text = self.operand
+
+        if op == GOTO:
+            return f"goto {result}"
+
+        if op == IFFALSE:
+            return f"iffalse {text(self.arg1[index])} goto {result}"
+
+        target = self.names[result]
+        arg1 = text(self.arg1[index])
+
+        if op == COPY:
+            return f"{target} = {arg1}"
+
+        if op == NEG:
+            return f"{target} = -{arg1}"
+
+        if op == FLOAT:
+            return f"{target} = float({arg1})"
+
+        return f"{target} = {arg1} {SYMBOLS[op]} {text(self.arg2[index])}"
+
+    def lines(self, start=0, stop=None):
+
+        if stop is None:
+            stop = len(self)
+
+        width = len(str(max(stop - 1, 0)))
+
+        for index in range(start, stop):
+            yield f"{index:>{width}}: {self.format(index)}"
+
+
+# =========================
+# GENERADOR
+# Recorre el AST de un programa sin errores semánticos. Las variables
+# se resuelven con la misma tabla de ámbitos del análisis semántico; una
+# variable que oculta a otra recibe su propia casilla (x, x.1, ...).
+#
+# Los temporales se liberan en cuanto se usan (t1, t2, ... según la
+# profundidad de la expresión), así su número no crece con el tamaño
+# del programa, y la operación más externa de una asignación escribe
+# directo en la variable.
+# =========================
+
+class IRGenerator:
+
+    def __init__(self):
+        self.code = IRCode()
+        self.table = SymbolTable()
+        self.slots = {}
+        self.declared = {}
+        self.temps = []
+        self.depth = 0
+
+    def generate(self, program):
+        for node in program.body:
+            self.statement(node)
+        return self.code
+
+    def variable(self, name, type_name):
+
+        count = self.declared.get(name, 0)
+        self.declared[name] = count + 1
+
+        text = name if count == 0 else f"{name}.{count}"
+        return self.code.slot(text, type_name)
+
+    def lookup(self, name):
+        symbol = self.table.lookup(name)
+        return self.slots[symbol], symbol.type
+
+    def temp(self):
+
+        if self.depth == len(self.temps):
+            self.temps.append(self.code.slot(f"t{self.depth + 1}"))
+
+        self.depth += 1
+        return self.temps[self.depth - 1]
+
+    def release(self, operand):
+        if operand > 0 and self.depth and operand == self.temps[self.depth - 1]:
+            self.depth -= 1
+
+    # =========================
+    # SENTENCIAS
+    # =========================
+    def statement(self, node):
+
+        kind = type(node)
+        code = self.code
+
+        if kind is Assign:
+            slot, type_name = self.lookup(node.name)
+            self.store(node.value, slot, type_name)
+
+        elif kind is Decl:
+            # el valor se evalúa antes de declarar: en "float x = x;"
+            # dentro de un bloque, la x de la derecha es la de afuera
+            slot = self.variable(node.name, node.type_name)
+
+            if node.value is None:
+                zero = 0.0 if node.type_name == "float" else 0
+                code.emit(COPY, code.constant(zero), NONE, slot)
+            else:
+                self.store(node.value, slot, node.type_name)
+
+            self.slots[self.table.declare(node.name, node.type_name)] = slot
+
+        elif kind is Block:
+            self.table.enter()
+            for child in node.body:
+                self.statement(child)
+            self.table.exit()
+
+        elif kind is If:
+            jump = self.condition(node.cond)
+            self.statement(node.then)
+
+            if node.orelse is None:
+                code.result[jump] = len(code)
+            else:
+                skip = code.emit(GOTO)
+                code.result[jump] = len(code)
+                self.statement(node.orelse)
+                code.result[skip] = len(code)
+
+        elif kind is While:
+            start = len(code)
+            jump = self.condition(node.cond)
+            self.statement(node.body)
+            code.emit(GOTO, NONE, NONE, start)
+            code.result[jump] = len(code)
+
+    # salto condicional con destino pendiente
+    def condition(self, node):
+        operand, _ = self.expression(node)
+        self.release(operand)
+        return self.code.emit(IFFALSE, operand)
+
+    # asignación del valor de node a la casilla slot
+    def store(self, node, slot, type_name):
+
+        code = self.code
+        cast = type_name == "float"
+
+        if type(node) is Num:
+            value = float(node.value) if cast else node.value
+            code.emit(COPY, code.constant(value), NONE, slot)
+            return
+
+        operand, value_type = self.expression(node, slot, type_name)
+
+        if operand == slot:
+            return
+
+        self.release(operand)
+
+        if cast and value_type == "int":
+            code.emit(FLOAT, operand, NONE, slot)
+        else:
+            code.emit(COPY, operand, NONE, slot)
+
+    # =========================
+    # EXPRESIONES
+    # Devuelve (operando, tipo). Con target, la operación más externa
+    # escribe en esa casilla si no hace falta convertir a float.
+    # =========================
+    def expression(self, node, target=NONE, target_type=None):
+
+        code = self.code
+        root = node
+        stack = [(node, False)]
+        values = []
+
+        while stack:
+            node, done = stack.pop()
+            kind = type(node)
+
+            if kind is Num:
+                values.append((code.constant(node.value), type(node.value).__name__))
+
+            elif kind is Var:
+                values.append(self.lookup(node.name))
+
+            elif not done:
+                stack.append((node, True))
+                if kind is BinOp:
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                else:
+                    stack.append((node.operand, False))
+
+            elif kind is BinOp:
+                right, right_type = values.pop()
+                left, left_type = values.pop()
+                self.release(right)
+                self.release(left)
+
+                value_type = combine(node.op, left_type, right_type)
+                op = BINARY_OPS[node.op]
+                if op == DIV and value_type == "int":
+                    op = IDIV
+
+                result = self.result(node is root, target, target_type, value_type)
+                code.emit(op, left, right, result)
+                values.append((result, value_type))
+
+            else:
+                operand, value_type = values.pop()
+                self.release(operand)
+
+                result = self.result(node is root, target, target_type, value_type)
+                code.emit(NEG, operand, NONE, result)
+                values.append((result, value_type))
+
+        return values[-1]
+
+    def result(self, is_root, target, target_type, value_type):
+        if is_root and target and not (target_type == "float" and value_type == "int"):
+            return target
+        return self.temp()
+
+
+def generate(program):
+    return IRGenerator().generate(program)
+
+
+# =========================
+# EJECUCIÓN DESDE TERMINAL
+# =========================
+
+def main():
+
+    # optimizer y pipeline importan este módulo: se cargan recién al
+    # correr main()
+    try:
+        from .optimizer import format_stats, level_from_args
+        from .pipeline import phase_output, use_disk_cache
+    except ImportError:
+        from optimizer import format_stats, level_from_args
+        from pipeline import phase_output, use_disk_cache
+
+    level, args = level_from_args(sys.argv[1:])
+
+    if not args:
+        print("Uso: python intermediate.py [-O0|-O1|-O2] archivo.txt")
+        return
+
+    with open(args[0], "r", encoding="utf-8") as f:
+        code = f.read()
+
+    use_disk_cache()
+    result = phase_output("intermediate", code, level=level)
+
+    for error in result["errors"]:
+        print(f" Error: {error['message']}")
+
+    if result["errors"]:
+        sys.exit(1)
+
+    # las líneas se escriben a medida que se arman
+    write = sys.stdout.write
+    for line in result["code"].lines():
+        write(line + "\n")
+
+    if result["passes"]:
+        print(format_stats(result["passes"]), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,256 @@
+import codecs
+import mmap
+import os
 import re
 import sys
-from tokens import TOKEN_TYPES
+
+try:
+    from .tokens import TOKEN_TYPES, TOKEN_IDS
+    from .token_buffer import MAX_ERRORS, Token, TokenBuffer, syntax_error
+except ImportError:
+    from tokens import TOKEN_TYPES, TOKEN_IDS
+    from token_buffer import MAX_ERRORS, Token, TokenBuffer, syntax_error
+
+
+# =========================
+# PATRÓN MAESTRO
+# Una sola alternancia con grupos nombrados, construida una vez por
+# proceso. Los espacios se consumen al inicio de cada coincidencia y
+# el orden de TOKEN_TYPES se respeta: gana la primera alternativa que
+# coincide, igual que el recorrido anterior.
+# =========================
+
+def build_master_pattern(token_types):
+
+    parts = []
+
+    for token_type, pattern in token_types.items():
+        parts.append(f"(?P<{token_type}>{pattern})")
+
+    # cualquier otro carácter visible es un token desconocido
+    parts.append(r"(?P<MISMATCH>\S)")
+
+    return re.compile(r"\s*(?:" + "|".join(parts) + ")")
+
+
+MASTER_PATTERN = build_master_pattern(TOKEN_TYPES)
+
+MISMATCH = TOKEN_IDS["MISMATCH"]
+
+# número de grupo del patrón maestro -> id del tipo de token
+GROUP_KINDS = {
+    index: TOKEN_IDS[name]
+    for name, index in MASTER_PATTERN.groupindex.items()
+    if name in TOKEN_TYPES
+}
+
+# número de grupo del patrón maestro -> nombre del tipo (con MISMATCH)
+GROUP_NAMES = {
+    index: name for name, index in MASTER_PATTERN.groupindex.items()
+}
+
+# tamaño de bloque al leer archivos por partes
+CHUNK_SIZE = 1 << 20
+
+# una coincidencia que termina a menos de LOOKAHEAD caracteres del final
+# del bloque puede cambiar con el texto siguiente (p. ej. "3" + ".5"),
+# así que se vuelve a escanear junto con el siguiente bloque
+LOOKAHEAD = 32
+
+
+# =========================
+# LECTURA POR BLOQUES
+# =========================
+
+def read_chunks(file_path, chunk_size=CHUNK_SIZE):
+
+    with open(file_path, "rb") as f:
+
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+
+            # decodificador incremental: un carácter UTF-8 puede quedar
+            # partido entre dos bloques
+            decoder = codecs.getincrementaldecoder("utf-8")()
+
+            for offset in range(0, len(data), chunk_size):
+                text = decoder.decode(data[offset:offset + chunk_size])
+                if text:
+                    yield text
+
+            text = decoder.decode(b"", final=True)
+            if text:
+                yield text
+
+
+# tokens desde cualquier desplazamiento del código (reanálisis
+# incremental); los caracteres desconocidos salen como MISMATCH
+def scan_tokens(source, start=0):
+
+    names = GROUP_NAMES
+
+    for match in MASTER_PATTERN.finditer(source, start):
+        group = match.lastindex
+        token_start, end = match.span(group)
+        yield Token(names[group], source[token_start:end], None, None, token_start)
 
 
 class Lexer:
 
-    def __init__(self, code):
+    def __init__(self, code="", chunks=None):
         self.code = code
-        self.tokens = []
+        self.chunks = chunks
+        self.tokens = TokenBuffer(code)
+        self.errors = []
+
+    @classmethod
+    def from_file(cls, file_path, chunk_size=CHUNK_SIZE):
+        return cls(chunks=read_chunks(file_path, chunk_size))
+
+    def report(self, error, recover):
+
+        if not recover:
+            raise error
+
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(error)
+
+    # =========================
+    # TOKENS EN UN TokenBuffer
+    # Solo se guardan el id del tipo y los desplazamientos; los lexemas
+    # se obtienen del código fuente cuando se piden.
+    #
+    # Con recover=True un carácter desconocido no detiene el análisis:
+    # se guarda como token MISMATCH y el error va a self.errors.
+    # =========================
+    def tokenize(self, recover=False):
+
+        if self.chunks is not None:
+            self.code = "".join(self.chunks)
+            self.chunks = None
+            self.tokens = TokenBuffer(self.code)
+
+        tokens = self.tokens
+        add_kind = tokens.kinds.append
+        add_start = tokens.starts.append
+        add_end = tokens.ends.append
+        group_kinds = GROUP_KINDS
+
+        for match in MASTER_PATTERN.finditer(self.code):
 
-    def tokenize(self):
+            group = match.lastindex
+            start, end = match.span(group)
+            kind = group_kinds.get(group)
 
-        position = 0
+            if kind is None:
+                line, col = tokens.line_col(start)
+                self.report(syntax_error(
+                    f"Token desconocido: {match[group]}", line, col
+                ), recover)
+                kind = MISMATCH
 
-        while position < len(self.code):
+            add_kind(kind)
+            add_start(start)
+            add_end(end)
 
-            match = None
+        return tokens
 
-            # ignorar espacios
-            if self.code[position].isspace():
-                position += 1
-                continue
+    # =========================
+    # TOKENS BAJO DEMANDA
+    # Genera los tokens uno a uno sin guardar la lista completa.
+    # Con una fuente por bloques solo se mantiene en memoria el bloque
+    # actual más el token que quedó partido en el borde.
+    # =========================
+    def iter_tokens(self, recover=False):
 
-            for token_type, pattern in TOKEN_TYPES.items():
+        chunks = iter((self.code,) if self.chunks is None else self.chunks)
+        chunk = next(chunks, None)
 
-                regex = re.compile(pattern)
-                match = regex.match(self.code, position)
+        pending = ""
+        base = 0        # desplazamiento absoluto del inicio del bloque
+        line = 1
+        line_start = 0  # desplazamiento absoluto del inicio de la línea
 
-                if match:
-                    lexeme = match.group(0)
+        while chunk is not None:
 
-                    self.tokens.append((token_type, lexeme))
+            next_chunk = next(chunks, None)
 
-                    position = match.end()
+            buffer = pending + chunk
+            limit = len(buffer)
+            if next_chunk is not None:
+                limit -= LOOKAHEAD
+
+            cut = len(buffer)
+            counted = 0
+
+            for match in MASTER_PATTERN.finditer(buffer):
+
+                if match.end() > limit:
+                    cut = match.start()
                     break
 
-            if not match:
-                raise SyntaxError(
-                    f"Token desconocido: {self.code[position]}"
+                token_type = match.lastgroup
+                start = match.start(token_type)
+
+                newlines = buffer.count("\n", counted, start)
+                if newlines:
+                    line += newlines
+                    line_start = base + buffer.rfind("\n", counted, start) + 1
+                counted = start
+
+                col = base + start - line_start + 1
+
+                if token_type == "MISMATCH":
+                    self.report(syntax_error(
+                        f"Token desconocido: {match[token_type]}", line, col
+                    ), recover)
+
+                yield Token(
+                    token_type, match[token_type], line, col, base + start
                 )
 
-        return self.tokens
+            newlines = buffer.count("\n", counted, cut)
+            if newlines:
+                line += newlines
+                line_start = base + buffer.rfind("\n", counted, cut) + 1
+
+            pending = buffer[cut:]
+            base += cut
+            chunk = next_chunk
 
 
 # -------- ejecución desde terminal --------
 if __name__ == "__main__":
 
+    try:
+        from .disk_cache import DiskCache
+        from .pipeline import phase_output, use_disk_cache
+    except ImportError:
+        from disk_cache import DiskCache
+        from pipeline import phase_output, use_disk_cache
+
     file_path = sys.argv[1]
+    cache = DiskCache()
+
+    if not cache.fits(os.path.getsize(file_path)):
+        for t in Lexer.from_file(file_path).iter_tokens():
+            print(t)
+        sys.exit(0)
 
     with open(file_path, "r", encoding="utf-8") as f:
         code = f.read()
 
-    lexer = Lexer(code)
-    tokens = lexer.tokenize()
+    # con la caché en disco un archivo sin cambios no se vuelve a analizar
+    use_disk_cache(cache)
+    result = phase_output("lexer", code)
+
+    for t in result["tokens"]:
+        print(t)
+
+    for error in result["errors"]:
+        print(f"Error léxico: {error['message']}", file=sys.stderr)
 
-    for t in tokens:
-        print(t)
\ No newline at end of file
+    if result["errors"]:
+        sys.exit(1)
@@ -0,0 +1,318 @@
+import ast
+
+try:
+    from .ast_nodes import (
+        INT_MAX, INT_MIN, Assign, BinOp, Block, Decl, If, Num, Var, While,
+        wrap_int,
+    )
+    from .executor import MAX_JUMPS, ExecutionError
+    from .semantic import SymbolTable, combine
+except ImportError:
+    from ast_nodes import (
+        INT_MAX, INT_MIN, Assign, BinOp, Block, Decl, If, Num, Var, While,
+        wrap_int,
+    )
+    from executor import MAX_JUMPS, ExecutionError
+    from semantic import SymbolTable, combine
+
+
+# =========================
+# BACKEND NATIVO (CPython)
+# El AST del programa se traduce a un ast.Module de Python con una sola
+# función y se compila con compile(): el programa corre como bytecode
+# de CPython, con las variables como locales rápidas.
+#
+# Cada variable del programa es una local "_<n>_<nombre>" (n cuenta las
+# declaraciones con ese nombre), así no choca con palabras reservadas
+# de Python ni con las variables que oculta. Los resultados son los
+# mismos que en la máquina virtual: división entera truncada, int de 64
+# bits que dan la vuelta, float() al asignar un int a un float y el
+# mismo límite de iteraciones.
+# =========================
+
+FUNCTION = "programa"
+
+# profundidad a partir de la cual una subexpresión se guarda en una
+# local: compile() no acepta expresiones anidadas sin límite
+SPILL_DEPTH = 100
+
+ARITHMETIC = {"+": ast.Add, "-": ast.Sub, "*": ast.Mult, "/": ast.Div}
+RELATIONAL = {
+    "<": ast.Lt, ">": ast.Gt, "<=": ast.LtE, ">=": ast.GtE,
+    "==": ast.Eq, "!=": ast.NotEq,
+}
+
+
+def idiv(a, b):
+    q = a // b
+    if q < 0 and q * b != a:
+        q += 1
+    # INT_MIN / -1
+    if q > INT_MAX:
+        q = wrap_int(q)
+    return q
+
+
+def limit():
+    raise ExecutionError("Límite de iteraciones alcanzado (¿ciclo infinito?)")
+
+
+def load(name):
+    return ast.Name(name, ast.Load())
+
+
+def store(name, value):
+    return ast.Assign([ast.Name(name, ast.Store())], value)
+
+
+# "_w if INT_MIN <= (_w := value) <= INT_MAX else wrap_int(_w)": la
+# comparación en línea cuesta mucho menos que llamar a una función en
+# cada operación entera
+def wrapped(value):
+    return ast.IfExp(
+        ast.Compare(
+            ast.Constant(INT_MIN),
+            [ast.LtE(), ast.LtE()],
+            [ast.NamedExpr(ast.Name("_w", ast.Store()), value), ast.Constant(INT_MAX)],
+        ),
+        load("_w"),
+        ast.Call(load("wrap_int"), [load("_w")], []),
+    )
+
+
+class PythonLowering:
+
+    def __init__(self):
+        self.table = SymbolTable()
+        self.locals = {}
+        self.declared = {}
+        self.spills = 0
+
+        # (nombre a mostrar, local, tipo) en orden de declaración
+        self.variables = []
+
+    def lower(self, program):
+
+        body = [store("_j", load("MAX_JUMPS"))]
+
+        statements = self.block(program.body)
+
+        # todas las locales existen desde el inicio: una variable de un
+        # bloque que no se ejecutó vale 0 al final, como en la VM
+        for _, name, type_name in self.variables:
+            zero = 0.0 if type_name == "float" else 0
+            body.append(store(name, ast.Constant(zero)))
+
+        body.extend(statements)
+        body.append(ast.Return(ast.Call(load("locals"), [], [])))
+
+        function = ast.FunctionDef(
+            name=FUNCTION,
+            args=ast.arguments(
+                posonlyargs=[], args=[], kwonlyargs=[], kw_defaults=[],
+                defaults=[],
+            ),
+            body=body,
+            decorator_list=[],
+        )
+
+        return ast.fix_missing_locations(ast.Module([function], []))
+
+    def declare(self, name, type_name):
+
+        count = self.declared.get(name, 0)
+        self.declared[name] = count + 1
+
+        local = f"_{count}_{name}"
+        text = name if count == 0 else f"{name}.{count}"
+        self.variables.append((text, local, type_name))
+
+        self.locals[self.table.declare(name, type_name)] = local
+        return local
+
+    def lookup(self, name):
+        symbol = self.table.lookup(name)
+        return self.locals[symbol], symbol.type
+
+    # =========================
+    # SENTENCIAS
+    # =========================
+    def block(self, nodes):
+
+        statements = []
+        for node in nodes:
+            statements.extend(self.statement(node))
+
+        return statements or [ast.Pass()]
+
+    def statement(self, node):
+
+        kind = type(node)
+        before = []
+
+        if kind is Assign:
+            local, type_name = self.lookup(node.name)
+            value = self.value(node.value, type_name, before)
+            return before + [store(local, value)]
+
+        if kind is Decl:
+            # el valor se evalúa antes de declarar (ver semantic.py)
+            if node.value is None:
+                value = ast.Constant(0.0 if node.type_name == "float" else 0)
+            else:
+                value = self.value(node.value, node.type_name, before)
+
+            return before + [store(self.declare(node.name, node.type_name), value)]
+
+        if kind is Block:
+            self.table.enter()
+            statements = self.block(node.body)
+            self.table.exit()
+            return statements
+
+        if kind is If:
+            test = self.condition(node.cond, before)
+            then = self.block([node.then])
+            orelse = self.block([node.orelse]) if node.orelse is not None else []
+            return before + [ast.If(test, then, orelse)]
+
+        if kind is While:
+            # la condición se vuelve a evaluar en cada vuelta: si necesita
+            # locales auxiliares se calcula dentro de un while True
+            test = self.condition(node.cond, before)
+            body = self.block([node.body])
+
+            # contador de vueltas, igual que los saltos hacia atrás de la VM
+            body.append(ast.AugAssign(
+                ast.Name("_j", ast.Store()), ast.Sub(), ast.Constant(1)
+            ))
+            body.append(ast.If(
+                ast.UnaryOp(ast.Not(), load("_j")),
+                [ast.Expr(ast.Call(load("limit"), [], []))],
+                [],
+            ))
+
+            if not before:
+                return [ast.While(test, body, [])]
+
+            exit_loop = ast.If(ast.UnaryOp(ast.Not(), test), [ast.Break()], [])
+            return [ast.While(ast.Constant(True), before + [exit_loop] + body, [])]
+
+        return []
+
+    # valor convertido a float si el destino es float
+    def value(self, node, type_name, before):
+
+        value, value_type = self.expression(node, before)
+
+        if type_name == "float" and value_type == "int":
+            if isinstance(value, ast.Constant):
+                return ast.Constant(float(value.value))
+            return ast.Call(load("float"), [value], [])
+
+        return value
+
+    def condition(self, node, before):
+        value, _ = self.expression(node, before)
+        return value
+
+    # =========================
+    # EXPRESIONES
+    # Devuelve (expresión de Python, tipo). Las subexpresiones muy
+    # profundas se guardan antes en locales "_s<n>" (van a before).
+    # =========================
+    def expression(self, node, before):
+
+        stack = [(node, False)]
+        values = []
+
+        while stack:
+            node, done = stack.pop()
+            kind = type(node)
+
+            if kind is Num:
+                values.append((ast.Constant(node.value), type(node.value).__name__, 1))
+
+            elif kind is Var:
+                local, type_name = self.lookup(node.name)
+                values.append((load(local), type_name, 1))
+
+            elif not done:
+                stack.append((node, True))
+                if kind is BinOp:
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                else:
+                    stack.append((node.operand, False))
+
+            else:
+                if kind is BinOp:
+                    right, right_type, right_depth = values.pop()
+                    left, left_type, left_depth = values.pop()
+                    value_type = combine(node.op, left_type, right_type)
+                    depth = max(left_depth, right_depth) + 1
+
+                    if node.op in RELATIONAL:
+                        value = ast.Compare(left, [RELATIONAL[node.op]()], [right])
+                    elif node.op == "/" and value_type == "int":
+                        value = ast.Call(load("idiv"), [left, right], [])
+                    else:
+                        value = ast.BinOp(left, ARITHMETIC[node.op](), right)
+                        if value_type == "int":
+                            value = wrapped(value)
+
+                else:
+                    operand, value_type, depth = values.pop()
+                    value = ast.UnaryOp(ast.USub(), operand)
+                    if value_type == "int":
+                        value = wrapped(value)
+                    depth += 1
+
+                if depth >= SPILL_DEPTH:
+                    self.spills += 1
+                    name = f"_s{self.spills}"
+                    before.append(store(name, value))
+                    value, depth = load(name), 1
+
+                values.append((value, value_type, depth))
+
+        value, value_type, _ = values[-1]
+        return value, value_type
+
+
+# =========================
+# COMPILACIÓN Y EJECUCIÓN
+# =========================
+
+def compile_program(program):
+
+    lowering = PythonLowering()
+    module = lowering.lower(program)
+
+    try:
+        code = compile(module, "<programa>", "exec")
+    except (RecursionError, MemoryError):
+        raise ExecutionError(
+            "Programa demasiado anidado para el backend nativo"
+        ) from None
+
+    variables = [(text, local) for text, local, _ in lowering.variables]
+    return code, variables
+
+
+def run_native(code, variables, max_jumps=MAX_JUMPS):
+
+    namespace = {
+        "idiv": idiv, "limit": limit, "wrap_int": wrap_int,
+        "MAX_JUMPS": max_jumps,
+    }
+    exec(code, namespace)
+
+    try:
+        values = namespace[FUNCTION]()
+    except ZeroDivisionError:
+        raise ExecutionError("División entre cero") from None
+    except OverflowError:
+        raise ExecutionError("Desbordamiento numérico") from None
+
+    return [(text, values[local]) for text, local in variables]
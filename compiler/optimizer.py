@@ -0,0 +1,592 @@
+import time
+from array import array
+from bisect import bisect_right
+
+try:
+    from .ast_nodes import wrap_int
+    from .intermediate import (
+        ADD, COPY, DIV, EQ, FLOAT, GE, GOTO, GT, IDIV, IFFALSE, IRCode, LE,
+        LT, MUL, NE, NEG, NONE, SUB,
+    )
+except ImportError:
+    from ast_nodes import wrap_int
+    from intermediate import (
+        ADD, COPY, DIV, EQ, FLOAT, GE, GOTO, GT, IDIV, IFFALSE, IRCode, LE,
+        LT, MUL, NE, NEG, NONE, SUB,
+    )
+
+
+# =========================
+# OPTIMIZACIÓN DEL CÓDIGO INTERMEDIO
+# Pasadas sobre los cuádruplos en columnas. Cada pasada recibe un
+# IRCode y devuelve uno (el mismo modificado o uno nuevo si quitó o
+# agregó instrucciones); el PassManager mide cuánto tardó cada una y
+# cuántas instrucciones quitó.
+#
+# Niveles:
+#   -O0  sin cambios
+#   -O1  plegado/propagación de constantes y eliminación de código muerto
+#   -O2  además subexpresiones comunes y código invariante de los while
+#
+# Las pasadas respetan lo mismo que el ejecutor: una división que puede
+# fallar (divisor no constante o cero) no se elimina ni se adelanta.
+# =========================
+
+DEFAULT_LEVEL = 1
+
+UNARY = (COPY, NEG, FLOAT)
+COMMUTATIVE = (ADD, MUL, EQ, NE)
+
+
+def is_jump(op):
+    return op == GOTO or op == IFFALSE
+
+
+# mismo resultado que la máquina virtual (los int dan la vuelta en 64
+# bits, ver wrap_int)
+def evaluate(op, a, b):
+
+    value = evaluate_exact(op, a, b)
+    if type(value) is int:
+        return wrap_int(value)
+    return value
+
+
+def evaluate_exact(op, a, b):
+
+    if op == COPY:
+        return a
+    if op == ADD:
+        return a + b
+    if op == SUB:
+        return a - b
+    if op == MUL:
+        return a * b
+    if op == DIV:
+        return a / b
+    if op == IDIV:
+        q = a // b
+        if q < 0 and q * b != a:
+            q += 1
+        return q
+    if op == NEG:
+        return -a
+    if op == FLOAT:
+        return float(a)
+    if op == LT:
+        return 1 if a < b else 0
+    if op == GT:
+        return 1 if a > b else 0
+    if op == LE:
+        return 1 if a <= b else 0
+    if op == GE:
+        return 1 if a >= b else 0
+    if op == EQ:
+        return 1 if a == b else 0
+    return 1 if a != b else 0
+
+
+# una instrucción que puede terminar el programa con error no se
+# elimina ni se adelanta: una división sin divisor constante distinto
+# de cero, o cualquier operación sobre constantes que al evaluarla da
+# un error aritmético (ZeroDivisionError, OverflowError). Los int son
+# de 64 bits, así que una operación de float con variables no lanza
+# OverflowError: da inf o nan, igual en la máquina virtual
+def may_fail(ir, op, a, b):
+
+    if (op == DIV or op == IDIV) and (b >= 0 or ir.constants[-b - 1] == 0):
+        return True
+
+    if a < 0 and (b < 0 or op in UNARY):
+        constants = ir.constants
+        try:
+            evaluate(op, constants[-a - 1], constants[-b - 1] if b < 0 else None)
+        except ArithmeticError:
+            return True
+
+    return False
+
+
+# copia independiente: el código de la caché no se modifica
+def copy_code(ir):
+
+    code = IRCode()
+    code.ops = ir.ops[:]
+    code.arg1 = ir.arg1[:]
+    code.arg2 = ir.arg2[:]
+    code.result = ir.result[:]
+    code.constants = list(ir.constants)
+    code.constant_ids = dict(ir.constant_ids)
+    code.names = list(ir.names)
+    code.types = list(ir.types)
+    return code
+
+
+# inicios de bloque básico: la primera instrucción, los destinos de
+# salto y las que siguen a un salto
+def block_starts(ir):
+
+    starts = {0}
+    ops, result = ir.ops, ir.result
+
+    for i in range(len(ops)):
+        if is_jump(ops[i]):
+            starts.add(result[i])
+            starts.add(i + 1)
+
+    return starts
+
+
+# =========================
+# REESCRITURA
+# Quita las instrucciones de removed e inserta las de inserted (índice
+# -> lista de cuádruplos) justo antes del índice dado, corrigiendo los
+# saltos. Un salto hacia adelante entra al código insertado y uno hacia
+# atrás (el regreso de un while) lo salta: así lo insertado antes de un
+# ciclo se ejecuta una sola vez al entrar.
+# =========================
+
+def rewrite(ir, removed, inserted=None):
+
+    inserted = inserted or {}
+    count = len(ir)
+    ops, arg1, arg2, result = ir.ops, ir.arg1, ir.arg2, ir.result
+
+    entry = array("i", [0]) * (count + 1)
+    body = array("i", [0]) * (count + 1)
+    position = 0
+
+    for i in range(count + 1):
+        entry[i] = position
+        if i in inserted:
+            position += len(inserted[i])
+        body[i] = position
+        if i < count and i not in removed:
+            position += 1
+
+    code = IRCode()
+    code.constants = ir.constants
+    code.constant_ids = ir.constant_ids
+    code.names = ir.names
+    code.types = ir.types
+
+    for i in range(count):
+
+        for instruction in inserted.get(i, ()):
+            code.emit(*instruction)
+
+        if i in removed:
+            continue
+
+        op = ops[i]
+        target = result[i]
+
+        if is_jump(op):
+            target = body[target] if target <= i else entry[target]
+
+        code.emit(op, arg1[i], arg2[i], target)
+
+    return code
+
+
+# =========================
+# PLEGADO Y PROPAGACIÓN DE CONSTANTES
+# Dentro de cada bloque básico se recuerda qué casillas valen una
+# constante u otra casilla (después de "x = y"). Los operandos se
+# reemplazan por ese valor y una operación con todos sus operandos
+# constantes se calcula aquí. Un iffalse con condición constante se
+# vuelve goto o desaparece.
+# =========================
+
+def fold_constants(ir):
+
+    ops, arg1, arg2, result = ir.ops, ir.arg1, ir.arg2, ir.result
+    constants = ir.constants
+    starts = block_starts(ir)
+
+    values = {}
+    users = {}
+    removed = set()
+
+    def forget(slot):
+        values.pop(slot, None)
+        for user in users.pop(slot, ()):
+            values.pop(user, None)
+
+    for i in range(len(ops)):
+
+        if i in starts:
+            values.clear()
+            users.clear()
+
+        op = ops[i]
+        if op == GOTO:
+            continue
+
+        a = arg1[i]
+        if a > 0:
+            a = values.get(a, a)
+            arg1[i] = a
+
+        b = arg2[i]
+        if b > 0:
+            b = values.get(b, b)
+            arg2[i] = b
+
+        if op == IFFALSE:
+            if a < 0:
+                if constants[-a - 1] == 0:
+                    ops[i] = GOTO
+                    arg1[i] = NONE
+                else:
+                    removed.add(i)
+            continue
+
+        if a < 0 and (b < 0 or op in UNARY) and op != COPY:
+            try:
+                value = evaluate(op, constants[-a - 1],
+                                 constants[-b - 1] if b < 0 else None)
+            except ArithmeticError:
+                pass
+            else:
+                op = ops[i] = COPY
+                a = arg1[i] = ir.constant(value)
+                arg2[i] = NONE
+
+        r = result[i]
+
+        if op == COPY and a == r:
+            removed.add(i)
+            continue
+
+        forget(r)
+
+        if op == COPY:
+            values[r] = a
+            if a > 0:
+                users.setdefault(a, []).append(r)
+
+    return rewrite(ir, removed) if removed else ir
+
+
+# =========================
+# SUBEXPRESIONES COMUNES
+# Numeración de valores local a cada bloque: una operación que ya se
+# calculó con los mismos operandos, sin que ninguno haya cambiado, se
+# reemplaza por una copia de la casilla que tiene el resultado.
+# =========================
+
+def eliminate_common_subexpressions(ir):
+
+    ops, arg1, arg2, result = ir.ops, ir.arg1, ir.arg2, ir.result
+    starts = block_starts(ir)
+
+    available = {}
+    depends = {}
+    removed = set()
+
+    def invalidate(slot):
+        for key in depends.pop(slot, ()):
+            available.pop(key, None)
+
+    for i in range(len(ops)):
+
+        if i in starts:
+            available.clear()
+            depends.clear()
+
+        op = ops[i]
+        if is_jump(op):
+            continue
+
+        r = result[i]
+
+        if op == COPY:
+            invalidate(r)
+            continue
+
+        a, b = arg1[i], arg2[i]
+        if op in COMMUTATIVE and b < a:
+            a, b = b, a
+
+        key = (op, a, b)
+        holder = available.get(key)
+
+        if holder == r:
+            removed.add(i)
+            continue
+
+        if holder is not None:
+            ops[i] = COPY
+            arg1[i] = holder
+            arg2[i] = NONE
+            invalidate(r)
+            continue
+
+        invalidate(r)
+
+        if r != a and r != b:
+            available[key] = r
+            for slot in (a, b, r):
+                if slot > 0:
+                    depends.setdefault(slot, []).append(key)
+
+    return rewrite(ir, removed) if removed else ir
+
+
+# =========================
+# CÓDIGO INVARIANTE DE LOS WHILE
+# Un while es un goto hacia atrás al inicio de su condición. Una
+# operación dentro del ciclo cuyos operandos ninguna instrucción del
+# ciclo modifica se calcula una sola vez en un temporal nuevo antes de
+# entrar, y en el ciclo queda una copia. Solo se mueve desde el ciclo
+# más interno que la contiene.
+# =========================
+
+def hoist_invariants(ir):
+
+    ops, arg1, arg2, result = ir.ops, ir.arg1, ir.arg2, ir.result
+    count = len(ops)
+
+    loops = [
+        (result[i], i) for i in range(count)
+        if ops[i] == GOTO and result[i] <= i
+    ]
+    if not loops:
+        return ir
+
+    # saltos ordenados por destino, para ver si alguno entra a la mitad
+    # de un ciclo desde afuera
+    jumps = sorted(
+        (result[i], i) for i in range(count) if is_jump(ops[i])
+    )
+    jump_targets = [target for target, _ in jumps]
+
+    def single_entry(head, end):
+        first = bisect_right(jump_targets, head)
+        last = bisect_right(jump_targets, end)
+        return all(head <= source <= end for _, source in jumps[first:last])
+
+    loops = [loop for loop in loops if single_entry(*loop)]
+
+    # ciclo más interno de cada instrucción: los más chicos escriben al
+    # final
+    owner = {}
+    for number, (head, end) in sorted(
+        enumerate(loops), key=lambda item: item[1][0] - item[1][1]
+    ):
+        for i in range(head, end + 1):
+            owner[i] = number
+
+    written = [
+        {result[i] for i in range(head, end + 1) if not is_jump(ops[i])}
+        for head, end in loops
+    ]
+
+    temps = sum(1 for type_name in ir.types if type_name is None) - 1
+    inserted = {}
+
+    # (inicio del ciclo, op, a, b) -> temporal ya calculado antes del
+    # ciclo: un mismo cálculo repetido se adelanta una sola vez
+    hoisted = {}
+
+    for i in sorted(owner):
+
+        op = ops[i]
+        if op == COPY or is_jump(op):
+            continue
+
+        a, b = arg1[i], arg2[i]
+        if may_fail(ir, op, a, b):
+            continue
+
+        number = owner[i]
+        changed = written[number]
+        if a in changed or b in changed:
+            continue
+
+        head = loops[number][0]
+        if op in COMMUTATIVE and b < a:
+            key = (head, op, b, a)
+        else:
+            key = (head, op, a, b)
+        slot = hoisted.get(key)
+
+        if slot is None:
+            temps += 1
+            slot = hoisted[key] = ir.slot(f"t{temps}")
+            inserted.setdefault(head, []).append((op, a, b, slot))
+
+        ops[i] = COPY
+        arg1[i] = slot
+        arg2[i] = NONE
+
+    return rewrite(ir, set(), inserted) if inserted else ir
+
+
+# =========================
+# CÓDIGO MUERTO
+# Se quitan las instrucciones inalcanzables, los saltos a la
+# instrucción siguiente y las asignaciones cuyo valor nadie lee.
+#
+# Al final del programa todas las variables son visibles (el ejecutor
+# las muestra), así que una asignación a una variable solo es muerta si
+# se vuelve a asignar más adelante en el mismo bloque sin leerla. Los
+# temporales normalmente viven dentro de su bloque; los que se leen en
+# otro bloque antes de escribirse se tratan como variables.
+# =========================
+
+def eliminate_dead_code(ir):
+
+    ops, arg1, arg2, result = ir.ops, ir.arg1, ir.arg2, ir.result
+    count = len(ops)
+    types = ir.types
+
+    # alcanzables desde la primera instrucción
+    reachable = bytearray(count + 1)
+    pending = [0] if count else []
+
+    while pending:
+        i = pending.pop()
+        if i >= count or reachable[i]:
+            continue
+        reachable[i] = 1
+
+        op = ops[i]
+        if op == GOTO:
+            pending.append(result[i])
+        else:
+            pending.append(i + 1)
+            if op == IFFALSE:
+                pending.append(result[i])
+
+    removed = {i for i in range(count) if not reachable[i]}
+
+    for i in range(count):
+        if is_jump(ops[i]) and result[i] == i + 1 and i not in removed:
+            removed.add(i)
+
+    starts = sorted(block_starts(ir) | {count})
+
+    # casillas leídas en un bloque antes de escribirse en él
+    exposed = set()
+    for first, last in zip(starts, starts[1:]):
+        written = set()
+        for i in range(first, last):
+            if i in removed:
+                continue
+            for slot in (arg1[i], arg2[i]):
+                if slot > 0 and slot not in written:
+                    exposed.add(slot)
+            if not is_jump(ops[i]):
+                written.add(result[i])
+
+    for first, last in zip(starts, starts[1:]):
+
+        needed = set()
+        overwritten = set()
+
+        for i in range(last - 1, first - 1, -1):
+
+            if i in removed:
+                continue
+
+            op = ops[i]
+
+            if not is_jump(op):
+                r = result[i]
+
+                if r in needed:
+                    live = True
+                elif r in overwritten:
+                    live = False
+                else:
+                    live = types[r] is not None or r in exposed
+
+                if not live and not may_fail(ir, op, arg1[i], arg2[i]):
+                    removed.add(i)
+                    continue
+
+                needed.discard(r)
+                overwritten.add(r)
+
+            for slot in (arg1[i], arg2[i]):
+                if slot > 0:
+                    overwritten.discard(slot)
+                    needed.add(slot)
+
+    return rewrite(ir, removed) if removed else ir
+
+
+# =========================
+# ADMINISTRADOR DE PASADAS
+# =========================
+
+PASSES = {
+    "fold": fold_constants,
+    "cse": eliminate_common_subexpressions,
+    "licm": hoist_invariants,
+    "dce": eliminate_dead_code,
+}
+
+LEVELS = {
+    0: (),
+    1: ("fold", "dce"),
+    2: ("fold", "cse", "licm", "fold", "dce"),
+}
+
+
+class PassManager:
+
+    def __init__(self, passes):
+        self.passes = passes
+
+    # devuelve el código optimizado y, por pasada, su tiempo y cuántas
+    # instrucciones quitó (negativo si agregó)
+    def run(self, ir):
+
+        stats = []
+
+        if self.passes:
+            ir = copy_code(ir)
+
+        for name in self.passes:
+            before = len(ir)
+            start = time.perf_counter()
+
+            ir = PASSES[name](ir)
+
+            stats.append({
+                "pass": name,
+                "elapsed": time.perf_counter() - start,
+                "removed": before - len(ir),
+            })
+
+        return ir, stats
+
+
+def optimize(ir, level=DEFAULT_LEVEL):
+    return PassManager(LEVELS[level]).run(ir)
+
+
+def format_stats(stats):
+    return "\n".join(
+        f"{s['pass']:<5} {s['elapsed'] * 1000:8.2f} ms  "
+        f"{s['removed']:>6} instrucciones quitadas"
+        for s in stats
+    )
+
+
+# "-O0", "-O1" o "-O2" entre los argumentos de la terminal
+def level_from_args(args, default=DEFAULT_LEVEL):
+
+    level = default
+    rest = []
+
+    for arg in args:
+        if arg in ("-O0", "-O1", "-O2"):
+            level = int(arg[2:])
+        else:
+            rest.append(arg)
+
+    return level, rest
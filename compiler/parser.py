@@ -1,63 +1,494 @@
+import os
 import sys
-from lexer import Lexer
+
+try:
+    from .ast_nodes import (
+        INT_MAX, Assign, BinOp, Block, Decl, If, Num, Program, UnaryOp, Var,
+        While,
+    )
+    from .lexer import Lexer, scan_tokens
+    from .token_buffer import MAX_ERRORS, Token, TokenTuple, syntax_error
+except ImportError:
+    from ast_nodes import (
+        INT_MAX, Assign, BinOp, Block, Decl, If, Num, Program, UnaryOp, Var,
+        While,
+    )
+    from lexer import Lexer, scan_tokens
+    from token_buffer import MAX_ERRORS, Token, TokenTuple, syntax_error
 
 
 # =========================
-# PARSER SIMPLE
+# PARSER (descenso recursivo)
+#
+# programa   -> sentencia*
+# sentencia  -> declaración | asignación | if | while | bloque
+# declaración-> (int | float) ID [= expr] ;
+# asignación -> ID = expr ;
+# if         -> if ( condición ) sentencia [else sentencia]
+# while      -> while ( condición ) sentencia
+# bloque     -> { sentencia* }
+# condición  -> expr [RELOP expr]
+# expr       -> término ((+ | -) término)*
+# término    -> factor ((* | /) factor)*
+# factor     -> NUMBER | ID | ( expr ) | - factor
 # =========================
 
+# palabras clave con las que puede empezar una sentencia
+STATEMENT_KEYWORDS = ("if", "while", "int", "float")
+
+
 class Parser:
 
-    def __init__(self, tokens):
-        self.tokens = tokens
-        self.pos = 0
+    # tokens puede ser una lista, un TokenBuffer o cualquier iterable
+    # (p. ej. Lexer.iter_tokens()); se consume de forma perezosa con un
+    # solo token de anticipación.
+    #
+    # Con recover=True los errores no detienen el análisis: se guardan
+    # en self.errors y el parser se resincroniza (modo pánico) en el
+    # siguiente ';' o inicio de sentencia, hasta max_errors errores.
+    #
+    # locate(desplazamiento) -> (línea, columna) se usa para ubicar los
+    # errores cuando los tokens no traen su línea.
+    def __init__(self, tokens, recover=False, max_errors=MAX_ERRORS,
+                 locate=None):
+
+        # un TokenBuffer se recorre con stream(): tokens ya armados y
+        # línea:columna calculadas solo para los errores
+        stream = getattr(tokens, "stream", None)
+
+        if stream:
+            self.tokens = stream()
+        else:
+            # tuplas (tipo, lexema) sueltas se envuelven en Token
+            self.tokens = (
+                t if isinstance(t, TokenTuple) else Token(*t) for t in tokens
+            )
+        self.locate = locate or getattr(tokens, "line_col", None)
+
+        self.recover = recover
+        self.max_errors = max_errors
+        self.errors = []
+
+        # inicio absoluto de la sentencia de nivel superior actual
+        self.base = 0
+        self.previous = None
+        self.lookahead = None
+        self.pos = -1
+        self.advance()
 
     # token actual
     def current(self):
-        if self.pos < len(self.tokens):
-            return self.tokens[self.pos]
-        return None
+        return self.lookahead
 
     # avanzar
     def advance(self):
+        token = next(self.tokens, None)
+
+        # en modo recuperación los caracteres desconocidos ya los
+        # reportó el lexer
+        if self.recover:
+            while token is not None and token.type == "MISMATCH":
+                token = next(self.tokens, None)
+
+        self.previous = self.lookahead
+        self.lookahead = token
         self.pos += 1
 
-    # verificar token esperado
-    def expect(self, token_type):
+    # error con la posición (línea:columna) del token, si la tiene
+    def error(self, message, token):
+
+        line = getattr(token, "line", None)
+        col = getattr(token, "col", None)
+        start = getattr(token, "start", None)
+
+        if line is None and start is not None and self.locate:
+            line, col = self.locate(start)
+
+        return syntax_error(message, line, col)
+
+    def end_of_file(self):
+        return self.error("Fin inesperado del archivo", self.previous)
+
+    # posición del token relativa a la sentencia de nivel superior
+    def offset(self, token):
+        if token.start is None:
+            return None
+        return token.start - self.base
+
+    # verificar token esperado; devuelve el token consumido
+    def expect(self, token_type, lexeme=None):
 
         token = self.current()
 
         if token is None:
-            raise SyntaxError("Fin inesperado del archivo")
+            raise self.end_of_file()
 
-        if token[0] != token_type:
-            raise SyntaxError(
-                f"Se esperaba {token_type} y se encontró {token[0]}"
+        if token.type != token_type or (lexeme is not None and token.lexeme != lexeme):
+            expected = lexeme or token_type
+            raise self.error(
+                f"Se esperaba {expected} y se encontró {token.type}", token
             )
 
         self.advance()
+        return token
+
+    def check(self, token_type, lexeme=None):
+        token = self.current()
+        return (
+            token is not None
+            and token.type == token_type
+            and (lexeme is None or token.lexeme == lexeme)
+        )
+
+    def at_statement_start(self):
+        token = self.current()
+        return (
+            token is not None
+            and token.type == "KEYWORD"
+            and token.lexeme in STATEMENT_KEYWORDS
+        )
 
     # =========================
-    # GRAMÁTICA SIMPLE
-    # ID = VALOR ;
+    # RECUPERACIÓN (MODO PÁNICO)
+    # Descarta tokens hasta pasar un ';' o llegar al inicio de otra
+    # sentencia o al cierre del bloque. Siempre avanza al menos un
+    # token para no repetir el mismo error.
     # =========================
-    def parse(self):
+    def synchronize(self, start):
+
+        if self.pos == start and self.current() is not None:
+            skipped = self.current().type
+            self.advance()
+
+            # un ';' o '}' sobrante ya deja el parser en un límite
+            if skipped in ("SEMICOLON", "RBRACE"):
+                return
 
         while self.current() is not None:
 
-            self.expect("IDENTIFIER")
-            self.expect("ASSIGN")
+            token_type = self.current().type
+
+            if token_type == "SEMICOLON":
+                self.advance()
+                return
+
+            if token_type == "RBRACE" or self.at_statement_start():
+                return
+
+            self.advance()
+
+    # una sentencia; en modo recuperación devuelve None si falló
+    def statement_or_recover(self):
+
+        start = self.pos
+
+        try:
+            return self.statement()
+
+        except SyntaxError as e:
+            if not self.recover:
+                raise
+
+            if len(self.errors) < self.max_errors:
+                self.errors.append(e)
+
+            # con el tope alcanzado se deja de leer la entrada
+            if len(self.errors) >= self.max_errors:
+                self.tokens = iter(())
+                self.lookahead = None
+                return None
+
+            self.synchronize(start)
+            return None
+
+    # =========================
+    # PROGRAMA
+    # =========================
+
+    # sentencias de nivel superior una por una, con su rango [inicio,
+    # fin) en el código; no guarda nada (sirve para archivos enormes)
+    def iter_statements(self):
+
+        while self.current() is not None:
+
+            start = self.current().start
+            self.base = start or 0
+
+            node = self.statement_or_recover()
+
+            if node is not None:
+                last = self.previous
+                end = None
+                if start is not None:
+                    end = last.start + len(last.lexeme)
+                yield node, start, end
+
+    def parse(self):
+
+        program = Program()
+
+        for node, start, end in self.iter_statements():
+            program.body.append(node)
+            program.starts.append(start or 0)
+            program.ends.append(end or 0)
+
+        return program
+
+    # =========================
+    # SENTENCIAS
+    # =========================
+    def statement(self):
+
+        token = self.current()
+
+        if token is None:
+            raise self.end_of_file()
+
+        token_type = token.type
+
+        if token_type == "KEYWORD":
+            keyword = token.lexeme
+
+            if keyword in ("int", "float"):
+                return self.declaration()
+            if keyword == "if":
+                return self.if_statement()
+            if keyword == "while":
+                return self.while_statement()
+
+        if token_type == "LBRACE":
+            return self.block()
+
+        if token_type == "IDENTIFIER":
+            return self.assignment()
+
+        raise self.error(f"Se esperaba IDENTIFIER y se encontró {token_type}", token)
+
+    def declaration(self):
+
+        token = self.current()
+        self.advance()
+
+        name = sys.intern(self.expect("IDENTIFIER").lexeme)
+        value = None
+
+        if self.check("ASSIGN"):
+            self.advance()
+            value = self.expression()
+
+        self.expect("SEMICOLON")
+        return Decl(token.lexeme, name, value, self.offset(token))
+
+    def assignment(self):
+
+        token = self.expect("IDENTIFIER")
+        self.expect("ASSIGN")
+        value = self.expression()
+        self.expect("SEMICOLON")
 
+        return Assign(sys.intern(token.lexeme), value, self.offset(token))
+
+    def if_statement(self):
+
+        token = self.current()
+        self.advance()
+
+        self.expect("LPAREN")
+        cond = self.condition()
+        self.expect("RPAREN")
+
+        then = self.statement()
+        orelse = None
+
+        if self.check("KEYWORD", "else"):
+            self.advance()
+            orelse = self.statement()
+
+        return If(cond, then, orelse, self.offset(token))
+
+    def while_statement(self):
+
+        token = self.current()
+        self.advance()
+
+        self.expect("LPAREN")
+        cond = self.condition()
+        self.expect("RPAREN")
+
+        body = self.statement()
+        return While(cond, body, self.offset(token))
+
+    def block(self):
+
+        token = self.expect("LBRACE")
+        body = []
+
+        while self.current() is not None and not self.check("RBRACE"):
+            node = self.statement_or_recover()
+            if node is not None:
+                body.append(node)
+
+        self.expect("RBRACE")
+        return Block(body, self.offset(token))
+
+    # =========================
+    # EXPRESIONES
+    # =========================
+    def condition(self):
+
+        left = self.expression()
+
+        if self.check("RELOP"):
             token = self.current()
+            self.advance()
+            right = self.expression()
+            return BinOp(token.lexeme, left, right, self.offset(token))
+
+        return left
+
+    def expression(self):
+
+        left = self.term()
+        token = self.lookahead
 
-            if token[0] not in ("NUMBER", "IDENTIFIER"):
-                raise SyntaxError("Se esperaba NUMBER o ID")
+        while (
+            token is not None
+            and token.type == "OPERATOR"
+            and token.lexeme in ("+", "-")
+        ):
+            self.advance()
+            left = BinOp(token.lexeme, left, self.term(), self.offset(token))
+            token = self.lookahead
+
+        return left
+
+    def term(self):
 
+        left = self.factor()
+        token = self.lookahead
+
+        while (
+            token is not None
+            and token.type == "OPERATOR"
+            and token.lexeme in ("*", "/")
+        ):
             self.advance()
+            left = BinOp(token.lexeme, left, self.factor(), self.offset(token))
+            token = self.lookahead
 
-            self.expect("SEMICOLON")
+        return left
 
-        return True
+    def factor(self):
+
+        token = self.current()
+
+        if token is None:
+            raise self.end_of_file()
+
+        token_type = token.type
+
+        if token_type == "NUMBER":
+            self.advance()
+            lexeme = token.lexeme
+            if "." in lexeme:
+                return Num(float(lexeme), self.offset(token))
+            # se compara el texto: int() no acepta más de 4300 dígitos
+            digits = lexeme.lstrip("0") or "0"
+            if len(digits) > len(str(INT_MAX)) or int(digits) > INT_MAX:
+                raise self.error("Entero fuera de rango (64 bits)", token)
+            return Num(int(digits), self.offset(token))
+
+        if token_type == "IDENTIFIER":
+            self.advance()
+            # nombres internados: todas las apariciones comparten cadena
+            return Var(sys.intern(token.lexeme), self.offset(token))
+
+        if token_type == "LPAREN":
+            self.advance()
+            node = self.expression()
+            self.expect("RPAREN")
+            return node
+
+        if token_type == "OPERATOR" and token.lexeme == "-":
+            self.advance()
+            return UnaryOp("-", self.factor(), self.offset(token))
+
+        raise self.error("Se esperaba NUMBER o ID", token)
+
+
+# =========================
+# REANÁLISIS INCREMENTAL
+# Tras una edición (position, removed, added en el texto anterior) solo
+# se vuelven a analizar las sentencias de nivel superior tocadas: desde
+# la anterior a la edición (un "if" puede ganar un "else") hasta la
+# primera sentencia posterior que coincide con una del árbol anterior.
+# Las demás se reutilizan tal cual, así el costo depende del tamaño de
+# la edición y no del archivo.
+#
+# Devuelve el programa nuevo (comparte los nodos reutilizados con el
+# anterior; con in_place=True se modifica el mismo programa) y los
+# errores del tramo reanalizado.
+# =========================
+
+def reparse(program, source, position, removed, added, in_place=False):
+
+    delta = added - removed
+    edit_end = position + added
+    count = len(program.body)
+
+    keep = max(program.find(position) - 1, 0)
+    restart = program.end(keep - 1) if keep > 0 else 0
+
+    # línea:columna solo para los errores, sin índice de líneas completo
+    def locate(offset):
+        line = source.count("\n", 0, offset) + 1
+        return line, offset - source.rfind("\n", 0, offset)
+
+    errors = []
+
+    # los caracteres desconocidos del tramo también son errores
+    def checked(tokens):
+        for token in tokens:
+            if token.type == "MISMATCH":
+                errors.append(syntax_error(
+                    f"Token desconocido: {token.lexeme}", *locate(token.start)
+                ))
+            yield token
+
+    parser = Parser(
+        checked(scan_tokens(source, restart)), recover=True, locate=locate
+    )
+
+    body, starts, ends = [], [], []
+    old = keep
+    resync = count
+
+    for node, start, end in parser.iter_statements():
+
+        if start >= edit_end:
+            old_start = start - delta
+
+            while old < count and program.start(old) < old_start:
+                old += 1
+
+            # misma sentencia en el mismo lugar: desde aquí todo se
+            # reutiliza
+            if (
+                old < count
+                and program.start(old) == old_start
+                and program.end(old) == end - delta
+            ):
+                resync = old
+                break
+
+        body.append(node)
+        starts.append(start)
+        ends.append(end)
+
+    new_program = program.splice(
+        keep, resync, body, starts, ends, delta, in_place
+    )
+    return new_program, errors + parser.errors
 
 
 # =========================
@@ -66,26 +497,52 @@ class Parser:
 
 def main():
 
+    # pipeline importa este módulo: se carga recién al correr main()
+    try:
+        from .disk_cache import DiskCache
+        from .pipeline import phase_output, use_disk_cache
+    except ImportError:
+        from disk_cache import DiskCache
+        from pipeline import phase_output, use_disk_cache
+
     if len(sys.argv) < 2:
         print("Uso: python parser.py archivo.txt")
         return
 
     file_path = sys.argv[1]
+    cache = DiskCache()
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        code = f.read()
+    # archivos grandes: tokens por bloques, sin pasar por la caché
+    if not cache.fits(os.path.getsize(file_path)):
+        lexer = Lexer.from_file(file_path)
 
-    try:
-        lexer = Lexer(code)
-        tokens = lexer.tokenize()
+        parser = Parser(lexer.iter_tokens(recover=True), recover=True)
 
-        parser = Parser(tokens)
-        parser.parse()
+        # las sentencias se validan y se descartan: memoria constante
+        for _ in parser.iter_statements():
+            pass
 
-        print("Análisis sintáctico correcto")
+        errors = sorted(
+            lexer.errors + parser.errors,
+            key=lambda e: (e.line or 0, e.col or 0),
+        )
+        errors = [str(e) for e in errors[:MAX_ERRORS]]
+
+    else:
+        with open(file_path, "r", encoding="utf-8") as f:
+            code = f.read()
 
-    except Exception as e:
-        print(f" Error sintáctico: {e}")
+        use_disk_cache(cache)
+        result = phase_output("parser", code)
+
+        errors = [e["message"] for e in result["errors"]]
+
+    # todos los errores de una sola pasada
+    for error in errors:
+        print(f" Error sintáctico: {error}")
+
+    if not errors:
+        print("Análisis sintáctico correcto")
 
 
 if __name__ == "__main__":
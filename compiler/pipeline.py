@@ -0,0 +1,294 @@
+import hashlib
+import sys
+import time
+
+try:
+    from .cache import PhaseCache
+    from .disk_cache import DiskCache
+    from .executor import ExecutionError, execute
+    from .intermediate import generate
+    from .lexer import Lexer
+    from .native import compile_program, run_native
+    from .optimizer import DEFAULT_LEVEL, optimize
+    from .parser import Parser
+    from .profiler import span
+    from .semantic import SemanticAnalyzer
+    from .tokens import TOKEN_TYPES_VERSION
+    from .token_buffer import MAX_ERRORS
+except ImportError:
+    from cache import PhaseCache
+    from disk_cache import DiskCache
+    from executor import ExecutionError, execute
+    from intermediate import generate
+    from lexer import Lexer
+    from native import compile_program, run_native
+    from optimizer import DEFAULT_LEVEL, optimize
+    from parser import Parser
+    from profiler import span
+    from semantic import SemanticAnalyzer
+    from tokens import TOKEN_TYPES_VERSION
+    from token_buffer import MAX_ERRORS
+
+
+# =========================
+# FASES DEL COMPILADOR EN PROCESO
+# Cada fase recibe el código como texto y devuelve un diccionario con
+# sus datos, los errores encontrados y el tiempo que tardó.
+#
+# Los resultados se guardan en CACHE con la clave (hash del código,
+# fase, versión de TOKEN_TYPES): una fase posterior reutiliza la salida
+# de las anteriores y repetir una fase sobre el mismo texto no vuelve a
+# calcular nada.
+#
+# Con use_disk_cache() los resultados también se guardan en disco y
+# sobreviven entre sesiones.
+# =========================
+
+CACHE = PhaseCache()
+DISK_CACHE = None
+
+
+# bytes aproximados que una entrada mantiene vivos en CACHE: tokens,
+# árbol y código intermedio por sus arrays y nodos, el resto por los
+# objetos de primer nivel de cada lista
+def result_size(result):
+
+    size = 0
+
+    for value in result.values():
+        if hasattr(value, "nbytes"):
+            size += value.nbytes()
+        elif type(value) is list:
+            size += sys.getsizeof(value) + sum(map(sys.getsizeof, value))
+        else:
+            size += sys.getsizeof(value)
+
+    # el lexer es la única fase que guarda el texto
+    if "tokens" in result:
+        size += sys.getsizeof(result["tokens"].source)
+
+    return size
+
+
+def use_disk_cache(cache=None):
+    global DISK_CACHE
+    DISK_CACHE = cache if cache is not None else DiskCache()
+
+
+def source_hash(code):
+    return hashlib.sha1(code.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def error_entry(error):
+    return {
+        "message": str(error),
+        "line": getattr(error, "line", None),
+        "col": getattr(error, "col", None),
+    }
+
+
+# error por un límite del entorno (pila, memoria), no del código: el
+# mismo texto puede compilar en otra corrida, así que el resultado no se
+# guarda en caché. La marca viaja con el error a las fases siguientes.
+def limit_entry(message):
+    return {"message": message, "line": None, "col": None, "transient": True}
+
+
+# léxico y sintáctico siguen después de un error para reportar todos
+# los errores del archivo en una sola ejecución
+def lex(code, digest):
+    lexer = Lexer(code)
+    with span("lexer", chars=len(code)):
+        tokens = lexer.tokenize(recover=True)
+    return {
+        "tokens": tokens,
+        "errors": [error_entry(e) for e in lexer.errors],
+    }
+
+
+def parse(code, digest):
+    lexed = phase_output("lexer", code, digest)
+    errors = list(lexed["errors"])
+
+    # el lexer no llegó a terminar (ver limit_entry)
+    if "tokens" not in lexed:
+        return {"errors": errors}
+
+    parser = Parser(
+        lexed["tokens"],
+        recover=True,
+        max_errors=max(MAX_ERRORS - len(errors), 1),
+    )
+    with span("parser", tokens=len(lexed["tokens"])):
+        tree = parser.parse()
+
+    errors.extend(error_entry(e) for e in parser.errors)
+    errors.sort(key=lambda e: (e["line"] or 0, e["col"] or 0))
+
+    return {"tree": tree, "errors": errors[:MAX_ERRORS]}
+
+
+# el análisis semántico solo corre sobre un árbol sin errores previos
+def analyze(code, digest):
+    parsed = phase_output("parser", code, digest)
+
+    if parsed["errors"] or "tree" not in parsed:
+        return {"symbols": [], "errors": list(parsed["errors"])}
+
+    tokens = phase_output("lexer", code, digest)["tokens"]
+    analyzer = SemanticAnalyzer(locate=tokens.line_col)
+    with span("semantic"):
+        table = analyzer.analyze(parsed["tree"])
+
+    return {
+        "symbols": table.symbols,
+        "errors": [error_entry(e) for e in analyzer.errors],
+    }
+
+
+# código intermedio de un programa sin errores, optimizado según level
+def intermediate(code, digest, level):
+    checked = phase_output("semantic", code, digest)
+
+    if checked["errors"]:
+        return {"code": None, "passes": [], "errors": list(checked["errors"])}
+
+    tree = phase_output("parser", code, digest)["tree"]
+    with span("intermediate"):
+        ir = generate(tree)
+    with span("optimizer", level=level):
+        ir, passes = optimize(ir, level)
+    return {"code": ir, "passes": passes, "errors": []}
+
+
+# el programa no lee datos: el resultado depende solo del código y
+# también se guarda en caché
+def execution(code, digest, level):
+    generated = phase_output("intermediate", code, digest, level)
+
+    if generated["errors"]:
+        return {"values": [], "errors": list(generated["errors"])}
+
+    try:
+        with span("execution"):
+            values = execute(generated["code"])
+    except ExecutionError as e:
+        return {"values": [], "errors": [error_entry(e)]}
+
+    return {"values": values, "errors": []}
+
+
+# backend nativo: code object de CPython compilado desde el AST
+def native(code, digest):
+    checked = phase_output("semantic", code, digest)
+
+    if checked["errors"]:
+        return {"code_object": None, "errors": list(checked["errors"])}
+
+    tree = phase_output("parser", code, digest)["tree"]
+
+    try:
+        with span("native"):
+            code_object, variables = compile_program(tree)
+    except ExecutionError as e:
+        return {"code_object": None, "errors": [error_entry(e)]}
+
+    return {"code_object": code_object, "variables": variables, "errors": []}
+
+
+def native_execution(code, digest):
+    compiled = phase_output("native", code, digest)
+
+    if compiled["errors"]:
+        return {"values": [], "errors": list(compiled["errors"])}
+
+    try:
+        with span("native-execution"):
+            values = run_native(compiled["code_object"], compiled["variables"])
+    except ExecutionError as e:
+        return {"values": [], "errors": [error_entry(e)]}
+
+    return {"values": values, "errors": []}
+
+
+PHASES = {
+    "lexer": lex,
+    "parser": parse,
+    "semantic": analyze,
+    "intermediate": intermediate,
+    "execution": execution,
+    "native": native,
+    "native-execution": native_execution,
+}
+
+# fases cuyo resultado depende del nivel de optimización: el nivel va
+# en el nombre con que se guardan en caché
+OPTIMIZED_PHASES = ("intermediate", "execution")
+
+
+def phase_name(phase, level):
+    if phase in OPTIMIZED_PHASES:
+        return f"{phase}-O{level}"
+    return phase
+
+
+# salida de una fase, desde la caché si ya se calculó
+def phase_output(phase, code, digest=None, level=DEFAULT_LEVEL):
+
+    if digest is None:
+        digest = source_hash(code)
+
+    name = phase_name(phase, level)
+    key = (digest, name, TOKEN_TYPES_VERSION)
+    result = CACHE.get(key)
+
+    on_disk = DISK_CACHE is not None and DISK_CACHE.fits(len(code))
+
+    if result is None and on_disk:
+        with span("disk-cache.load", "cache", phase=name):
+            result = DISK_CACHE.load(digest, name, code)
+
+        if result is not None:
+            result["key"] = key
+            CACHE.put(key, result, result_size(result))
+
+    if result is None:
+        try:
+            if phase in OPTIMIZED_PHASES:
+                result = PHASES[phase](code, digest, level)
+            else:
+                result = PHASES[phase](code, digest)
+            result.setdefault("errors", [])
+        except SyntaxError as e:
+            result = {"errors": [error_entry(e)]}
+        except RecursionError:
+            # el parser y el análisis son recursivos: un anidamiento muy
+            # profundo es un error del programa, no del compilador
+            result = {"errors": [limit_entry("Programa demasiado anidado")]}
+        except MemoryError:
+            result = {"errors": [limit_entry("Memoria insuficiente")]}
+
+        result["key"] = key
+
+        if any(error.get("transient") for error in result["errors"]):
+            return result
+
+        CACHE.put(key, result, result_size(result))
+
+        if on_disk:
+            with span("disk-cache.store", "cache", phase=name):
+                DISK_CACHE.store(digest, name, result)
+
+    return result
+
+
+def run_phase(phase, code, level=DEFAULT_LEVEL):
+
+    start = time.perf_counter()
+
+    # copia: quien llama puede agregar campos sin tocar la caché
+    result = dict(phase_output(phase, code, level=level))
+
+    result["phase"] = phase
+    result["elapsed"] = time.perf_counter() - start
+    return result
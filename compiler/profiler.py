@@ -0,0 +1,202 @@
+import json
+import os
+import sys
+import threading
+import time
+
+
+# =========================
+# PERFILADOR
+# Tramos con nombre alrededor de cada fase del compilador y de los
+# caminos del IDE (carga de archivos, resaltado):
+#
+#   with span("parser"):
+#       tree = parser.parse()
+#
+# Por cada nombre se acumulan llamadas, tiempo total y máximo, y bloques
+# netos: la diferencia de sys.getallocatedblocks entre la entrada y la
+# salida. Es un contador de todo el proceso, no de lo que reservó el
+# tramo: cuenta lo que quedó vivo (no lo que se liberó adentro) y
+# también lo de otros hilos en ese lapso. Para la memoria de una fase
+# está tracemalloc (ver los benchmarks), que es mucho más lento. Cada
+# tramo queda además como evento para exportar en el formato de trazas
+# de Chrome (chrome://tracing, Perfetto, speedscope).
+#
+# Desactivado (por defecto) span() devuelve siempre el mismo objeto que
+# no hace nada: el costo es una llamada y una comparación.
+# =========================
+
+# eventos guardados para la traza; pasado el límite solo se acumulan
+# las estadísticas
+MAX_EVENTS = 200_000
+
+
+class Span:
+
+    __slots__ = ("profiler", "name", "category", "args", "start", "blocks")
+
+    def __init__(self, profiler, name, category, args):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.profiler.record(
+            self.name, self.category, self.start, end - self.start,
+            sys.getallocatedblocks() - self.blocks, self.args,
+        )
+        return False
+
+
+class NullSpan:
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Profiler:
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self.enabled = False
+        self.max_events = max_events
+        self.lock = threading.Lock()
+        self.clear()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def clear(self):
+        with self.lock:
+            # (nombre, categoría, hilo, inicio ns, duración ns, bloques netos, args)
+            self.events = []
+            # nombre -> [llamadas, total ns, máximo ns, bloques netos]
+            self.stats = {}
+            self.threads = {}
+            self.dropped = 0
+            self.origin = time.perf_counter_ns()
+
+    def span(self, name, category="compiler", **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args)
+
+    def record(self, name, category, start, duration, blocks, args):
+
+        thread = threading.get_ident()
+
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = [0, 0, 0, 0]
+
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+            stats[3] += blocks
+
+            if len(self.events) < self.max_events:
+                self.events.append((name, category, thread, start, duration, blocks, args))
+                if thread not in self.threads:
+                    self.threads[thread] = threading.current_thread().name
+            else:
+                self.dropped += 1
+
+    # =========================
+    # RESUMEN
+    # =========================
+    def summary(self):
+
+        with self.lock:
+            rows = [
+                {
+                    "name": name,
+                    "calls": calls,
+                    "total": total / 1e9,
+                    "mean": total / calls / 1e9,
+                    "max": longest / 1e9,
+                    "net_blocks": blocks,
+                }
+                for name, (calls, total, longest, blocks) in self.stats.items()
+            ]
+
+        rows.sort(key=lambda row: row["total"], reverse=True)
+        return rows
+
+    def format_summary(self):
+
+        lines = [f"{'tramo':<22}{'llamadas':>10}{'total ms':>12}"
+                 f"{'media ms':>12}{'máx ms':>12}{'bloques netos':>15}"]
+
+        for row in self.summary():
+            lines.append(
+                f"{row['name']:<22}{row['calls']:>10}{row['total'] * 1000:>12.2f}"
+                f"{row['mean'] * 1000:>12.3f}{row['max'] * 1000:>12.2f}{row['net_blocks']:>15}"
+            )
+
+        if self.dropped:
+            lines.append(f"({self.dropped} tramos fuera de la traza por el límite de eventos)")
+
+        return "\n".join(lines)
+
+    # =========================
+    # TRAZA DE CHROME
+    # Eventos completos ("ph": "X") con tiempos en microsegundos desde
+    # el último clear(); los tramos anidados del mismo hilo se ven como
+    # una pila (flame graph).
+    # =========================
+    def chrome_trace(self):
+
+        pid = os.getpid()
+
+        with self.lock:
+            events = [
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (start - self.origin) / 1000,
+                    "dur": duration / 1000,
+                    "pid": pid,
+                    "tid": thread,
+                    "args": dict(args, net_blocks=blocks),
+                }
+                for name, category, thread, start, duration, blocks, args in self.events
+            ]
+
+            events.extend(
+                {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread,
+                 "args": {"name": thread_name}}
+                for thread, thread_name in self.threads.items()
+            )
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path):
+
+        # archivo temporal y reemplazo: nunca queda una traza a medias
+        temp = f"{path}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+        os.replace(temp, path)
+
+
+PROFILER = Profiler()
+
+# el span() de los módulos es el del perfilador global (un método
+# ligado: sin una llamada de más cuando está desactivado)
+span = PROFILER.span
@@ -0,0 +1,259 @@
+import sys
+
+try:
+    from .ast_nodes import Assign, BinOp, Block, Decl, If, Num, UnaryOp, Var, While
+    from .token_buffer import MAX_ERRORS
+except ImportError:
+    from ast_nodes import Assign, BinOp, Block, Decl, If, Num, UnaryOp, Var, While
+    from token_buffer import MAX_ERRORS
+
+
+RELATIONAL = ("<", ">", "<=", ">=", "==", "!=")
+
+
+class SemanticError(Exception):
+
+    def __init__(self, message, line=None, col=None):
+        if line is not None:
+            message = f"{message} en {line}:{col}"
+        super().__init__(message)
+        self.line = line
+        self.col = col
+
+
+# =========================
+# TABLA DE SÍMBOLOS
+# Un solo diccionario nombre -> símbolo visible, así buscar cuesta O(1)
+# sin importar cuántos ámbitos haya abiertos. Cada símbolo recuerda al
+# que ocultaba (previous) y al cerrar un ámbito se restauran solo los
+# nombres declarados en él.
+# =========================
+
+class Symbol:
+
+    __slots__ = ("name", "type", "scope", "line", "col", "previous")
+
+    def __init__(self, name, type, scope, line, col, previous):
+        self.name = name
+        self.type = type
+        self.scope = scope
+        self.line = line
+        self.col = col
+        self.previous = previous
+
+
+class SymbolTable:
+
+    def __init__(self):
+        self.visible = {}
+        self.scopes = [[]]
+        self.symbols = []
+
+    @property
+    def depth(self):
+        return len(self.scopes) - 1
+
+    def enter(self):
+        self.scopes.append([])
+
+    def exit(self):
+        visible = self.visible
+
+        for symbol in self.scopes.pop():
+            if symbol.previous is None:
+                del visible[symbol.name]
+            else:
+                visible[symbol.name] = symbol.previous
+
+    # None si el nombre ya está declarado en este mismo ámbito
+    def declare(self, name, type, line=None, col=None):
+
+        name = sys.intern(name)
+        previous = self.visible.get(name)
+
+        if previous is not None and previous.scope == self.depth:
+            return None
+
+        symbol = Symbol(name, type, self.depth, line, col, previous)
+        self.visible[name] = symbol
+        self.scopes[-1].append(symbol)
+        self.symbols.append(symbol)
+        return symbol
+
+    def lookup(self, name):
+        return self.visible.get(name)
+
+
+# =========================
+# ANÁLISIS SEMÁNTICO
+# Recorre el AST del parser: variables no declaradas o declaradas dos
+# veces en el mismo ámbito y asignaciones de float a int. Las
+# expresiones se recorren con una pila explícita (una suma de miles de
+# términos no agota la recursión).
+# =========================
+
+class SemanticAnalyzer:
+
+    # locate(desplazamiento) -> (línea, columna) para ubicar errores y
+    # símbolos
+    def __init__(self, locate=None, max_errors=MAX_ERRORS):
+        self.locate = locate
+        self.max_errors = max_errors
+        self.table = SymbolTable()
+        self.errors = []
+        self.base = 0
+
+    def position(self, node):
+        if self.locate is None or node.pos is None:
+            return None, None
+        return self.locate(self.base + node.pos)
+
+    def error(self, message, node):
+        if len(self.errors) < self.max_errors:
+            self.errors.append(SemanticError(message, *self.position(node)))
+
+    def analyze(self, program):
+
+        for index, node in enumerate(program.body):
+            self.base = program.start(index)
+            self.statement(node)
+
+        return self.table
+
+    # =========================
+    # SENTENCIAS
+    # =========================
+    def statement(self, node):
+
+        kind = type(node)
+
+        if kind is Assign:
+            symbol = self.table.lookup(node.name)
+            value_type = self.expression(node.value)
+
+            if symbol is None:
+                self.error(f"Variable no declarada: {node.name}", node)
+            else:
+                self.check_assign(symbol.type, value_type, node)
+
+        elif kind is Decl:
+            # el valor se revisa antes de declarar: "int x = x;" falla
+            if node.value is not None:
+                value_type = self.expression(node.value)
+                self.check_assign(node.type_name, value_type, node)
+
+            line, col = self.position(node)
+            if self.table.declare(node.name, node.type_name, line, col) is None:
+                self.error(f"Variable ya declarada: {node.name}", node)
+
+        elif kind is Block:
+            self.table.enter()
+            for child in node.body:
+                self.statement(child)
+            self.table.exit()
+
+        elif kind is If:
+            self.expression(node.cond)
+            self.statement(node.then)
+            if node.orelse is not None:
+                self.statement(node.orelse)
+
+        elif kind is While:
+            self.expression(node.cond)
+            self.statement(node.body)
+
+    def check_assign(self, target_type, value_type, node):
+        if target_type == "int" and value_type == "float":
+            self.error("Tipo incompatible: no se puede asignar float a int", node)
+
+    # =========================
+    # EXPRESIONES
+    # Tipo de la expresión ("int", "float" o None si no se conoce).
+    # =========================
+    def expression(self, node):
+
+        # caso común: un literal o una variable sola
+        kind = type(node)
+        if kind is Num:
+            return "float" if type(node.value) is float else "int"
+
+        lookup = self.table.visible.get
+        stack = [(node, False)]
+        types = []
+
+        while stack:
+            node, done = stack.pop()
+            kind = type(node)
+
+            if kind is Num:
+                types.append("float" if type(node.value) is float else "int")
+
+            elif kind is Var:
+                symbol = lookup(node.name)
+                if symbol is None:
+                    self.error(f"Variable no declarada: {node.name}", node)
+                    types.append(None)
+                else:
+                    types.append(symbol.type)
+
+            elif kind is BinOp:
+                if done:
+                    right = types.pop()
+                    types[-1] = combine(node.op, types[-1], right)
+                else:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+
+            elif kind is UnaryOp:
+                stack.append((node.operand, False))
+
+        return types[-1]
+
+
+def combine(op, left, right):
+
+    if op in RELATIONAL:
+        return "int"
+
+    if left is None or right is None:
+        return None
+
+    return "float" if "float" in (left, right) else "int"
+
+
+# =========================
+# EJECUCIÓN DESDE TERMINAL
+# =========================
+
+def main():
+
+    # pipeline importa este módulo: se carga recién al correr main()
+    try:
+        from .pipeline import phase_output, use_disk_cache
+    except ImportError:
+        from pipeline import phase_output, use_disk_cache
+
+    if len(sys.argv) < 2:
+        print("Uso: python semantic.py archivo.txt")
+        return
+
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        code = f.read()
+
+    use_disk_cache()
+    result = phase_output("semantic", code)
+
+    for symbol in result["symbols"]:
+        print(f"{symbol.name}\t{symbol.type}\támbito {symbol.scope}\t"
+              f"{symbol.line}:{symbol.col}")
+
+    for error in result["errors"]:
+        print(f" Error: {error['message']}")
+
+    if not result["errors"]:
+        print("Análisis semántico correcto")
+
+
+if __name__ == "__main__":
+    main()
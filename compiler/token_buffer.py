@@ -0,0 +1,217 @@
+from array import array
+from bisect import bisect_right
+
+try:
+    from .tokens import TOKEN_NAMES, TOKEN_IDS
+except ImportError:
+    from tokens import TOKEN_NAMES, TOKEN_IDS
+
+
+# =========================
+# ERRORES CON POSICIÓN
+# =========================
+
+# tope de errores guardados por ejecución en modo recuperación
+MAX_ERRORS = 100
+
+
+def syntax_error(message, line=None, col=None):
+
+    if line is not None:
+        message = f"{message} en {line}:{col}"
+
+    # se guardan aparte: asignar lineno cambiaría el texto del error
+    error = SyntaxError(message)
+    error.line = line
+    error.col = col
+    return error
+
+
+# =========================
+# TOKENS COMPATIBLES CON TUPLAS
+# Se comportan como (tipo, lexema): se pueden desempaquetar,
+# indexar y comparar con tuplas.
+# =========================
+
+class TokenTuple:
+
+    __slots__ = ()
+
+    def __iter__(self):
+        yield self.type
+        yield self.lexeme
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, i):
+        # token[0] es lo más usado por el parser: evita cortar el lexema
+        if i == 0:
+            return self.type
+        return (self.type, self.lexeme)[i]
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenTuple, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.type, self.lexeme))
+
+    def __repr__(self):
+        return repr((self.type, self.lexeme))
+
+
+class Token(TokenTuple):
+
+    __slots__ = ("type", "lexeme", "line", "col", "start")
+
+    def __init__(self, type, lexeme, line=None, col=None, start=None):
+        self.type = type
+        self.lexeme = lexeme
+        self.line = line
+        self.col = col
+        self.start = start
+
+
+class TokenView(TokenTuple):
+
+    __slots__ = ("buffer", "index")
+
+    def __init__(self, buffer, index):
+        self.buffer = buffer
+        self.index = index
+
+    @property
+    def type(self):
+        return TOKEN_NAMES[self.buffer.kinds[self.index]]
+
+    # el lexema se corta del código fuente solo cuando se pide
+    @property
+    def lexeme(self):
+        return self.buffer.source[self.start:self.end]
+
+    @property
+    def start(self):
+        return self.buffer.starts[self.index]
+
+    @property
+    def end(self):
+        return self.buffer.ends[self.index]
+
+    @property
+    def line(self):
+        return self.buffer.line_col(self.start)[0]
+
+    @property
+    def col(self):
+        return self.buffer.line_col(self.start)[1]
+
+
+# =========================
+# ALMACÉN COMPACTO DE TOKENS
+# kinds: id del tipo (1 byte), starts/ends: desplazamientos en el
+# código fuente (4 bytes c/u). Unos 9 bytes por token frente a una
+# tupla con dos cadenas.
+# =========================
+
+class TokenBuffer:
+
+    def __init__(self, source):
+        self.source = source
+        self.kinds = array("B")
+        self.starts = array("i")
+        self.ends = array("i")
+        self._line_starts = None
+
+    def append(self, token_type, start, end):
+        self.kinds.append(TOKEN_IDS[token_type])
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    # al cambiar el código fuente el índice de líneas deja de valer
+    def replace_source(self, source):
+        self.source = source
+        self._line_starts = None
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("índice de token fuera de rango")
+
+        return TokenView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield TokenView(self, index)
+
+    # recorrido rápido para el parser: tokens ya armados, sin línea ni
+    # columna (se calculan con line_col() solo si hay un error)
+    def stream(self):
+        names = TOKEN_NAMES
+        source = self.source
+
+        for kind, start, end in zip(self.kinds, self.starts, self.ends):
+            yield Token(names[kind], source[start:end], None, None, start)
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenBuffer, list)):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other)
+            )
+        return NotImplemented
+
+    # índice de inicios de línea, construido la primera vez que se pide
+    # una posición
+    @property
+    def line_starts(self):
+
+        if self._line_starts is None:
+            starts = array("i", [0])
+            find = self.source.find
+            pos = find("\n")
+
+            while pos != -1:
+                starts.append(pos + 1)
+                pos = find("\n", pos + 1)
+
+            self._line_starts = starts
+
+        return self._line_starts
+
+    def line_col(self, offset):
+        starts = self.line_starts
+        line = bisect_right(starts, offset)
+        return line, offset - starts[line - 1] + 1
+
+    # =========================
+    # SERIALIZACIÓN
+    # Solo los arrays; el código fuente lo aporta quien carga.
+    # =========================
+    def dump(self):
+        return (
+            self.kinds.tobytes(),
+            self.starts.tobytes(),
+            self.ends.tobytes(),
+        )
+
+    @classmethod
+    def load(cls, source, data):
+        buffer = cls(source)
+        buffer.kinds.frombytes(data[0])
+        buffer.starts.frombytes(data[1])
+        buffer.ends.frombytes(data[2])
+        return buffer
+
+    def nbytes(self):
+        return sum(
+            a.itemsize * len(a) for a in (self.kinds, self.starts, self.ends)
+        )
@@ -1,12 +1,29 @@
+import hashlib
+
 # Tipos de tokens del lenguaje
 
 TOKEN_TYPES = {
     "KEYWORD": r"\b(if|else|while|int|float|main)\b",
     "IDENTIFIER": r"\b[a-zA-Z_][a-zA-Z0-9_]*\b",
     "NUMBER": r"\b\d+(\.\d+)?\b",
+    "RELOP": r"==|!=|<=|>=|<|>",
     "ASSIGN": r"=",
     "OPERATOR": r"[+\-*/]",
     "SEMICOLON": r";",
     "LPAREN": r"\(",
     "RPAREN": r"\)",
-}
\ No newline at end of file
+    "LBRACE": r"\{",
+    "RBRACE": r"\}",
+}
+
+# Identificador numérico de cada tipo, para guardar tokens en arrays.
+# MISMATCH marca un carácter desconocido que el lexer incremental
+# conserva en lugar de lanzar un error.
+TOKEN_NAMES = list(TOKEN_TYPES) + ["MISMATCH"]
+TOKEN_IDS = {name: i for i, name in enumerate(TOKEN_NAMES)}
+
+# Versión de la tabla de tokens: cambia si se edita TOKEN_TYPES, así
+# los resultados guardados en caché con otra tabla dejan de usarse
+TOKEN_TYPES_VERSION = hashlib.sha1(
+    repr(list(TOKEN_TYPES.items())).encode("utf-8")
+).hexdigest()[:12]
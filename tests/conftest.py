@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+
+# las pruebas de ui/ corren sin pantalla
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    widgets = pytest.importorskip("PyQt6.QtWidgets")
+    return widgets.QApplication.instance() or widgets.QApplication([])
+
+
+# la caché en disco por defecto va a una carpeta de la prueba, no a la
+# del usuario
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    folder = str(tmp_path / "idecache")
+    monkeypatch.setattr("compiler.disk_cache.CACHE_DIR", folder)
+    return folder
@@ -0,0 +1,111 @@
+from array import array
+
+from compiler.ast_nodes import (
+    INT_MAX, INT_MIN, Assign, BinOp, Block, Decl, If, Num, Program, UnaryOp,
+    Var, count_nodes, dump, walk, wrap_int,
+)
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+
+
+CODE = "int x = 1;\nif (x > 0) { x = -x * 2; } else x = 3;\n"
+
+
+def parse(code):
+    return Parser(Lexer(code).tokenize()).parse()
+
+
+# =========================
+# IGUALDAD
+# =========================
+
+def test_equality_ignores_positions():
+    a = BinOp("+", Var("x", pos=0), Num(1, pos=4), pos=0)
+    b = BinOp("+", Var("x"), Num(1))
+
+    assert a == b
+    assert a != BinOp("-", Var("x"), Num(1))
+    assert Var("x") != Num("x")
+
+
+def test_same_code_gives_equal_programs():
+    # las sentencias se comparan sin importar dónde empiezan
+    assert parse(CODE) == parse(CODE)
+    assert parse("int x = 1;") == parse("\n\n   int x = 1;")
+    assert parse(CODE) != parse(CODE.replace("3", "4"))
+
+
+def test_nodes_have_no_dict():
+    for node in (Block([]), Decl("int", "x"), Assign("x", Num(1)), If(Num(1), Block([])),
+                 UnaryOp("-", Num(1)), Var("x")):
+        assert not hasattr(node, "__dict__")
+
+
+# =========================
+# RECORRIDO
+# =========================
+
+def test_walk_is_preorder():
+    kinds = [type(node).__name__ for node in walk(parse(CODE))]
+
+    assert kinds == [
+        "Decl", "Num", "If", "BinOp", "Var", "Num", "Block", "Assign",
+        "BinOp", "UnaryOp", "Var", "Num", "Assign", "Num",
+    ]
+    assert count_nodes(parse(CODE)) == 14
+
+
+# más profundo que el límite de recursión
+def test_deep_tree_does_not_recurse():
+    node = Num(1)
+    for _ in range(5000):
+        node = UnaryOp("-", node)
+    program = Program([Assign("x", node)], array("i", [0]), array("i", [1]))
+
+    assert count_nodes(program) == 5002
+    assert dump(program).count("\n") == 5002
+    assert program.nbytes() > 5000 * 40
+
+
+def test_dump_text():
+    assert dump(parse(CODE)).splitlines()[:4] == [
+        "Program",
+        "  Decl int x",
+        "    Num 1",
+        "  If",
+    ]
+
+
+# =========================
+# RANGOS DE LAS SENTENCIAS
+# =========================
+
+def test_statement_ranges_and_find():
+    program = parse(CODE)
+
+    assert [(program.start(i), program.end(i)) for i in range(2)] == [(0, 10), (11, 49)]
+    assert program.find(0) == 0
+    assert program.find(11) == 1
+    assert program.find(100) == 2
+
+
+def test_pending_shift_is_applied_on_read():
+    program = Program(
+        [Num(n) for n in range(4)],
+        array("i", [0, 10, 20, 30]), array("i", [5, 15, 25, 35]),
+    )
+
+    spliced = program.splice(1, 2, [Num(9)], [10], [18], delta=3)
+
+    assert [spliced.start(i) for i in range(4)] == [0, 10, 23, 33]
+    # el programa original no cambia
+    assert [program.start(i) for i in range(4)] == [0, 10, 20, 30]
+
+    spliced.move_shift(4)
+    assert list(spliced.starts) == [0, 10, 23, 33]
+
+
+def test_wrap_int():
+    assert wrap_int(INT_MAX + 1) == INT_MIN
+    assert wrap_int(INT_MIN - 1) == INT_MAX
+    assert wrap_int(-5) == -5
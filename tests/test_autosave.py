@@ -0,0 +1,153 @@
+import os
+import stat
+import time
+
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+import ui.autosave as autosave
+from ui.autosave import UMASK, AutoSaver, BackgroundWriter, WriterSignals, atomic_write
+from ui.editor import CodeEditor
+
+
+def wait_until(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "tiempo agotado"
+        qapp.processEvents()
+        time.sleep(0.005)
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+# =========================
+# ESCRITURA ATÓMICA
+# =========================
+
+def test_new_file_honours_umask(tmp_path):
+    path = tmp_path / "nuevo.txt"
+    atomic_write(str(path), "int x;\n", "utf-8")
+
+    assert path.read_text() == "int x;\n"
+    assert mode(path) == 0o666 & ~UMASK
+
+
+def test_existing_file_keeps_mode(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("viejo")
+    os.chmod(path, 0o640)
+
+    atomic_write(str(path), "nuevo", "utf-8")
+
+    assert path.read_text() == "nuevo"
+    assert mode(path) == 0o640
+
+
+def test_unencodable_text_leaves_file_intact(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_bytes(b"viejo")
+
+    with pytest.raises(UnicodeEncodeError):
+        atomic_write(str(path), "ñ 😀", "ascii")
+
+    assert path.read_bytes() == b"viejo"
+    assert os.listdir(tmp_path) == ["a.txt"]
+
+
+# =========================
+# HILO DE ESCRITURA
+# =========================
+
+def test_writer_survives_errors(qapp, tmp_path):
+    signals = WriterSignals()
+    saved = []
+    failed = []
+    signals.saved.connect(lambda editor, revision: saved.append(revision))
+    signals.failed.connect(lambda editor, path, message: failed.append(path))
+
+    writer = BackgroundWriter(signals)
+    try:
+        missing = str(tmp_path / "no-existe" / "a.txt")
+        writer.submit(None, missing, "x", "utf-8", 1)
+        # codificación desconocida: LookupError, no OSError
+        writer.submit(None, str(tmp_path / "b.txt"), "x", "no-such-codec", 2)
+        wait_until(qapp, lambda: len(failed) == 2)
+
+        path = tmp_path / "c.txt"
+        writer.submit(None, str(path), "sigue", "utf-8", 3)
+        wait_until(qapp, lambda: saved == [3])
+        assert path.read_text() == "sigue"
+
+        with pytest.raises(OSError):
+            writer.write(missing, "x", "utf-8")
+    finally:
+        writer.close()
+
+    assert not writer.thread.is_alive()
+
+
+def test_manual_write_after_close(tmp_path):
+    writer = BackgroundWriter(WriterSignals())
+    writer.close()
+
+    path = tmp_path / "a.txt"
+    writer.write(str(path), "a mano", "utf-8")
+    assert path.read_text() == "a mano"
+
+
+# =========================
+# AUTOGUARDADO
+# =========================
+
+def file_editor(path, text):
+    editor = CodeEditor()
+    editor.setPlainText(text)
+    editor.file_path = str(path)
+    editor.encoding = "utf-8"
+    editor.document().setModified(False)
+    return editor
+
+
+def test_only_modified_tabs_are_written(qapp, tmp_path):
+    clean = file_editor(tmp_path / "limpio.txt", "a")
+    dirty = file_editor(tmp_path / "sucio.txt", "b")
+    dirty.textCursor().insertText("x = 1;\n")
+
+    saver = AutoSaver(lambda: [clean, dirty])
+    try:
+        saver.save_dirty()
+        wait_until(qapp, lambda: not dirty.document().isModified())
+    finally:
+        saver.close()
+
+    assert (tmp_path / "sucio.txt").read_text() == "x = 1;\nb"
+    assert not (tmp_path / "limpio.txt").exists()
+
+
+def test_debounce_waits_for_pause(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(autosave, "DELAY", 200)
+    monkeypatch.setattr(autosave, "MAX_DELAY", 10000)
+
+    editor = file_editor(tmp_path / "a.txt", "")
+    saver = AutoSaver(lambda: [editor])
+    saver.watch(editor)
+    copies = []
+    saver.copied.connect(lambda editor, revision: copies.append(revision))
+
+    try:
+        # cambios cada 50 ms: el temporizador se reinicia con cada uno
+        for n in range(6):
+            editor.textCursor().insertText(str(n))
+            time.sleep(0.05)
+            qapp.processEvents()
+        assert copies == []
+
+        wait_until(qapp, lambda: copies)
+        wait_until(qapp, lambda: not editor.document().isModified())
+        assert len(copies) == 1
+        assert (tmp_path / "a.txt").read_text() == editor.toPlainText()
+    finally:
+        saver.close()
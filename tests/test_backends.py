@@ -0,0 +1,91 @@
+import math
+import random
+
+import pytest
+
+from compiler.pipeline import run_phase
+
+
+# =========================
+# PROGRAMAS AL AZAR
+# Con desbordes de int, divisiones por cero y mezcla de int y float:
+# la máquina virtual en cada nivel de optimización y el backend nativo
+# tienen que dar los mismos valores y los mismos errores.
+# =========================
+
+INT_VARIABLES = ["a", "b", "c"]
+FLOAT_VARIABLES = ["x", "y"]
+LEAVES = INT_VARIABLES + FLOAT_VARIABLES + [
+    "0", "1", "2", "0.0", "99999999999.5", "9223372036854775807",
+]
+
+PRELUDE = [
+    "int a = 9223372036854775807;",
+    "int b = 3;",
+    "int c = 0;",
+    "float x = 1.5;",
+    "float y = 0.0;",
+]
+
+
+def expression(rng, depth=0):
+
+    if depth > 3 or rng.random() < 0.3:
+        return rng.choice(LEAVES)
+
+    if rng.random() < 0.15:
+        return f"-{expression(rng, depth + 1)}"
+
+    op = rng.choice("+-*/")
+    return f"({expression(rng, depth + 1)} {op} {expression(rng, depth + 1)})"
+
+
+def random_program(rng):
+
+    lines = list(PRELUDE)
+
+    for _ in range(rng.randint(2, 10)):
+        kind = rng.random()
+        target = rng.choice(INT_VARIABLES + FLOAT_VARIABLES)
+        value = expression(rng)
+
+        if kind < 0.6:
+            lines.append(f"{target} = {value};")
+        elif kind < 0.8:
+            lines.append(
+                f"if ({expression(rng)} < {expression(rng)}) {{ {target} = {value}; }} "
+                f"else {{ {target} = {expression(rng)}; }}"
+            )
+        else:
+            lines.append(f"while (c < 3) {{ {target} = {value}; c = c + 1; }}")
+
+    return "\n".join(lines) + "\n"
+
+
+# NaN != NaN: se compara por nombre
+def outcome(result):
+    values = [
+        (name, "nan" if isinstance(value, float) and math.isnan(value) else value)
+        for name, value in result["values"]
+    ]
+    return values, [error["message"] for error in result["errors"]]
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_backends_agree(seed):
+    code = random_program(random.Random(seed))
+
+    expected = outcome(run_phase("execution", code, 0))
+
+    for level in (1, 2):
+        assert outcome(run_phase("execution", code, level)) == expected, level
+    assert outcome(run_phase("native-execution", code)) == expected
+
+
+def test_int_overflow_wraps():
+    code = "int a = 9223372036854775807;\nint b = a + 1;\nint c = -a - 2;\n"
+    expected = {"a": 9223372036854775807, "b": -9223372036854775808, "c": 9223372036854775807}
+
+    for level in (0, 1, 2):
+        assert dict(run_phase("execution", code, level)["values"]) == expected
+    assert dict(run_phase("native-execution", code)["values"]) == expected
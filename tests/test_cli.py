@@ -0,0 +1,80 @@
+import json
+
+from compiler.__main__ import check_file, expand_paths, main
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+# =========================
+# RUTAS
+# =========================
+
+def test_expand_folders_globs_and_duplicates(tmp_path):
+    a = write(tmp_path / "a.txt", "")
+    b = write(tmp_path / "sub" / "b.txt", "")
+    write(tmp_path / "sub" / "c.md", "")
+    d = write(tmp_path / "sub" / "d.src", "")
+
+    assert expand_paths([str(tmp_path)], (".txt",)) == [a, b]
+    assert expand_paths([str(tmp_path / "**" / "*.txt"), a], (".txt",)) == [a, b]
+    assert expand_paths([str(tmp_path / "sub")], (".txt", ".src")) == [b, d]
+
+
+def test_unreadable_file_is_a_diagnostic(tmp_path):
+    path = tmp_path / "latin1.txt"
+    path.write_bytes("int año;".encode("latin-1"))
+
+    name, [diagnostic] = check_file((str(path), "semantic", 1))
+
+    assert name == str(path)
+    assert diagnostic["line"] is None
+    assert diagnostic["message"].startswith("No se pudo leer")
+
+
+# =========================
+# CÓDIGOS DE SALIDA Y JSON LINES
+# =========================
+
+def test_clean_files_exit_zero(tmp_path, capsys):
+    write(tmp_path / "a.txt", "int x = 1;\n")
+    output = tmp_path / "salida.jsonl"
+
+    assert main([str(tmp_path), "-j", "1", "-o", str(output)]) == 0
+    assert output.read_text() == ""
+    assert "1 archivos, 0 con errores" in capsys.readouterr().err
+
+
+def test_errors_exit_one_with_json_lines(tmp_path):
+    bad = write(tmp_path / "malo.txt", "int x = 1;\ny = x;\n")
+    write(tmp_path / "bueno.txt", "int x = 1;\n")
+    output = tmp_path / "salida.jsonl"
+
+    code = main([str(tmp_path / "*.txt"), "-j", "1", "-o", str(output),
+                 "--cache", str(tmp_path / "cache")])
+
+    assert code == 1
+    assert read_lines(output) == [{
+        "file": bad, "phase": "semantic", "line": 2, "col": 1,
+        "message": "Variable no declarada: y en 2:1",
+    }]
+
+
+def test_phase_limits_the_checks(tmp_path):
+    write(tmp_path / "a.txt", "y = 1;\n")
+    output = tmp_path / "salida.jsonl"
+
+    # sin análisis semántico la variable no declarada no se detecta
+    assert main([str(tmp_path), "--phase", "parser", "-j", "1", "-o", str(output)]) == 0
+
+
+def test_no_files_exit_two(tmp_path, capsys):
+    assert main([str(tmp_path / "*.txt"), "-j", "1"]) == 2
+    assert "No se encontraron archivos" in capsys.readouterr().err
@@ -0,0 +1,85 @@
+import os
+import random
+
+from ui.closed_tabs import ClosedTabHistory
+
+
+# texto que zlib comprime poco (unos 1300 bytes cada 2000 caracteres)
+def noise(seed, size):
+    rng = random.Random(seed)
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(size))
+
+
+def test_pop_returns_last_closed_with_encoding():
+    history = ClosedTabHistory()
+    history.push("uno", "a.txt", "/tmp/a.txt")
+    history.push("dos", "b.txt", "/tmp/b.txt", "cp1252")
+
+    assert history.pop() == {
+        "content": "dos", "title": "b.txt", "file_path": "/tmp/b.txt", "encoding": "cp1252",
+    }
+    assert history.pop()["content"] == "uno"
+    assert history.pop() is None
+
+
+def test_max_entries_forgets_oldest():
+    history = ClosedTabHistory(max_entries=3)
+
+    for n in range(5):
+        history.push(f"texto {n}", f"{n}.txt", None)
+
+    assert len(history) == 3
+    assert [history.pop()["content"] for _ in range(3)] == ["texto 4", "texto 3", "texto 2"]
+
+
+def test_budgets_spill_then_evict():
+    history = ClosedTabHistory(memory_bytes=3000, disk_bytes=5000)
+
+    try:
+        for n in range(10):
+            history.push(noise(n, 2000), f"{n}.txt", None)
+
+            assert history.in_memory <= history.memory_bytes
+            assert history.on_disk <= history.disk_bytes
+
+        # las más viejas van a disco y las que no entran se olvidan
+        assert history.on_disk > 0
+        assert len(history) < 10
+        assert sum(entry["size"] for entry in history.entries) == history.in_memory + history.on_disk
+
+        kept = len(history)
+        for n in range(9, 9 - kept, -1):
+            assert history.pop()["content"] == noise(n, 2000)
+        assert history.in_memory == history.on_disk == 0
+    finally:
+        history.clear()
+
+
+def test_newest_kept_even_over_budget():
+    history = ClosedTabHistory(memory_bytes=100, disk_bytes=100)
+
+    try:
+        history.push(noise(1, 5000), "grande.txt", None)
+
+        assert len(history) == 1
+        assert history.pop()["content"] == noise(1, 5000)
+    finally:
+        history.clear()
+
+
+def test_damaged_spill_is_skipped():
+    history = ClosedTabHistory(memory_bytes=2000)
+
+    try:
+        history.push(noise(1, 2000), "a.txt", None)
+        history.push(noise(2, 2000), "b.txt", None)
+
+        [spilled] = [entry for entry in history.entries if entry["spill"] is not None]
+        with open(spilled["spill"], "wb") as f:
+            f.write(b"no es zlib")
+
+        assert history.pop()["title"] == "b.txt"
+        assert history.pop() is None
+        assert not os.listdir(history.folder)
+    finally:
+        history.clear()
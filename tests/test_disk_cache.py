@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+import compiler.disk_cache as disk_cache
+from compiler import pipeline
+from compiler.disk_cache import DiskCache
+
+
+CODE = "int x = 1;\nfloat y = x / 2;\nwhile (x < 10) { x = x * 2; }\n"
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(pipeline, "DISK_CACHE", cache)
+    pipeline.CACHE.clear()
+    yield cache
+    pipeline.CACHE.clear()
+
+
+def entries(cache):
+    return sorted(name for name in os.listdir(cache.root) if name.endswith(disk_cache.SUFFIX))
+
+
+def test_cache_dir_is_per_user():
+    assert os.path.isabs(disk_cache.user_cache_dir())
+
+
+def test_entries_round_trip(cache):
+    fresh = pipeline.phase_output("execution", CODE)
+    pipeline.CACHE.clear()
+
+    loaded = pipeline.phase_output("execution", CODE)
+
+    assert loaded is not fresh
+    assert loaded["values"] == fresh["values"]
+    tokens = pipeline.phase_output("lexer", CODE)["tokens"]
+    assert [repr(t) for t in tokens] == [repr(t) for t in pipeline.PHASES["lexer"](CODE, None)["tokens"]]
+
+
+def test_damaged_entry_is_a_miss(cache):
+    pipeline.phase_output("parser", CODE)
+    pipeline.CACHE.clear()
+
+    for name in entries(cache):
+        with open(os.path.join(cache.root, name), "r+b") as f:
+            f.write(b"basura")
+
+    assert pipeline.phase_output("parser", CODE)["tree"].body
+
+
+def test_memory_error_is_not_cached(cache, monkeypatch):
+    def out_of_memory(code, digest):
+        raise MemoryError
+
+    monkeypatch.setitem(pipeline.PHASES, "lexer", out_of_memory)
+    result = pipeline.phase_output("semantic", CODE)
+
+    assert [e["message"] for e in result["errors"]] == ["Memoria insuficiente"]
+    # ni la fase que falló ni las que dependen de ella
+    assert not pipeline.CACHE.entries
+    assert not os.path.exists(cache.root) or not entries(cache)
+
+    monkeypatch.undo()
+    assert pipeline.phase_output("semantic", CODE)["errors"] == []
+
+
+def test_prune_runs_on_threshold(cache, monkeypatch):
+    calls = []
+    prune = cache.prune
+    monkeypatch.setattr(cache, "prune", lambda: calls.append(1) or prune())
+    cache.max_bytes = 1 << 30
+
+    for n in range(20):
+        pipeline.phase_output("parser", f"int x = {n};\n")
+
+    # solo con la primera entrada: lo escrito no llega al umbral
+    assert calls == [1]
+
+    cache.max_bytes = disk_cache.PRUNE_FRACTION * 200
+    for n in range(20, 30):
+        pipeline.phase_output("parser", f"int x = {n};\n")
+    assert len(calls) > 1
+
+
+def test_prune_removes_other_versions(cache):
+    os.makedirs(cache.root)
+    stale = os.path.join(cache.root, "abc-lexer-0.entry")
+    open(stale, "wb").close()
+
+    pipeline.phase_output("lexer", CODE)
+
+    assert not os.path.exists(stale)
+    assert entries(cache)
@@ -0,0 +1,44 @@
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+from PyQt6.QtGui import QTextCursor
+
+from compiler.lexer import Lexer
+from ui.editor import CodeEditor
+
+
+def tokens(buffer):
+    return list(zip(buffer.kinds, buffer.starts, buffer.ends))
+
+
+def test_set_plain_text_does_not_tokenize(qapp):
+    editor = CodeEditor()
+    editor.setPlainText("int x = 1;\n" * 100)
+
+    assert editor.lexer is None
+
+    cursor = editor.textCursor()
+    cursor.insertText("float y;\n")
+    assert editor.lexer is None
+
+
+def test_tokens_follow_edits(qapp):
+    editor = CodeEditor()
+    editor.setPlainText("int x = 1;\nx = x + 2;\n")
+    editor.tokens()
+
+    cursor = editor.textCursor()
+    cursor.setPosition(8)
+    cursor.insertText("23")
+    cursor.movePosition(QTextCursor.MoveOperation.End)
+    cursor.insertText("while (x > 1) { x = x / 2; }\n")
+
+    text = editor.toPlainText()
+    assert editor.tokens().source == text
+    assert tokens(editor.tokens()) == tokens(Lexer(text).tokenize(recover=True))
+
+    # texto nuevo: los tokens anteriores se descartan
+    editor.setPlainText("x = 1;")
+    assert editor.lexer is None
+    assert editor.tokens().source == "x = 1;"
@@ -0,0 +1,118 @@
+import sys
+
+import pytest
+
+from compiler import executor
+from compiler.ast_nodes import INT_MAX, INT_MIN
+from compiler.executor import JNLT, VM, ExecutionError, assemble, execute
+from compiler.intermediate import IFFALSE, LT, generate
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+
+
+def ir_of(code):
+    return generate(Parser(Lexer(code).tokenize()).parse())
+
+
+def run(code, max_jumps=executor.MAX_JUMPS):
+    return dict(execute(ir_of(code), max_jumps))
+
+
+def opcodes(bytecode):
+    return bytecode.code[::4].tolist()
+
+
+# =========================
+# COMPARACIÓN + SALTO
+# =========================
+
+def test_compare_and_branch_are_fused():
+    bytecode = assemble(ir_of("int i = 0;\nwhile (i < 5) { i = i + 1; }\n"))
+    ops = opcodes(bytecode)
+
+    assert JNLT in ops
+    assert LT not in ops and IFFALSE not in ops
+
+
+@pytest.mark.parametrize("op, values", [
+    ("<", (1, 0, 0)), (">", (0, 0, 1)), ("<=", (1, 1, 0)),
+    (">=", (0, 1, 1)), ("==", (0, 1, 0)), ("!=", (1, 0, 1)),
+])
+def test_fused_branches(op, values):
+    for b, expected in zip((2, 1, 0), values):
+        code = f"int a = 1;\nint r = 0;\nif (a {op} {b}) {{ r = 1; }}\n"
+        assert run(code)["r"] == expected, (op, b)
+
+
+# =========================
+# ENTEROS DE 64 BITS
+# =========================
+
+def test_int_wraps_around():
+    values = run(
+        f"int big = {INT_MAX};\n"
+        "int add = big + 1;\n"
+        "int sub = -big - 2;\n"
+        "int mul = big * 2;\n"
+        "int neg = -(-big - 1);\n"
+        "int div = (-big - 1) / -1;\n"
+    )
+
+    assert values["add"] == INT_MIN
+    assert values["sub"] == INT_MAX
+    assert values["mul"] == -2
+    assert values["neg"] == INT_MIN
+    assert values["div"] == INT_MIN
+
+
+def test_int_division_truncates_toward_zero():
+    values = run("int a = -7 / 2;\nint b = 7 / -2;\nint c = -7 / -2;\n")
+    assert (values["a"], values["b"], values["c"]) == (-3, -3, 3)
+
+
+def test_float_does_not_wrap():
+    assert run("float f = 9223372036854775807 * 4.0;\n")["f"] == INT_MAX * 4.0
+
+
+# =========================
+# ERRORES
+# =========================
+
+@pytest.mark.parametrize("code", [
+    "int a = 0;\nint b = 1 / a;\n",
+    "float a = 0.0;\nfloat b = 1.0 / a;\n",
+])
+def test_division_by_zero(code):
+    with pytest.raises(ExecutionError, match="División entre cero"):
+        run(code)
+
+
+def test_jump_limit_stops_infinite_loop():
+    code = "int i = 0;\nwhile (i < 1) { i = i * 1; }\n"
+
+    with pytest.raises(ExecutionError, match="Límite de iteraciones"):
+        run(code, max_jumps=1000)
+
+
+def test_jump_limit_counts_backward_jumps_only():
+    code = "int i = 0;\nwhile (i < 10) { i = i + 1; }\n"
+
+    # 10 vueltas: 10 saltos hacia atrás
+    assert run(code, max_jumps=11)["i"] == 10
+    with pytest.raises(ExecutionError):
+        run(code, max_jumps=10)
+
+
+def test_vm_reruns_from_initial_frame():
+    vm = VM(assemble(ir_of("int i = 0;\nwhile (i < 3) { i = i + 1; }\n")))
+    assert vm.run() == vm.run() == [("i", 3)]
+
+
+def test_main_from_import(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "a.txt"
+    path.write_text("int x = 2;\nx = x * 21;\n", encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["executor.py", "-O0", str(path)])
+
+    executor.main()
+
+    assert capsys.readouterr().out == "x = 42\n"
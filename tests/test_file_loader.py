@@ -0,0 +1,59 @@
+import codecs
+
+import pytest
+
+pytest.importorskip("PyQt6.QtCore")
+
+from ui.autosave import atomic_write
+from ui.file_loader import FALLBACK_ENCODING, SAMPLE_BYTES, detect_encoding, read_text_chunks
+
+
+def load(data, chunk_bytes):
+    encoding = detect_encoding(data[:SAMPLE_BYTES], len(data) <= SAMPLE_BYTES)
+    text = "".join(text for text, _ in read_text_chunks(data, encoding, chunk_bytes))
+    return text, encoding
+
+
+@pytest.mark.parametrize("data, encoding", [
+    (b"", "utf-8"),
+    ("int x = 1;\nfloat ñ = 2.5;\n".encode("utf-8"), "utf-8"),
+    (codecs.BOM_UTF8 + "a = é;\n".encode("utf-8"), "utf-8-sig"),
+    (codecs.BOM_UTF16_LE + "x = 1;\n\U0001F600\n".encode("utf-16-le"), "utf-16"),
+    ("a = 1; // café\n".encode("cp1252"), FALLBACK_ENCODING),
+    # 0x81 no existe en cp1252: queda como sustituto y se guarda igual
+    (b"a = 1;\n\x81\xe9\n", FALLBACK_ENCODING),
+])
+def test_detect_encoding(data, encoding):
+    assert load(data, 5)[1] == encoding
+
+
+# un carácter de varios bytes partido al final de la muestra sigue
+# siendo UTF-8
+def test_detect_encoding_split_character():
+    sample = ("a" * 10 + "é").encode("utf-8")[:-1]
+    assert detect_encoding(sample, complete=False) == "utf-8"
+    assert detect_encoding(sample, complete=True) == FALLBACK_ENCODING
+
+
+@pytest.mark.parametrize("data", [
+    "int x = 1;\nfloat ñ = 2.5;\n\U0001F600\n".encode("utf-8"),
+    codecs.BOM_UTF8 + "a = é;\n".encode("utf-8"),
+    codecs.BOM_UTF16_LE + "x = 1;\n\U0001F600 y\n".encode("utf-16-le"),
+    "a = 1; // café\n".encode("cp1252"),
+    b"a = 1;\n\x81\x8d\xe9\n",
+    # byte inválido de UTF-8 después de la muestra
+    b"a" * (SAMPLE_BYTES + 10) + b"\xff\n",
+])
+@pytest.mark.parametrize("chunk_bytes", [1, 3, 4096])
+def test_save_round_trip(tmp_path, data, chunk_bytes):
+    text, encoding = load(data, chunk_bytes)
+
+    path = tmp_path / "a.txt"
+    atomic_write(str(path), text, encoding)
+
+    assert path.read_bytes() == data
+
+
+def test_line_endings_normalized():
+    text, _ = load(b"a\r\nb\rc\n", 2)
+    assert text == "a\nb\nc\n"
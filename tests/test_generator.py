@@ -0,0 +1,88 @@
+import pytest
+
+import benchmarks.generator as generator
+from benchmarks.generator import (
+    MIXES, format_size, generate_program, generate_source, parse_mix, parse_size,
+)
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+from compiler.semantic import SemanticAnalyzer
+
+
+def semantic_errors(code):
+    tokens = Lexer(code).tokenize()
+    program = Parser(tokens).parse()
+    analyzer = SemanticAnalyzer(locate=tokens.line_col)
+    analyzer.analyze(program)
+    return analyzer.errors, program
+
+
+# =========================
+# PROGRAMAS VÁLIDOS
+# =========================
+
+@pytest.mark.parametrize("mix", sorted(MIXES))
+def test_every_mix_is_valid(mix):
+    code = generate_source(50000, mix, seed=7)
+
+    errors, _ = semantic_errors(code)
+
+    assert errors == []
+    # el último renglón puede pasarse un poco del tamaño pedido
+    assert abs(len(code) - 50000) < 200
+
+
+def test_repeated_segment_is_valid(monkeypatch):
+    monkeypatch.setattr(generator, "SEGMENT_BYTES", 2000)
+
+    code = generate_source(30000, "mixed", seed=1)
+
+    assert semantic_errors(code)[0] == []
+    assert code.endswith("\n")
+    assert len(code) <= 30000
+
+
+def test_same_seed_same_program():
+    assert generate_source(5000, "control", seed=4) == generate_source(5000, "control", seed=4)
+    assert generate_source(5000, "control", seed=4) != generate_source(5000, "control", seed=5)
+
+
+def test_program_statement_count():
+    errors, program = semantic_errors(generate_program(200, "mixed", seed=2))
+
+    assert errors == []
+    assert len(program.body) == 200
+
+
+# =========================
+# ARGUMENTOS
+# =========================
+
+def test_parse_size():
+    assert parse_size("2048") == 2048
+    assert parse_size("512KB") == 512 << 10
+    assert parse_size(" 1.5mb ") == 3 << 19
+    assert parse_size("1G") == 1 << 30
+    assert parse_size("3k") == 3 << 10
+
+    with pytest.raises(ValueError):
+        parse_size("diez MB")
+
+
+def test_format_size():
+    assert format_size(1 << 20) == "1MB"
+    assert format_size(1536) == "1536B"
+    assert format_size(2048) == "2KB"
+
+
+def test_parse_mix():
+    assert parse_mix("control") == MIXES["control"]
+    assert parse_mix("control,terms=4,while=0") == dict(MIXES["control"], terms=4, **{"while": 0})
+    assert parse_mix("floats=0.5") == dict(MIXES["mixed"], floats=0.5)
+
+    with pytest.raises(ValueError, match="Mezcla desconocida"):
+        parse_mix("otra")
+    with pytest.raises(ValueError, match="Parámetro de mezcla desconocido"):
+        parse_mix("mixed,loops=2")
+    with pytest.raises(ValueError, match="ninguna sentencia"):
+        generate_source(100, "arithmetic,assign=0")
@@ -0,0 +1,138 @@
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+from PyQt6.QtGui import QFont, QTextCursor
+
+import ui.editor as editor_module
+from ui.editor import CodeEditor
+
+
+def settle(qapp, rounds=20):
+    for _ in range(rounds):
+        qapp.processEvents()
+
+
+def shown(text, size=(400, 300)):
+    editor = CodeEditor()
+    editor.resize(*size)
+    editor.show()
+    editor.setPlainText(text)
+    return editor
+
+
+@pytest.fixture
+def large(qapp, monkeypatch):
+    monkeypatch.setattr(editor_module, "LARGE_FILE_CHARS", 1000)
+    editor = shown("int x = 1;\n" * 5000)
+    settle(qapp)
+    yield editor
+    editor.close()
+
+
+# =========================
+# ANCHO DEL MARGEN
+# =========================
+
+def test_width_follows_digits(qapp):
+    editor = shown("x;\n" * 8)
+    digit = editor.fontMetrics().horizontalAdvance("9")
+
+    assert editor.lineNumberAreaWidth() == 3 + digit
+    editor.setPlainText("x;\n" * 120)
+    assert editor.lineNumberAreaWidth() == 3 + 3 * digit
+    assert editor.gutter_width == editor.lineNumberAreaWidth()
+    editor.close()
+
+
+def test_margins_set_only_when_width_changes(qapp, monkeypatch):
+    editor = shown("x;\n" * 20)
+    calls = []
+    monkeypatch.setattr(editor, "setViewportMargins", lambda *args: calls.append(args))
+
+    editor.textCursor().insertText("y;\n")
+    editor.updateLineNumberAreaWidth(0)
+    assert calls == []
+
+    # de 99 a 100 líneas cambia la cantidad de dígitos
+    cursor = editor.textCursor()
+    for _ in range(80):
+        cursor.insertText("y;\n")
+    assert calls == [(editor.gutter_width, 0, 0, 0)]
+    editor.close()
+
+
+# =========================
+# MODO DE ARCHIVO GRANDE
+# =========================
+
+def test_normal_file_paints_without_cache(qapp):
+    editor = shown("int x = 1;\n" * 50)
+
+    editor.lineNumberArea.grab()
+
+    assert not editor.large_file
+    assert editor.line_numbers == {}
+    editor.close()
+
+
+def test_line_numbers_are_cached(qapp, large):
+    large.lineNumberArea.grab()
+
+    first = dict(large.line_numbers)
+    assert 1 in first
+    assert first[1].text() == "1"
+
+    large.lineNumberArea.grab()
+    assert all(large.line_numbers[n] is text for n, text in first.items())
+
+
+def test_scrolling_paints_new_numbers(qapp, large):
+    bar = large.verticalScrollBar()
+    bar.setValue(bar.maximum())
+    settle(qapp)
+
+    large.lineNumberArea.grab()
+
+    assert large.blockCount() in large.line_numbers
+
+
+def test_cache_is_bounded(qapp, large, monkeypatch):
+    monkeypatch.setattr(editor_module, "LINE_NUMBER_CACHE", 10)
+
+    for n in range(1, 40):
+        large.line_number_text(n)
+
+    assert len(large.line_numbers) <= 10
+
+
+def test_font_change_drops_cache(qapp, large):
+    large.lineNumberArea.grab()
+    assert large.line_numbers
+
+    large.setFont(QFont(large.font().family(), 20))
+
+    assert large.line_numbers == {}
+    assert large.line_height is None
+
+
+def test_current_line_once_per_loop(qapp, large, monkeypatch):
+    calls = []
+    original = large.setExtraSelections
+    monkeypatch.setattr(large, "setExtraSelections", lambda s: (calls.append(s), original(s)))
+
+    cursor = large.textCursor()
+    for _ in range(5):
+        cursor.movePosition(QTextCursor.MoveOperation.Down)
+        large.setTextCursor(cursor)
+    assert calls == []
+
+    settle(qapp)
+    assert len(calls) == 1
+    assert large.current_line == 5
+
+    # mismo bloque: no se rearma la selección
+    cursor.movePosition(QTextCursor.MoveOperation.Right)
+    large.setTextCursor(cursor)
+    settle(qapp)
+    assert len(calls) == 1
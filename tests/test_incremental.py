@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+import compiler.incremental as incremental
+from compiler.incremental import IncrementalLexer
+from compiler.lexer import Lexer
+
+
+PIECES = [
+    "a", "int", " ", "\n", "3", ".5", "x1", "==", "=", "(", ")", "  ", "while",
+    "{", "}", "é", "$", "12.", "b_2", ";", "q" * 45, "7" * 30,
+]
+
+
+# bloques chicos: las ediciones cruzan bordes, parten y juntan bloques
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(incremental, "CHUNK_SIZE", 64)
+    monkeypatch.setattr(incremental, "CHUNK_MAX", 128)
+    monkeypatch.setattr(incremental, "CHUNK_MIN", 16)
+
+
+def tokens(buffer):
+    return list(zip(buffer.kinds, buffer.starts, buffer.ends))
+
+
+def random_text(rng, pieces):
+    return "".join(rng.choice(PIECES) for _ in range(pieces))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_apply_edit_matches_full_tokenize(small_chunks, seed):
+    rng = random.Random(seed)
+    text = random_text(rng, 300)
+    lexer = IncrementalLexer(text)
+
+    for step in range(600):
+        position = rng.randint(0, len(text))
+        removed = rng.randint(0, min(len(text) - position, rng.choice([0, 1, 3, 50, 400])))
+        added = random_text(rng, rng.choice([0, 1, 2, 5, 80]))
+
+        text = text[:position] + added + text[position + removed:]
+        lexer.apply_edit(position, removed, added)
+
+        assert lexer.length == len(text)
+
+        if step % 25 == 0:
+            buffer = lexer.token_buffer()
+            assert buffer.source == text
+            assert tokens(buffer) == tokens(Lexer(text).tokenize(recover=True))
+            assert lexer.text(10, 50) == text[10:50]
+
+    assert tokens(lexer.token_buffer()) == tokens(Lexer(text).tokenize(recover=True))
@@ -0,0 +1,86 @@
+import math
+import sys
+
+import compiler.intermediate as intermediate
+from compiler.intermediate import IRCode, generate
+from compiler.lexer import Lexer
+from compiler.optimizer import optimize
+from compiler.parser import Parser
+
+
+def ir_of(code):
+    return generate(Parser(Lexer(code).tokenize()).parse())
+
+
+def test_lines_of_a_while():
+    ir = ir_of("int i = 0;\nwhile (i < 2) { i = i + 1; }\n")
+
+    assert list(ir.lines()) == [
+        "0: i = 0",
+        "1: t1 = i < 2",
+        "2: iffalse t1 goto 5",
+        "3: i = i + 1",
+        "4: goto 1",
+    ]
+
+
+def test_lines_by_parts_keep_width():
+    ir = ir_of("int a = 0;\n" + "a = 1;\n" * 11)
+
+    assert list(ir.lines(9, 11)) == [" 9: a = 1", "10: a = 1"]
+    assert list(ir.lines(0, 2)) == ["0: a = 0", "1: a = 1"]
+
+
+def test_shadowed_variable_gets_own_slot():
+    ir = ir_of("int x = 1;\n{ int x = 2; x = x + 1; }\nx = x * 3;\nfloat f = x;\n")
+
+    assert list(ir.lines()) == [
+        "0: x = 1",
+        "1: x.1 = 2",
+        "2: x.1 = x.1 + 1",
+        "3: x = x * 3",
+        "4: f = float(x)",
+    ]
+
+
+# =========================
+# TABLA DE CONSTANTES
+# =========================
+
+def test_constants_keep_type_and_sign():
+    code = IRCode()
+
+    zero = code.constant(0.0)
+    negative = code.constant(-0.0)
+    integer = code.constant(0)
+
+    assert len({zero, negative, integer}) == 3
+    assert code.constant(0.0) == zero
+    assert math.copysign(1, code.constants[-negative - 1]) == -1
+    assert type(code.constants[-integer - 1]) is int
+
+
+def test_folded_negative_zero_stays_negative():
+    ir, _ = optimize(ir_of("float a = -0.0;\nfloat b = 0.0;\n"), 1)
+
+    assert list(ir.lines()) == ["0: a = -0.0", "1: b = 0.0"]
+
+
+def test_nbytes_counts_tables():
+    small = ir_of("int a = 1;\n")
+    names = ir_of("".join(f"int v{n} = {n};\n" for n in range(50)))
+
+    assert names.nbytes() - small.nbytes() > 50 * (4 * 4)
+
+
+# main() se puede llamar desde un import, no solo como script
+def test_main_from_import(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "a.txt"
+    path.write_text("int a = 2 * 3;\n", encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["intermediate.py", "-O1", str(path)])
+
+    intermediate.main()
+
+    captured = capsys.readouterr()
+    assert captured.out == "0: a = 6\n"
+    assert "fold" in captured.err
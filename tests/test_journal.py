@@ -0,0 +1,120 @@
+import os
+import random
+
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+from PyQt6.QtGui import QTextCursor
+
+from ui.editor import CodeEditor
+from ui.journal import EditJournal, JournalSession, recover
+
+
+PIECES = ["a", "😀", "int x = 3;\n", "\n", "é", "1.5", "🎉🎉", "if (x) {", "}"]
+
+
+def journaled_editor(root, text=""):
+    editor = CodeEditor()
+    editor.setPlainText(text)
+
+    journal = EditJournal(str(root))
+    journal.start({"path": None, "title": "t", "encoding": "utf-8"}, text)
+    editor.edited.connect(journal.record)
+
+    return editor, journal
+
+
+def recovered_text(root, journal):
+    journal.close()
+    [(meta, text)] = recover(str(root))
+    return text
+
+
+# posiciones de Qt (unidades UTF-16) entre caracteres completos
+def boundaries(text):
+    positions = [0]
+    for char in text:
+        positions.append(positions[-1] + (2 if ord(char) > 0xFFFF else 1))
+    return positions
+
+
+def test_replay_after_non_bmp_character(qapp, tmp_path):
+    editor, journal = journaled_editor(tmp_path, "a😀b")
+    editor.tokens()
+
+    cursor = editor.textCursor()
+    cursor.movePosition(QTextCursor.MoveOperation.End)
+    cursor.insertText("c")
+
+    assert editor.tokens().source == "a😀bc"
+    assert recovered_text(tmp_path, journal) == "a😀bc"
+
+
+def test_replay_matches_document(qapp, tmp_path):
+    rng = random.Random(7)
+    editor, journal = journaled_editor(tmp_path)
+
+    for _ in range(400):
+        positions = boundaries(editor.toPlainText())
+        cursor = editor.textCursor()
+        action = rng.random()
+
+        if action < 0.6:
+            cursor.setPosition(rng.choice(positions))
+            cursor.insertText(rng.choice(PIECES))
+        elif action < 0.85:
+            start = rng.randrange(len(positions))
+            end = min(start + rng.randint(0, 4), len(positions) - 1)
+            cursor.setPosition(positions[start])
+            cursor.setPosition(positions[end], QTextCursor.MoveMode.KeepAnchor)
+            cursor.removeSelectedText()
+        elif action < 0.95:
+            editor.undo()
+        else:
+            editor.redo()
+
+        assert editor.tokens().source == editor.toPlainText()
+
+    assert recovered_text(tmp_path, journal) == editor.toPlainText()
+
+
+def test_rebase_keeps_edits_made_while_saving(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("base\n")
+    meta = {"path": str(path), "title": "a", "encoding": "utf-8"}
+
+    root = tmp_path / "journal"
+    journal = EditJournal(str(root))
+    journal.start(meta)
+    journal.record(5, 0, "one\n")
+
+    # el autoguardado copia el texto, se sigue escribiendo y después
+    # el archivo queda en disco
+    mark = journal.mark()
+    journal.record(9, 0, "two\n")
+    path.write_text("base\none\n")
+    journal.rebase(meta, mark)
+
+    assert recovered_text(root, journal) == "base\none\ntwo\n"
+
+
+def test_recovered_folder_kept_until_discarded(qapp, tmp_path):
+    # ventana que se cae: el candado se suelta y la carpeta queda
+    crashed = JournalSession(str(tmp_path))
+    journal = crashed.journal()
+    journal.start({"path": None, "title": "t", "encoding": "utf-8"}, "sin guardar")
+    journal.close()
+    crashed.lock.unlock()
+
+    session = JournalSession(str(tmp_path))
+    [(meta, text)] = session.recover()
+    assert text == "sin guardar"
+
+    # hasta discard_recovered() la carpeta sigue y ninguna otra ventana
+    # la toma
+    assert os.path.isdir(crashed.folder)
+    assert JournalSession(str(tmp_path)).recover() == []
+
+    session.discard_recovered()
+    assert not os.path.exists(crashed.folder)
@@ -0,0 +1,93 @@
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+from PyQt6.QtGui import QTextCursor
+
+import ui.editor as editor_module
+import ui.syntax_highlighter as highlighter_module
+from ui.editor import CodeEditor
+from ui.syntax_highlighter import CLEAN, DIRTY, PREFETCH
+
+
+LINES = 5000
+
+
+def settle(qapp, rounds=50):
+    for _ in range(rounds):
+        qapp.processEvents()
+
+
+def states(editor):
+    document = editor.document()
+    return [document.findBlockByNumber(n).userState() for n in range(document.blockCount())]
+
+
+@pytest.fixture
+def editor(qapp, monkeypatch):
+    monkeypatch.setattr(editor_module, "LARGE_FILE_CHARS", 1000)
+
+    editor = CodeEditor()
+    editor.resize(400, 300)
+    editor.show()
+    editor.setPlainText("int x = 1;\n" * LINES)
+    yield editor
+    editor.close()
+
+
+def test_large_text_switches_to_lazy_mode(editor):
+    assert editor.large_file
+    assert editor.lazy_highlighter is not None
+    assert editor.highlighter.document() is None
+
+
+def test_only_visible_and_nearby_blocks(qapp, editor):
+    settle(qapp)
+
+    clean = states(editor)
+    visible = editor.lazy_highlighter.ranges()[0][1]
+
+    assert clean[:visible] == [CLEAN] * visible
+    assert clean.count(CLEAN) <= visible + PREFETCH
+    assert clean[-1] == DIRTY
+
+    layout = editor.document().firstBlock().layout()
+    assert [(r.start, r.length) for r in layout.formats()][0] == (0, 3)
+
+
+def test_scrolling_highlights_new_view(qapp, editor):
+    settle(qapp)
+    bar = editor.verticalScrollBar()
+
+    bar.setValue(bar.maximum())
+    settle(qapp)
+
+    assert states(editor)[-1] == CLEAN
+    # lo del medio nunca estuvo a la vista
+    assert states(editor)[LINES // 2] == DIRTY
+
+
+def test_edit_marks_block_dirty_again(qapp, editor):
+    settle(qapp)
+    document = editor.document()
+
+    cursor = QTextCursor(document.findBlockByNumber(2))
+    cursor.insertText("while ")
+
+    assert document.findBlockByNumber(2).userState() == DIRTY
+    settle(qapp)
+
+    block = document.findBlockByNumber(2)
+    assert block.userState() == CLEAN
+    assert [(r.start, r.length) for r in block.layout().formats()][0] == (0, 5)
+
+
+def test_work_is_split_in_slices(qapp, editor, monkeypatch):
+    # un bloque por porción: el resto queda para las vueltas siguientes
+    monkeypatch.setattr(highlighter_module, "SLICE", -1)
+    editor.setPlainText("int y = 2;\n" * LINES)
+
+    editor.lazy_highlighter.run()
+
+    assert states(editor).count(CLEAN) == 1
+    assert editor.lazy_highlighter.timer.isActive()
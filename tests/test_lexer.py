@@ -0,0 +1,94 @@
+import pytest
+
+from benchmarks.bench_lexer import LegacyLexer
+from benchmarks.generator import MIXES, generate_source
+from compiler.lexer import LOOKAHEAD, Lexer
+
+
+# palabras clave pegadas a identificadores, operadores de dos
+# caracteres y números con y sin parte decimal
+EDGE_CASES = (
+    "int ifx = 1; float else2 = 2.50;\n"
+    "while(a<=b){a=a+1;} if (x==y) z = x!=y; else main = _t9 >= 0.0/7;\n"
+    "intx=int;whilewhile<>{}\t\n"
+)
+
+
+# =========================
+# PATRÓN MAESTRO
+# Los mismos tokens que el lexer anterior (un patrón por tipo en cada
+# posición), con la prioridad de TOKEN_TYPES.
+# =========================
+
+@pytest.mark.parametrize("mix", sorted(MIXES))
+def test_same_tokens_as_legacy_lexer(mix):
+    code = generate_source(20000, mix, seed=3)
+
+    assert Lexer(code).tokenize() == LegacyLexer(code).tokenize()
+
+
+def test_edge_cases_match_legacy_lexer():
+    assert Lexer(EDGE_CASES).tokenize() == LegacyLexer(EDGE_CASES).tokenize()
+
+
+def test_unknown_character():
+    with pytest.raises(SyntaxError, match=r"Token desconocido: \$ en 2:3"):
+        Lexer("x;\n  $").tokenize()
+
+    lexer = Lexer("x = $;")
+    tokens = lexer.tokenize(recover=True)
+
+    assert [t.type for t in tokens] == ["IDENTIFIER", "ASSIGN", "MISMATCH", "SEMICOLON"]
+    assert [str(e) for e in lexer.errors] == ["Token desconocido: $ en 1:5"]
+
+
+# =========================
+# TOKENS POR BLOQUES
+# iter_tokens() sobre un archivo leído en bloques pequeños da los
+# mismos tokens, líneas y columnas que tokenize() sobre el texto entero.
+# =========================
+
+def positions(tokens):
+    return [(t.type, t.lexeme, t.line, t.col, t.start) for t in tokens]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, LOOKAHEAD, LOOKAHEAD + 1, 100])
+def test_chunks_match_whole_text(tmp_path, chunk_size):
+    code = EDGE_CASES + generate_source(3000, "mixed", seed=5)
+    path = tmp_path / "a.txt"
+    path.write_text(code, encoding="utf-8")
+
+    chunked = Lexer.from_file(str(path), chunk_size).iter_tokens()
+
+    assert positions(chunked) == positions(Lexer(code).tokenize())
+
+
+def test_token_longer_than_chunk(tmp_path):
+    name = "x" * (3 * LOOKAHEAD)
+    code = f"int {name} = 12345.678;\n{name} = {name};\n"
+    path = tmp_path / "a.txt"
+    path.write_text(code, encoding="utf-8")
+
+    chunked = Lexer.from_file(str(path), chunk_size=8).iter_tokens()
+
+    assert positions(chunked) == positions(Lexer(code).tokenize())
+
+
+def test_multibyte_character_split_between_chunks(tmp_path):
+    # "ñ" ocupa dos bytes: con bloques de 3 bytes queda partida
+    path = tmp_path / "a.txt"
+    path.write_text("x;\nñ = 1;\n", encoding="utf-8")
+    lexer = Lexer.from_file(str(path), chunk_size=3)
+
+    tokens = list(lexer.iter_tokens(recover=True))
+
+    assert tokens[2] == ("MISMATCH", "ñ")
+    assert (tokens[2].line, tokens[2].col) == (2, 1)
+    assert [str(e) for e in lexer.errors] == ["Token desconocido: ñ en 2:1"]
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "vacio.txt"
+    path.write_bytes(b"")
+
+    assert list(Lexer.from_file(str(path)).iter_tokens()) == []
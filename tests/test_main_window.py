@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+from PyQt6 import sip
+from PyQt6.QtCore import QCoreApplication, QEvent
+
+
+# configuración, diarios y caché en carpetas de la prueba
+@pytest.fixture
+def window(qapp, tmp_path, monkeypatch):
+    for name in ("XDG_CONFIG_HOME", "XDG_DATA_HOME", "XDG_CACHE_HOME"):
+        monkeypatch.setenv(name, str(tmp_path / name.lower()))
+
+    from ui.main_window import MainWindow
+
+    window = MainWindow()
+    yield window
+    window.close()
+    window.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+
+
+def flush_deletes():
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+
+
+def test_close_file_uses_history_and_deletes_editor(window):
+    editor = window.current_editor()
+    editor.setPlainText("int x = 1;\n")
+
+    window.close_file()
+    flush_deletes()
+
+    assert sip.isdeleted(editor)
+    assert len(window.closed_tabs) == 1
+
+    window.reopen_last_tab()
+    assert window.current_editor().toPlainText() == "int x = 1;\n"
@@ -0,0 +1,123 @@
+import pytest
+
+from compiler.ast_nodes import wrap_int
+from compiler.intermediate import ADD, DIV, IDIV, MUL, generate
+from compiler.lexer import Lexer
+from compiler.optimizer import LEVELS, evaluate, level_from_args, optimize
+from compiler.parser import Parser
+
+
+def ir_of(code):
+    return generate(Parser(Lexer(code).tokenize()).parse())
+
+
+def optimized(code, level):
+    ir, _ = optimize(ir_of(code), level)
+    return [line.split(": ", 1)[1] for line in ir.lines()]
+
+
+# =========================
+# NIVELES
+# =========================
+
+def test_level_zero_keeps_code():
+    code = "int a = 2 * 3;\nint b = a + 1;\n"
+    ir = ir_of(code)
+
+    same, stats = optimize(ir, 0)
+
+    assert same is ir
+    assert stats == []
+
+
+def test_stats_follow_level_passes():
+    for level, passes in LEVELS.items():
+        _, stats = optimize(ir_of("int a = 1;\n"), level)
+        assert [s["pass"] for s in stats] == list(passes)
+
+
+def test_cached_code_is_not_modified():
+    ir = ir_of("int a = 2 * 3;\nint b = a + 1;\n")
+    before = list(ir.lines())
+
+    optimize(ir, 2)
+
+    assert list(ir.lines()) == before
+
+
+def test_level_from_args():
+    assert level_from_args(["a.txt", "-O2"]) == (2, ["a.txt"])
+    assert level_from_args(["a.txt"]) == (1, ["a.txt"])
+    assert level_from_args(["-O0", "-O1"], default=2) == (1, [])
+
+
+# =========================
+# PLEGADO Y CÓDIGO MUERTO
+# =========================
+
+def test_constants_are_folded_and_propagated():
+    assert optimized("int a = 2 * 3;\nint b = a + 1;\n", 1) == ["a = 6", "b = 7"]
+
+
+def test_int_folding_wraps_like_the_vm():
+    code = "int a = 9223372036854775807;\nint b = a + 1;\n"
+
+    assert optimized(code, 1)[-1] == "b = -9223372036854775808"
+
+
+def test_division_by_zero_is_kept():
+    code = "int a = 0;\nint b = 1 / a;\nint c = 5;\n"
+
+    for level in (1, 2):
+        # se propaga el divisor pero la división queda: falla al correr
+        assert optimized(code, level) == ["a = 0", "b = 1 / 0", "c = 5"]
+
+
+def test_dead_branch_is_removed():
+    code = "int a = 1;\nif (a > 2) { a = 5; }\nint c = a;\n"
+
+    lines = optimized(code, 1)
+
+    assert "a = 5" not in lines
+    assert lines[-1] == "c = a"
+
+
+def test_overwritten_store_is_removed():
+    code = "int a = 4;\nint b;\nb = -a;\n"
+
+    _, stats = optimize(ir_of(code), 1)
+
+    assert optimized(code, 1) == ["a = 4", "b = -4"]
+    assert stats[-1]["removed"] == 1
+
+
+# =========================
+# INVARIANTES DE LOS WHILE
+# =========================
+
+def test_invariant_is_hoisted_out_of_loop():
+    code = (
+        "int a = 1;\nint b = 0;\nint i = 0;\n"
+        "while (i < 3) { b = a * 4; i = i + 1; }\n"
+    )
+
+    lines = optimized(code, 2)
+
+    head = next(n for n, line in enumerate(lines) if "i < 3" in line)
+    assert any(line.endswith("= 4") for line in lines[:head])
+    assert "b = a * 4" not in lines
+
+
+# =========================
+# EVALUACIÓN
+# =========================
+
+def test_evaluate_matches_vm_semantics():
+    assert evaluate(ADD, 2 ** 63 - 1, 1) == wrap_int(2 ** 63)
+    assert evaluate(MUL, 2 ** 62, 4) == 0
+    # la división entera trunca hacia cero
+    assert evaluate(IDIV, -7, 2) == -3
+    assert evaluate(DIV, 1, 4) == 0.25
+
+    with pytest.raises(ZeroDivisionError):
+        evaluate(IDIV, 1, 0)
@@ -0,0 +1,65 @@
+import sys
+
+import pytest
+
+from compiler import parser as parser_module
+from compiler.ast_nodes import Assign, Decl, If
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+from compiler.token_buffer import MAX_ERRORS
+
+
+def parse(code):
+    parser = Parser(Lexer(code).tokenize(), recover=True)
+    return parser.parse(), parser.errors
+
+
+# =========================
+# RECUPERACIÓN EN MODO PÁNICO
+# =========================
+
+def test_all_errors_in_one_pass():
+    code = (
+        "int x = 1;\n"
+        "x = ;\n"
+        "}\n"
+        "else x = 2;\n"
+        "float y = (1 + ;\n"
+        "y = y + 1;\n"
+    )
+    tree, errors = parse(code)
+
+    # un } y un else sueltos en el nivel superior también son errores
+    assert [(e.line, e.col) for e in errors] == [(2, 5), (3, 1), (4, 1), (5, 16)]
+    assert [type(node) for node in tree.body] == [Decl, Assign]
+    assert tree.body[1].name == "y"
+
+
+def test_error_count_is_capped():
+    _, errors = parse("x = ;\n" * (MAX_ERRORS + 50))
+    assert len(errors) == MAX_ERRORS
+
+
+def test_valid_statements_after_errors_are_kept():
+    tree, errors = parse("x = 1 +;\nif (x > 1) { x = 2; } else { x = 3; }\n")
+
+    assert len(errors) == 1
+    assert [type(node) for node in tree.body] == [If]
+    assert tree.body[0].orelse is not None
+
+
+def test_without_recovery_first_error_raises():
+    with pytest.raises(SyntaxError) as info:
+        Parser(Lexer("x = ;\ny = ;").tokenize()).parse()
+    assert (info.value.line, info.value.col) == (1, 5)
+
+
+# main() se puede llamar desde un import, no solo como script
+def test_main_from_import(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "a.txt"
+    path.write_text("int x = 1;\nx = ;\n", encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["parser.py", str(path)])
+
+    parser_module.main()
+
+    assert "Se esperaba NUMBER o ID en 2:5" in capsys.readouterr().out
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+
+from compiler.profiler import NULL_SPAN, Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+
+    with profiler.span("parser") as span:
+        pass
+
+    assert span is NULL_SPAN
+    assert profiler.summary() == []
+    assert profiler.chrome_trace()["traceEvents"] == []
+
+
+def test_span_statistics():
+    profiler = Profiler()
+    profiler.enable()
+
+    for delay in (0.01, 0.02):
+        with profiler.span("lexer"):
+            time.sleep(delay)
+    with profiler.span("parser"):
+        pass
+
+    lexer, parser = profiler.summary()
+
+    assert lexer["name"] == "lexer" and parser["name"] == "parser"
+    assert lexer["calls"] == 2
+    assert lexer["total"] >= 0.03
+    assert lexer["max"] >= 0.02
+    assert lexer["mean"] == lexer["total"] / 2
+    assert "lexer" in profiler.format_summary()
+
+
+def test_exception_still_records():
+    profiler = Profiler()
+    profiler.enable()
+
+    try:
+        with profiler.span("semantic"):
+            raise ValueError
+    except ValueError:
+        pass
+
+    assert profiler.summary()[0]["calls"] == 1
+
+
+def test_event_limit_keeps_stats():
+    profiler = Profiler(max_events=3)
+    profiler.enable()
+
+    for _ in range(5):
+        with profiler.span("fase"):
+            pass
+
+    assert profiler.summary()[0]["calls"] == 5
+    assert len(profiler.events) == 3
+    assert profiler.dropped == 2
+    assert "2 tramos fuera de la traza" in profiler.format_summary()
+
+
+# =========================
+# TRAZA DE CHROME
+# =========================
+
+def test_chrome_trace_shape(tmp_path):
+    profiler = Profiler()
+    profiler.enable()
+
+    with profiler.span("pipeline", category="ide", archivo="a.txt"):
+        with profiler.span("lexer"):
+            pass
+
+    def highlight():
+        with profiler.span("resaltado"):
+            pass
+
+    worker = threading.Thread(target=highlight, name="resaltador")
+    worker.start()
+    worker.join()
+
+    path = tmp_path / "traza.json"
+    profiler.export(str(path))
+    trace = json.loads(path.read_text(encoding="utf-8"))
+
+    complete = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    names = {e["tid"]: e["args"]["name"] for e in trace["traceEvents"] if e["ph"] == "M"}
+
+    lexer, pipeline, highlight = complete
+    assert (pipeline["name"], pipeline["cat"]) == ("pipeline", "ide")
+    assert pipeline["args"]["archivo"] == "a.txt"
+    assert "net_blocks" in lexer["args"]
+    # el tramo anidado queda dentro del externo
+    assert pipeline["ts"] <= lexer["ts"]
+    assert lexer["ts"] + lexer["dur"] <= pipeline["ts"] + pipeline["dur"]
+    assert names[highlight["tid"]] == "resaltador"
+    assert len(names) == 2
+    assert not (tmp_path / "traza.json.tmp").exists()
+
+
+def test_clear_forgets_spans():
+    profiler = Profiler()
+    profiler.enable()
+    with profiler.span("a"):
+        pass
+
+    profiler.clear()
+
+    assert profiler.summary() == []
+    assert profiler.dropped == 0
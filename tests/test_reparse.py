@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from benchmarks.generator import generate_program
+from compiler.lexer import Lexer
+from compiler.parser import Parser, reparse
+
+
+PIECES = ["1", "x", " ", "\n", ";", "}", "{", "+ 2", "i3 = 4;", "if (i1 > 2) ", "else ", "while (", "$"]
+
+
+# sin tope de errores: reparse solo cuenta los del tramo reanalizado y
+# un análisis completo que para en MAX_ERRORS perdería las sentencias
+# del final
+def full_parse(code):
+    lexer = Lexer(code)
+    parser = Parser(lexer.tokenize(recover=True), recover=True, max_errors=1 << 30)
+    return parser.parse(), lexer.errors + parser.errors
+
+
+def ranges(program):
+    return [(program.start(i), program.end(i)) for i in range(len(program.body))]
+
+
+def error_keys(errors):
+    return {(e.line, e.col, str(e)) for e in errors}
+
+
+@pytest.mark.parametrize("in_place", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_reparse_matches_full_parse(seed, in_place):
+    rng = random.Random(seed)
+    code = generate_program(80, seed=seed)
+    program, _ = full_parse(code)
+
+    for _ in range(150):
+        position = rng.randint(0, len(code))
+        removed = rng.randint(0, min(len(code) - position, rng.choice([0, 1, 5, 40])))
+        added = "".join(rng.choice(PIECES) for _ in range(rng.choice([0, 1, 2, 4])))
+
+        previous = program
+        code = code[:position] + added + code[position + removed:]
+        program, errors = reparse(program, code, position, removed, len(added), in_place)
+        expected, expected_errors = full_parse(code)
+
+        assert len(program.body) == len(expected.body)
+        assert program.body == expected.body
+        assert ranges(program) == ranges(expected)
+
+        # solo se informan los errores del tramo reanalizado
+        assert error_keys(errors) <= error_keys(expected_errors)
+        if not expected_errors:
+            assert errors == []
+
+        assert (program is previous) == in_place
+
+
+# la sentencia anterior a la edición también se reanaliza: un "if" puede
+# ganar un "else"
+def test_if_gains_else():
+    code = "int x = 1;\nif (x > 0) { x = 2; }\nx = 3;\n"
+    program, _ = full_parse(code)
+
+    position = code.index("\nx = 3")
+    added = " else { x = 4; }"
+    code = code[:position] + added + code[position:]
+    program, errors = reparse(program, code, position, 0, len(added))
+
+    expected, _ = full_parse(code)
+    assert errors == []
+    assert program.body == expected.body
+    assert ranges(program) == ranges(expected)
+    assert program.body[1].orelse is not None
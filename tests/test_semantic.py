@@ -0,0 +1,102 @@
+import sys
+
+import compiler.semantic as semantic
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+from compiler.semantic import SemanticAnalyzer, SymbolTable
+
+
+def analyze(code):
+    tokens = Lexer(code).tokenize()
+    analyzer = SemanticAnalyzer(locate=tokens.line_col)
+    analyzer.analyze(Parser(tokens).parse())
+    return [str(error) for error in analyzer.errors]
+
+
+# =========================
+# TABLA DE SÍMBOLOS
+# =========================
+
+def test_inner_scope_shadows_and_restores():
+    table = SymbolTable()
+    outer = table.declare("x", "int")
+
+    table.enter()
+    inner = table.declare("x", "float")
+    assert table.lookup("x") is inner
+    assert inner.previous is outer
+
+    table.enter()
+    assert table.lookup("x") is inner
+    table.declare("y", "int")
+    table.exit()
+
+    assert table.lookup("y") is None
+    table.exit()
+
+    assert table.lookup("x") is outer
+    assert table.depth == 0
+    assert len(table.symbols) == 3
+
+
+def test_redeclare_in_same_scope_fails():
+    table = SymbolTable()
+    table.declare("x", "int")
+
+    assert table.declare("x", "float") is None
+    assert table.lookup("x").type == "int"
+
+
+# =========================
+# ANÁLISIS
+# =========================
+
+def test_valid_program_has_no_errors():
+    code = "int x = 1;\n{ float x = 2.5; x = x * 2; }\nx = x + 1;\n"
+
+    assert analyze(code) == []
+
+
+def test_undeclared_variable():
+    assert analyze("int x = 1;\ny = x;\n") == ["Variable no declarada: y en 2:1"]
+
+
+def test_variable_out_of_scope():
+    errors = analyze("{ int x = 1; }\nint y = x;\n")
+
+    assert errors == ["Variable no declarada: x en 2:9"]
+
+
+def test_redeclared_variable():
+    assert analyze("int x;\nfloat x;\n") == ["Variable ya declarada: x en 2:1"]
+
+
+def test_float_to_int_is_rejected():
+    errors = analyze("float f = 1.5;\nint i = 2;\ni = i + f;\nf = i;\n")
+
+    assert errors == ["Tipo incompatible: no se puede asignar float a int en 3:1"]
+
+
+def test_declaration_sees_outer_variable():
+    # el valor se revisa antes de declarar: x es la de afuera
+    assert analyze("float x = 1.5;\n{ float x = x; }\n") == []
+    assert analyze("int x = x;\n") == ["Variable no declarada: x en 1:9"]
+
+
+def test_long_expression_does_not_recurse():
+    code = "int x = 0;\nx = " + " + ".join(["x"] * 20000) + ";\n"
+
+    assert analyze(code) == []
+
+
+# main() se puede llamar desde un import, no solo como script
+def test_main_from_import(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "a.txt"
+    path.write_text("int x = 1;\ny = 2;\n", encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["semantic.py", str(path)])
+
+    semantic.main()
+
+    out = capsys.readouterr().out
+    assert "x\tint\támbito 0\t1:1" in out
+    assert "Variable no declarada: y en 2:1" in out
@@ -0,0 +1,74 @@
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+from PyQt6.QtGui import QTextCursor
+
+from compiler.lexer import Lexer
+from ui.editor import CodeEditor
+from ui.syntax_highlighter import NORMAL, TOKEN_FORMATS, SyntaxHighlighter, token_formats
+
+
+def colors(block):
+    return [
+        (r.start, r.length, r.format.foreground().color().name())
+        for r in block.layout().formats()
+    ]
+
+
+class RecordingHighlighter(SyntaxHighlighter):
+
+    def __init__(self, document):
+        super().__init__(document)
+        self.seen = []
+
+    def highlightBlock(self, text):
+        self.seen.append(text)
+        super().highlightBlock(text)
+
+
+def highlighted(qapp, text):
+    editor = CodeEditor()
+    editor.highlighter.setDocument(None)
+    editor.highlighter = RecordingHighlighter(editor.document())
+    editor.setPlainText(text)
+    return editor.document(), editor.highlighter
+
+
+# =========================
+# MISMOS TOKENS QUE EL LEXER
+# =========================
+
+def test_formats_follow_lexer_tokens():
+    line = "int whilex = 12; if (whilex >= 3.5) main = $;"
+
+    expected = [
+        (t.start, t.end - t.start, TOKEN_FORMATS[t.type])
+        for t in Lexer(line).tokenize(recover=True)
+        if t.type in TOKEN_FORMATS
+    ]
+
+    assert list(token_formats(line)) == expected
+
+
+def test_block_formats(qapp):
+    document, _ = highlighted(qapp, "int x = 12; $\nwhile (x) { }\n")
+
+    first = document.firstBlock()
+    assert colors(first) == [
+        (0, 3, "#569cd6"), (6, 1, "#d4d4d4"), (8, 2, "#008f39"), (12, 1, "#f44747"),
+    ]
+    assert colors(first.next()) == [(0, 5, "#569cd6")]
+    assert first.userState() == NORMAL
+
+
+def test_edit_rehighlights_only_its_line(qapp):
+    document, highlighter = highlighted(qapp, "x = 1;\ny = 2;\nz = 3;\n")
+    highlighter.seen.clear()
+
+    cursor = QTextCursor(document.findBlockByNumber(1))
+    cursor.insertText("int ")
+
+    # el estado no cambia: Qt no sigue con las líneas de abajo
+    assert highlighter.seen == ["int y = 2;"]
+    assert colors(document.findBlockByNumber(1))[0] == (0, 3, "#569cd6")
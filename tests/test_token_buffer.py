@@ -0,0 +1,80 @@
+import pytest
+
+from compiler.lexer import Lexer
+from compiler.token_buffer import Token, TokenBuffer
+
+
+CODE = "int x = 1;\nfloat y = 2.5;\n\nx = x + 1;\n"
+
+
+def buffer():
+    return Lexer(CODE).tokenize()
+
+
+# =========================
+# VISTAS COMO TUPLAS
+# =========================
+
+def test_views_behave_like_tuples():
+    tokens = buffer()
+
+    assert tokens[0] == ("KEYWORD", "int")
+    assert tokens[-1] == ("SEMICOLON", ";")
+    assert tokens[1:3] == [("IDENTIFIER", "x"), ("ASSIGN", "=")]
+
+    kind, lexeme = tokens[8]
+    assert (kind, lexeme) == ("NUMBER", "2.5")
+    assert tokens[8][0] == "NUMBER"
+    assert hash(tokens[8]) == hash(("NUMBER", "2.5"))
+    assert tokens[8] == Token("NUMBER", "2.5")
+
+    with pytest.raises(IndexError):
+        tokens[len(tokens)]
+
+
+def test_view_positions():
+    view = buffer()[10]
+
+    assert view == ("IDENTIFIER", "x")
+    assert (view.line, view.col) == (4, 1)
+    assert CODE[view.start:view.end] == "x"
+
+
+def test_line_col_of_offsets():
+    tokens = buffer()
+
+    assert tokens.line_col(0) == (1, 1)
+    assert tokens.line_col(CODE.index("float")) == (2, 1)
+    # la línea vacía también cuenta
+    assert tokens.line_col(CODE.index("x = x")) == (4, 1)
+    assert tokens.line_col(len(CODE)) == (5, 1)
+
+
+def test_replace_source_drops_line_index():
+    tokens = buffer()
+    tokens.line_col(0)
+
+    tokens.replace_source("\n" + CODE)
+
+    assert tokens.line_col(1) == (2, 1)
+
+
+def test_stream_matches_views():
+    tokens = buffer()
+
+    assert list(tokens.stream()) == list(tokens)
+    assert [t.start for t in tokens.stream()] == list(tokens.starts)
+
+
+# =========================
+# SERIALIZACIÓN
+# =========================
+
+def test_dump_load_round_trip():
+    tokens = buffer()
+
+    loaded = TokenBuffer.load(CODE, tokens.dump())
+
+    assert loaded == tokens
+    assert list(loaded.ends) == list(tokens.ends)
+    assert loaded.nbytes() == 9 * len(tokens)
@@ -0,0 +1,234 @@
+import os
+import tempfile
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from compiler.profiler import span
+from ui.file_loader import DECODE_ERRORS
+
+
+# =========================
+# AUTOGUARDADO
+# Cada documento lleva su marca de modificado (QTextDocument.isModified):
+# solo se escriben las pestañas con cambios, y solo cuando se deja de
+# escribir por DELAY ms (o a lo más MAX_DELAY ms después del primer
+# cambio, si no se deja de escribir).
+#
+# El texto se copia en la ventana y lo escribe un hilo aparte: archivo
+# temporal en la misma carpeta, fsync y os.replace. Un disco lento no
+# traba el editor y el archivo nunca queda escrito a medias. Si entre
+# la copia y la escritura hubo más cambios, el documento sigue marcado
+# como modificado y se vuelve a guardar en la siguiente vuelta.
+#
+# Guardar a mano usa la misma cola: una copia vieja del mismo archivo
+# que todavía no se escribió se descarta, y una que se está escribiendo
+# termina antes. Así un autoguardado atrasado nunca pisa lo guardado a
+# mano.
+# =========================
+
+DELAY = 2000
+MAX_DELAY = 30000
+
+
+# umask del proceso, leída una vez al importar: os.umask solo se puede
+# leer cambiándola, y hacerlo mientras otro hilo crea archivos le
+# cambiaría los permisos a esos archivos
+def read_umask():
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+UMASK = read_umask()
+
+
+# el texto se codifica antes de tocar el disco: si la codificación del
+# archivo no puede representar algún carácter, el archivo queda intacto
+# y se lanza UnicodeEncodeError
+def atomic_write(path, text, encoding):
+
+    # saltos de línea del sistema, como open() en modo texto
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    data = text.encode(encoding, DECODE_ERRORS)
+
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(dir=folder, prefix=".autosave-", suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # conservar los permisos del archivo original; un archivo nuevo
+        # (o borrado desde afuera) queda como con open(): 0o666 menos la
+        # umask, no con el 0o600 de mkstemp
+        try:
+            mode = os.stat(path).st_mode
+        except OSError:
+            mode = 0o666 & ~UMASK
+        try:
+            os.chmod(temp, mode)
+        except OSError:
+            pass
+
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+class WriterSignals(QObject):
+    # editor, revisión guardada
+    saved = pyqtSignal(object, int)
+    # editor, ruta, mensaje
+    failed = pyqtSignal(object, str, str)
+
+
+# hilo de escritura: si llegan dos copias del mismo archivo antes de
+# escribirlo, solo se escribe la más nueva. waiter (guardado manual):
+# {"done": Event, "error": excepción o None} en lugar de las señales
+class BackgroundWriter:
+
+    def __init__(self, signals):
+        self.signals = signals
+        self.pending = {}
+        self.condition = threading.Condition()
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name="autosave", daemon=True)
+        self.thread.start()
+
+    def submit(self, editor, path, text, encoding, revision, waiter=None):
+        with self.condition:
+            self.pending[path] = (editor, text, encoding, revision, waiter)
+            self.condition.notify()
+
+    # guardado manual: espera su turno y lanza el error de la escritura
+    def write(self, path, text, encoding):
+
+        with self.condition:
+            closed = self.closed
+
+        if closed:
+            atomic_write(path, text, encoding)
+            return
+
+        waiter = {"done": threading.Event(), "error": None}
+        self.submit(None, path, text, encoding, None, waiter)
+        waiter["done"].wait()
+
+        if waiter["error"] is not None:
+            raise waiter["error"]
+
+    def run(self):
+
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+
+                if not self.pending:
+                    return
+
+                path, (editor, text, encoding, revision, waiter) = self.pending.popitem()
+
+            # cualquier error se informa y el hilo sigue (un error no
+            # previsto, p. ej. LookupError por una codificación
+            # desconocida, no puede terminar el autoguardado)
+            try:
+                with span("autosave.write", "ide", path=path):
+                    atomic_write(path, text, encoding)
+            except Exception as e:
+                if waiter is not None:
+                    waiter["error"] = e
+                else:
+                    self.signals.failed.emit(editor, path, str(e) or type(e).__name__)
+            else:
+                if waiter is None:
+                    self.signals.saved.emit(editor, revision)
+            finally:
+                if waiter is not None:
+                    waiter["done"].set()
+
+    # espera a que se escriba lo pendiente (al cerrar la ventana)
+    def close(self, timeout=5.0):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join(timeout)
+
+
+class AutoSaver(QObject):
+
+    # editor, revisión copiada para escribir
+    copied = pyqtSignal(object, int)
+    # editor, revisión escrita
+    saved = pyqtSignal(object, int)
+    failed = pyqtSignal(object, str, str)
+
+    def __init__(self, editors, parent=None):
+        super().__init__(parent)
+
+        # función que devuelve los editores abiertos
+        self.editors = editors
+        self.first_change = None
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.save_dirty)
+
+        self.signals = WriterSignals()
+        self.signals.saved.connect(self.on_saved)
+        self.signals.failed.connect(self.failed)
+        self.writer = BackgroundWriter(self.signals)
+
+    def watch(self, editor):
+        editor.document().contentsChanged.connect(self.schedule)
+
+    # se reinicia con cada cambio, sin pasar de MAX_DELAY desde el primero
+    def schedule(self):
+
+        now = time.monotonic()
+        if self.first_change is None:
+            self.first_change = now
+
+        waited = int((now - self.first_change) * 1000)
+        self.timer.start(max(0, min(DELAY, MAX_DELAY - waited)))
+
+    def save_dirty(self):
+
+        self.first_change = None
+
+        for editor in self.editors():
+            document = editor.document()
+
+            if not document.isModified() or not hasattr(editor, "file_path"):
+                continue
+
+            self.writer.submit(
+                editor, editor.file_path, editor.toPlainText(),
+                getattr(editor, "encoding", "utf-8"), document.revision(),
+            )
+            self.copied.emit(editor, document.revision())
+
+    def write(self, path, text, encoding):
+        self.writer.write(path, text, encoding)
+
+    def on_saved(self, editor, revision):
+        try:
+            document = editor.document()
+        except RuntimeError:
+            # la pestaña se cerró mientras se escribía
+            return
+
+        if document.revision() == revision:
+            document.setModified(False)
+
+        self.saved.emit(editor, revision)
+
+    def close(self):
+        self.timer.stop()
+        self.save_dirty()
+        self.writer.close()
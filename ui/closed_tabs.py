@@ -0,0 +1,157 @@
+import os
+import shutil
+import tempfile
+import zlib
+
+
+# =========================
+# HISTORIAL DE PESTAÑAS CERRADAS
+# Pila de las pestañas cerradas para reabrirlas (la última cerrada sale
+# primero). El texto se guarda comprimido con zlib y con tres límites:
+#
+#   max_entries   pestañas recordadas
+#   memory_bytes  bytes comprimidos en memoria; las más viejas pasan a
+#                 una carpeta temporal
+#   disk_bytes    bytes en la carpeta temporal
+#
+# Al pasar un límite se olvidan las menos recientes. La última cerrada
+# nunca se olvida, aunque por sí sola pase los límites.
+# =========================
+
+MAX_ENTRIES = 50
+MEMORY_BYTES = 8 << 20
+DISK_BYTES = 256 << 20
+
+# compresión rápida: se comprime al cerrar la pestaña
+COMPRESS_LEVEL = 1
+
+
+class ClosedTabHistory:
+
+    def __init__(self, max_entries=MAX_ENTRIES, memory_bytes=MEMORY_BYTES, disk_bytes=DISK_BYTES):
+        self.max_entries = max_entries
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+
+        # de la más vieja a la más nueva
+        self.entries = []
+        self.in_memory = 0
+        self.on_disk = 0
+        self.folder = None
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # encoding: con la que se guarda el archivo al reabrir la pestaña
+    def push(self, content, title, file_path, encoding="utf-8"):
+
+        data = zlib.compress(content.encode("utf-8", "surrogatepass"), COMPRESS_LEVEL)
+
+        self.entries.append({
+            "title": title,
+            "file_path": file_path,
+            "encoding": encoding,
+            "size": len(data),
+            "data": data,
+            "spill": None,
+        })
+        self.in_memory += len(data)
+
+        self.spill()
+        self.evict()
+
+    # la última cerrada, como la guardaba close_tab; None si no hay
+    def pop(self):
+
+        while self.entries:
+            entry = self.entries.pop()
+
+            try:
+                content = zlib.decompress(self.load(entry)).decode("utf-8", "surrogatepass")
+            except (OSError, zlib.error):
+                # se borró o se dañó en la carpeta temporal: probar con
+                # la anterior
+                continue
+
+            return {
+                "content": content,
+                "title": entry["title"],
+                "file_path": entry["file_path"],
+                "encoding": entry["encoding"],
+            }
+
+        return None
+
+    def load(self, entry):
+
+        if entry["spill"] is None:
+            self.in_memory -= entry["size"]
+            return entry["data"]
+
+        self.on_disk -= entry["size"]
+        try:
+            with open(entry["spill"], "rb") as f:
+                return f.read()
+        finally:
+            self.remove_file(entry)
+
+    # de la más vieja en memoria hacia adelante, hasta entrar en el límite
+    def spill(self):
+
+        for entry in self.entries:
+            if self.in_memory <= self.memory_bytes:
+                break
+
+            if entry["spill"] is not None:
+                continue
+
+            if self.folder is None:
+                self.folder = tempfile.mkdtemp(prefix="ide-closed-tabs-")
+
+            self.next_id += 1
+            path = os.path.join(self.folder, f"{self.next_id}.z")
+
+            try:
+                with open(path, "wb") as f:
+                    f.write(entry["data"])
+            except OSError:
+                # sin disco: se queda en memoria y evict() la olvida
+                # si hace falta
+                self.remove_file({"spill": path})
+                break
+
+            entry["spill"] = path
+            entry["data"] = None
+            self.in_memory -= entry["size"]
+            self.on_disk += entry["size"]
+
+    def evict(self):
+
+        while len(self.entries) > 1 and (
+            len(self.entries) > self.max_entries
+            or self.in_memory > self.memory_bytes
+            or self.on_disk > self.disk_bytes
+        ):
+            entry = self.entries.pop(0)
+
+            if entry["spill"] is None:
+                self.in_memory -= entry["size"]
+            else:
+                self.on_disk -= entry["size"]
+                self.remove_file(entry)
+
+    def remove_file(self, entry):
+        try:
+            os.unlink(entry["spill"])
+        except OSError:
+            pass
+
+    def clear(self):
+        self.entries.clear()
+        self.in_memory = 0
+        self.on_disk = 0
+
+        if self.folder is not None:
+            shutil.rmtree(self.folder, ignore_errors=True)
+            self.folder = None
@@ -0,0 +1,124 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from compiler.ast_nodes import dump
+from compiler.optimizer import DEFAULT_LEVEL, format_stats
+from compiler.pipeline import run_phase, use_disk_cache
+
+
+# =========================
+# SERVICIO DEL COMPILADOR
+# El paquete compiler se importa una sola vez y cada fase corre en un
+# hilo del QThreadPool sobre el texto del editor (sin guardar a disco
+# ni lanzar procesos). El resultado llega a la ventana por señal.
+# Los resultados también se guardan en la caché del usuario (ver
+# disk_cache.CACHE_DIR) para la próxima sesión.
+# =========================
+
+class PhaseSignals(QObject):
+    done = pyqtSignal(int, object)
+
+
+class PhaseTask(QRunnable):
+
+    def __init__(self, request_id, phase, code, signals, texts, level):
+        super().__init__()
+        self.request_id = request_id
+        self.phase = phase
+        self.code = code
+        self.signals = signals
+        self.texts = texts
+        self.level = level
+
+    # siempre emite: si algo falla, la ventana recibe el error en lugar
+    # de quedarse esperando el resultado
+    def run(self):
+        try:
+            result = run_phase(self.phase, self.code, self.level)
+
+            # el texto del último resultado de cada fase se reutiliza si
+            # el código no cambió
+            key, text = self.texts.get(self.phase, (None, None))
+            if key != result["key"]:
+                text = format_result(result)
+                self.texts[self.phase] = (result["key"], text)
+        except Exception as e:
+            message = f"Error interno: {type(e).__name__}: {e}"
+            result = {
+                "phase": self.phase,
+                "errors": [{"message": message, "line": None, "col": None}],
+                "elapsed": 0.0,
+            }
+            text = message
+
+        result["text"] = text
+        self.signals.done.emit(self.request_id, result)
+
+
+# texto para el dock, armado en el hilo de trabajo
+def format_result(result):
+
+    if result["phase"] == "lexer":
+        return "\n".join(
+            f"{t.line}:{t.col}\t{t.type}\t{t.lexeme}"
+            for t in result.get("tokens", ())
+        )
+
+    if result["phase"] == "parser":
+        if result["errors"]:
+            status = f"Análisis sintáctico con {len(result['errors'])} errores"
+        else:
+            status = "Análisis sintáctico correcto"
+        if "tree" not in result:
+            return status
+        return status + "\n\n" + dump(result["tree"])
+
+    if result["phase"] == "semantic":
+        if result["errors"]:
+            status = f"Análisis semántico con {len(result['errors'])} errores"
+        else:
+            status = "Análisis semántico correcto"
+        return f"{status}\n{len(result.get('symbols', ()))} símbolos declarados"
+
+    # las instrucciones las agrega la ventana por partes
+    if result["phase"] == "intermediate":
+        if result.get("code") is None:
+            return f"Código intermedio no generado: {len(result['errors'])} errores"
+        text = f"{len(result['code'])} instrucciones"
+        if result["passes"]:
+            text += "\n" + format_stats(result["passes"])
+        return text
+
+    if result["phase"] in ("execution", "native-execution"):
+        lines = [f"{name} = {value}" for name, value in result.get("values", ())]
+        if result["errors"]:
+            lines.append("Ejecución con errores")
+        return "\n".join(lines)
+
+    return ""
+
+
+class CompilerService(QObject):
+
+    # fase, resultado (dict con errors, elapsed, text, ...)
+    finished = pyqtSignal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool.globalInstance()
+        self.signals = PhaseSignals()
+        self.signals.done.connect(self.on_done)
+        self.last_request = {}
+        self.next_id = 0
+        self.texts = {}
+        use_disk_cache()
+
+    def run(self, phase, code, level=DEFAULT_LEVEL):
+        self.next_id += 1
+        self.last_request[phase] = self.next_id
+        self.pool.start(PhaseTask(
+            self.next_id, phase, code, self.signals, self.texts, level
+        ))
+
+    def on_done(self, request_id, result):
+        # descartar resultados de clics anteriores de la misma fase
+        if self.last_request.get(result["phase"]) == request_id:
+            self.finished.emit(result["phase"], result)
@@ -1,9 +1,36 @@
 from PyQt6.QtWidgets import QPlainTextEdit, QWidget, QTextEdit
-from PyQt6.QtGui import QColor, QTextFormat, QPainter, QFont
-from PyQt6.QtCore import Qt, QRect, QSize
-from ui.syntax_highlighter import SyntaxHighlighter
+from PyQt6.QtGui import QColor, QTextFormat, QPainter, QFont, QTextCursor, QStaticText
+from PyQt6.QtCore import Qt, QEvent, QPointF, QRect, QSize, QTimer, pyqtSignal
+from ui.syntax_highlighter import LazyHighlighter, SyntaxHighlighter
+from compiler.incremental import IncrementalLexer
+from compiler.profiler import span
 from PyQt6.QtGui import QAction, QKeySequence, QIcon
+from bisect import bisect_left
 import platform
+import re
+
+
+# a partir de este tamaño (caracteres) el editor pasa a modo de archivo
+# grande: resaltado perezoso (solo los bloques visibles y los cercanos,
+# en porciones entre eventos), sin ajuste de línea, números de línea
+# desde caché y la línea actual actualizada una vez por vuelta del
+# event loop
+LARGE_FILE_CHARS = 1 << 20
+
+# números de línea guardados como QStaticText
+LINE_NUMBER_CACHE = 4096
+
+# caracteres fuera del plano básico (emoji, etc.): ocupan dos unidades
+# UTF-16 en Qt y un solo carácter en Python
+ASTRAL = re.compile("[\U00010000-\U0010FFFF]")
+
+# mitad de un par que quedó sola (p. ej. un byte de surrogateescape)
+SURROGATE = re.compile("[\ud800-\udfff]")
+
+
+# posiciones UTF-16 de los caracteres de text fuera del plano básico
+def astral_offsets(text, base=0):
+    return [base + match.start() + i for i, match in enumerate(ASTRAL.finditer(text))]
 
 
 class LineNumberArea(QWidget):
@@ -21,8 +48,27 @@ class LineNumberArea(QWidget):
 
 class CodeEditor(QPlainTextEdit):
 
+    # cada edición del documento recortada al texto real, en unidades
+    # UTF-16 de Qt: posición, quitados, texto agregado
+    edited = pyqtSignal(int, int, str)
+
     def __init__(self):
         super().__init__()
+        self.lazy_highlighter = None
+        self.large_file = False
+        self.loading = False
+
+        # caché del margen de números (se vacía al cambiar la fuente)
+        self.gutter_width = None
+        self.line_height = None
+        self.line_numbers = {}
+
+        # línea actual: en modo grande se actualiza una vez por vuelta
+        self.current_line = None
+        self.current_line_timer = QTimer(self)
+        self.current_line_timer.setSingleShot(True)
+        self.current_line_timer.setInterval(0)
+        self.current_line_timer.timeout.connect(self.highlightCurrentLine)
 
         if platform.system() == "Darwin":
             self.setFont(QFont("Menlo", 11))
@@ -41,7 +87,7 @@ class CodeEditor(QPlainTextEdit):
 
         self.blockCountChanged.connect(self.updateLineNumberAreaWidth)
         self.updateRequest.connect(self.updateLineNumberArea)
-        self.cursorPositionChanged.connect(self.highlightCurrentLine)
+        self.cursorPositionChanged.connect(self.schedule_current_line)
 
         self.updateLineNumberAreaWidth(0)
         self.highlightCurrentLine()
@@ -49,13 +95,167 @@ class CodeEditor(QPlainTextEdit):
         # activar syntax highlighting
         self.highlighter = SyntaxHighlighter(self.document())
 
+        # tokens del documento: el lexer se arma la primera vez que se
+        # piden (tokens()) y desde ahí cada edición re-escanea solo lo
+        # editado; mientras nadie los pida, editar no tokeniza nada
+        self.lexer = None
+        self.document().contentsChange.connect(self.update_tokens)
+
+        # largo del texto en unidades UTF-16 y posiciones de los
+        # caracteres fuera del plano básico: pasan las posiciones de Qt
+        # a las del texto de Python que usa el lexer
+        self.text_length = 0
+        self.astral = []
+
+    def update_tokens(self, position, removed, added):
+        # durante la carga los tokens esperan al texto completo
+        if self.loading:
+            return
+
+        edit = self.document_edit(position, removed, added)
+        self.edited.emit(*edit)
+
+        # sin lexer todavía: tokens() lo arma
+        if self.lexer is None:
+            return
+
+        with span("editor.relex", "ide"):
+            self.relex(*edit)
+
+    # (posición, quitados, texto agregado) de un contentsChange
+    def document_edit(self, position, removed, added):
+        document = self.document()
+
+        # Qt cuenta el separador final del documento en algunos cambios
+        # (p. ej. setPlainText); se recorta al texto real
+        length = document.characterCount() - 1
+        removed = min(removed, self.text_length - position)
+        end = min(position + added, length)
+        self.text_length = length
+
+        cursor = QTextCursor(document)
+        cursor.setPosition(position)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+
+        return position, removed, cursor.selection().toPlainText()
+
+    def relex(self, position, removed, text):
+        astral = self.astral
+
+        # de unidades UTF-16 a caracteres
+        first = bisect_left(astral, position)
+        last = bisect_left(astral, position + removed)
+
+        # una edición que parte un par (solo desde código, con un
+        # QTextCursor): volver a tokenizar todo
+        if (first and astral[first - 1] == position - 1) or (last and astral[last - 1] == position + removed - 1):
+            self.reset_tokens()
+            return
+        inserted = astral_offsets(text, position)
+        delta = len(text) + len(inserted) - removed
+        astral[first:] = inserted + [offset + delta for offset in astral[last:]]
+
+        start = position - first
+        self.lexer.apply_edit(start, removed - (last - first), text)
+
+        # si algo no cuadra, volver a tokenizar todo el documento; junto a
+        # una mitad sola, Qt puede haber formado un par nuevo
+        lexer = self.lexer
+        end = start + len(text)
+        if (
+            lexer.length != self.text_length - len(astral)
+            or SURROGATE.search(lexer.text(max(start - 1, 0), start + 1))
+            or SURROGATE.search(lexer.text(max(end - 1, 0), end + 1))
+        ):
+            self.reset_tokens()
+
+    def reset_tokens(self):
+        text = self.toPlainText()
+        self.text_length = self.document().characterCount() - 1
+        self.astral = astral_offsets(text)
+        self.lexer = IncrementalLexer(text)
+
+    # un archivo grande cambia al resaltado perezoso antes de cargar el
+    # texto, así QSyntaxHighlighter no recorre todo el documento. Los
+    # tokens del texto anterior se descartan en lugar de re-escanear
+    # todo en el hilo de la interfaz (reabrir una pestaña, recuperar un
+    # diario): tokens() los vuelve a armar si hacen falta
+    def setPlainText(self, text):
+        if len(text) > LARGE_FILE_CHARS and not self.large_file:
+            self.set_large_file()
+
+        self.lexer = None
+        super().setPlainText(text)
+
+    def set_large_file(self):
+        self.large_file = True
+        self.highlighter.setDocument(None)
+        self.lazy_highlighter = LazyHighlighter(self)
+
+        # todas las líneas miden lo mismo: el margen ubica los números
+        # sin pedir la geometría de cada bloque
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+
+    # =========================
+    # CARGA POR BLOQUES (FileLoader)
+    # Mientras llega el texto el editor es de solo lectura y la carga
+    # no queda en el historial de deshacer ni en el diario.
+    # =========================
+    def begin_load(self, size):
+        if size > LARGE_FILE_CHARS and not self.large_file:
+            self.set_large_file()
+
+        self.loading = True
+        self.setReadOnly(True)
+        self.document().setUndoRedoEnabled(False)
+
+    def append_loaded_text(self, text):
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+
+    def end_load(self):
+        self.loading = False
+        self.setReadOnly(False)
+        self.document().setUndoRedoEnabled(True)
+        self.document().setModified(False)
+
+        # la línea actual no se marca en solo lectura
+        self.current_line = None
+        self.highlightCurrentLine()
+
+        # tokenizar un archivo de cientos de MB lleva segundos: se deja
+        # para la primera vez que se piden los tokens y la pestaña queda
+        # editable enseguida
+        self.lexer = None
+        self.text_length = self.document().characterCount() - 1
+
+    def tokens(self):
+        if self.lexer is None:
+            with span("editor.lex", "ide"):
+                self.reset_tokens()
+        return self.lexer.token_buffer()
+
     def lineNumberAreaWidth(self):
         digits = len(str(self.blockCount()))
         space = 3 + self.fontMetrics().horizontalAdvance('9') * digits
         return space
 
     def updateLineNumberAreaWidth(self, _):
-        self.setViewportMargins(self.lineNumberAreaWidth(), 0, 0, 0)
+        width = self.lineNumberAreaWidth()
+
+        # el ancho solo cambia con la cantidad de dígitos o la fuente
+        if width != self.gutter_width:
+            self.gutter_width = width
+            self.setViewportMargins(width, 0, 0, 0)
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+
+        if event.type() == QEvent.Type.FontChange:
+            self.line_height = None
+            self.line_numbers.clear()
+            self.updateLineNumberAreaWidth(0)
 
     def updateLineNumberArea(self, rect, dy):
         if dy:
@@ -69,6 +269,8 @@ class CodeEditor(QPlainTextEdit):
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
+        if self.lazy_highlighter is not None:
+            self.lazy_highlighter.schedule()
         cr = self.contentsRect()
         self.lineNumberArea.setGeometry(
             QRect(cr.left(), cr.top(),
@@ -76,6 +278,10 @@ class CodeEditor(QPlainTextEdit):
         )
 
     def lineNumberAreaPaintEvent(self, event):
+        if self.large_file:
+            self.paint_cached_line_numbers(event)
+            return
+
         painter = QPainter(self.lineNumberArea)
         painter.fillRect(event.rect(), QColor(30, 30, 30))
 
@@ -99,7 +305,70 @@ class CodeEditor(QPlainTextEdit):
                 int(self.blockBoundingRect(block).height())
             blockNumber += 1
 
+    # =========================
+    # MARGEN EN MODO DE ARCHIVO GRANDE
+    # Sin ajuste de línea cada bloque mide line_height: solo se pide la
+    # geometría del primer bloque visible y el resto se calcula. Cada
+    # número se arma una vez como QStaticText (el texto ya dispuesto)
+    # y se reutiliza en los siguientes repintados.
+    # =========================
+    def line_number_text(self, number):
+
+        text = self.line_numbers.get(number)
+
+        if text is None:
+            if len(self.line_numbers) >= LINE_NUMBER_CACHE:
+                self.line_numbers.clear()
+
+            text = QStaticText(str(number))
+            text.setTextFormat(Qt.TextFormat.PlainText)
+            text.prepare(font=self.font())
+            self.line_numbers[number] = text
+
+        return text
+
+    def paint_cached_line_numbers(self, event):
+        painter = QPainter(self.lineNumberArea)
+        rect = event.rect()
+        painter.fillRect(rect, QColor(30, 30, 30))
+        painter.setPen(Qt.GlobalColor.white)
+        painter.setFont(self.font())
+
+        if self.line_height is None:
+            self.line_height = self.fontMetrics().height()
+
+        height = self.line_height
+        width = self.lineNumberArea.width()
+        count = self.blockCount()
+
+        block = self.firstVisibleBlock()
+        top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
+
+        # primera línea dentro del rectángulo a repintar
+        skip = max(0, int((rect.top() - top) // height))
+        number = block.blockNumber() + skip
+        y = top + skip * height
+
+        while number < count and y <= rect.bottom():
+            text = self.line_number_text(number + 1)
+            painter.drawStaticText(QPointF(width - text.size().width(), y), text)
+            number += 1
+            y += height
+
+    def schedule_current_line(self):
+        if self.large_file:
+            self.current_line_timer.start()
+        else:
+            self.highlightCurrentLine()
+
     def highlightCurrentLine(self):
+        # en modo grande se omite si el cursor sigue en el mismo bloque
+        if self.large_file:
+            line = self.textCursor().blockNumber()
+            if line == self.current_line:
+                return
+            self.current_line = line
+
         extraSelections = []
 
         if not self.isReadOnly():
@@ -0,0 +1,225 @@
+import codecs
+import mmap
+import os
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from compiler.profiler import span
+
+
+# =========================
+# CARGA DE ARCHIVOS EN SEGUNDO PLANO
+# Un hilo del QThreadPool lee el archivo por bloques (con mmap si es
+# grande), detecta la codificación y manda el texto por señales; la
+# ventana lo agrega al documento bloque por bloque, así la interfaz
+# sigue respondiendo aunque el archivo tenga cientos de MB.
+#
+# El hilo no se adelanta más de MAX_PENDING bloques a la ventana y no
+# guarda los que ya mandó: además del documento, la carga solo ocupa
+# los bloques en cola. Los tokens del editor se calculan después, la
+# primera vez que se piden (ver CodeEditor.tokens).
+# =========================
+
+# a partir de este tamaño se lee con mmap
+MMAP_THRESHOLD = 1 << 20
+
+# bytes leídos por bloque
+CHUNK_BYTES = 1 << 18
+
+MAX_PENDING = 4
+
+# bytes del inicio del archivo con que se detecta la codificación
+SAMPLE_BYTES = 1 << 16
+
+# si el inicio no es UTF-8 válido (archivos guardados en Windows)
+FALLBACK_ENCODING = "cp1252"
+
+# los bytes que no se pueden decodificar (p. ej. 0x81 en cp1252, o un
+# byte inválido de UTF-8 después de la muestra) quedan en el texto como
+# sustitutos U+DC80..U+DCFF y al guardar vuelven a ser los mismos bytes
+DECODE_ERRORS = "surrogateescape"
+
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def detect_encoding(sample, complete):
+
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # un carácter partido al final de la muestra no cuenta
+        if complete or e.start < len(sample) - 3:
+            return FALLBACK_ENCODING
+
+    return "utf-8"
+
+
+# (texto, bytes leídos) por bloque, con los saltos de línea como "\n"
+# (igual que open() en modo texto); los bytes inválidos se conservan
+# (DECODE_ERRORS)
+def read_text_chunks(data, encoding, chunk_bytes=CHUNK_BYTES):
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors=DECODE_ERRORS)
+    carry = ""
+    size = len(data)
+
+    for offset in range(0, size, chunk_bytes):
+        end = min(offset + chunk_bytes, size)
+        text = carry + decoder.decode(data[offset:end], final=end == size)
+
+        # un "\r\n" partido entre dos bloques
+        carry = ""
+        if text.endswith("\r") and end < size:
+            carry, text = "\r", text[:-1]
+
+        yield text.replace("\r\n", "\n").replace("\r", "\n"), end
+
+    if size == 0:
+        yield "", 0
+
+
+class LoadSignals(QObject):
+    chunk = pyqtSignal(int, str)
+    progress = pyqtSignal(int, int, int)
+    done = pyqtSignal(int, str)
+    failed = pyqtSignal(int, str)
+
+
+class LoadTask(QRunnable):
+
+    def __init__(self, request_id, path, signals):
+        super().__init__()
+        self.request_id = request_id
+        self.path = path
+        self.signals = signals
+        self.cancelled = threading.Event()
+        self.pending = threading.Semaphore(MAX_PENDING)
+
+    def run(self):
+        # cualquier error (también MemoryError, o ValueError de mmap si
+        # el archivo se acortó mientras se leía) llega a la ventana: la
+        # pestaña no puede quedar en solo lectura esperando
+        try:
+            with span("file.read", "ide", path=self.path):
+                result = self.read()
+        except Exception as e:
+            self.signals.failed.emit(self.request_id, str(e) or type(e).__name__)
+            return
+
+        if result is not None:
+            self.signals.done.emit(self.request_id, result)
+
+    def read(self):
+
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return self.send(data, size)
+
+            return self.send(f.read(), size)
+
+    def send(self, data, size):
+
+        encoding = detect_encoding(data[:SAMPLE_BYTES], size <= SAMPLE_BYTES)
+
+        for text, done in read_text_chunks(data, encoding):
+
+            # esperar a que la ventana consuma bloques anteriores
+            while not self.pending.acquire(timeout=0.1):
+                if self.cancelled.is_set():
+                    return None
+
+            if self.cancelled.is_set():
+                return None
+
+            self.signals.chunk.emit(self.request_id, text)
+            self.signals.progress.emit(self.request_id, done, size)
+
+        return encoding
+
+
+class FileLoader(QObject):
+
+    # editor, bytes leídos, total
+    progress = pyqtSignal(object, int, int)
+    # editor, ruta, codificación
+    loaded = pyqtSignal(object, str, str)
+    # editor, ruta, mensaje
+    failed = pyqtSignal(object, str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool.globalInstance()
+        self.signals = LoadSignals()
+        self.signals.chunk.connect(self.on_chunk)
+        self.signals.progress.connect(self.on_progress)
+        self.signals.done.connect(self.on_done)
+        self.signals.failed.connect(self.on_failed)
+        self.jobs = {}
+        self.next_id = 0
+
+    def load(self, path, editor):
+        size = os.path.getsize(path)
+
+        self.next_id += 1
+        task = LoadTask(self.next_id, path, self.signals)
+        self.jobs[self.next_id] = (task, editor)
+
+        editor.begin_load(size)
+        self.pool.start(task)
+
+    def is_loading(self, editor):
+        return any(job_editor is editor for _, job_editor in self.jobs.values())
+
+    # los bloques que ya estaban en cola se descartan al llegar
+    def cancel(self, editor):
+        for request_id, (task, job_editor) in list(self.jobs.items()):
+            if job_editor is editor:
+                task.cancelled.set()
+                del self.jobs[request_id]
+
+    def cancel_all(self):
+        for task, _ in self.jobs.values():
+            task.cancelled.set()
+        editors = [editor for _, editor in self.jobs.values()]
+        self.jobs.clear()
+        return editors
+
+    def on_chunk(self, request_id, text):
+        job = self.jobs.get(request_id)
+        if job is None:
+            return
+
+        task, editor = job
+        with span("file.insert", "ide"):
+            editor.append_loaded_text(text)
+        task.pending.release()
+
+    def on_progress(self, request_id, done, total):
+        job = self.jobs.get(request_id)
+        if job is not None:
+            self.progress.emit(job[1], done, total)
+
+    def on_done(self, request_id, encoding):
+        job = self.jobs.pop(request_id, None)
+        if job is None:
+            return
+
+        task, editor = job
+        editor.end_load()
+        self.loaded.emit(editor, task.path, encoding)
+
+    def on_failed(self, request_id, message):
+        job = self.jobs.pop(request_id, None)
+        if job is not None:
+            self.failed.emit(job[1], job[0].path, message)
@@ -0,0 +1,361 @@
+import json
+import os
+import shutil
+import struct
+import tempfile
+import uuid
+import zlib
+
+from PyQt6.QtCore import QLockFile, QStandardPaths
+from ui.file_loader import DECODE_ERRORS
+
+
+# =========================
+# DIARIO DE EDICIONES
+# Cada pestaña abierta tiene un diario para recuperar lo no guardado si
+# el IDE se cierra de golpe. Cada ventana guarda los suyos en su propia
+# carpeta de journal_dir(), tomada con un QLockFile:
+#
+#   <clave>.snap  base: el archivo en disco (ruta, tamaño y fecha) o una
+#                 copia del texto
+#   <clave>.log   cambios desde la base, solo se agregan al final
+#
+# Cada cambio (posición, quitados, texto agregado) ocupa 16 bytes más
+# el texto en UTF-8 y lleva CRC32: un registro cortado por la caída se
+# descarta al recuperar. Las posiciones son las de Qt (unidades UTF-16),
+# por eso la recuperación aplica los cambios sobre el texto en UTF-16.
+#
+# Cuando el diario pasa de COMPACT_BYTES se compacta: el texto actual
+# pasa a ser la base y el diario empieza de cero. Base y diario llevan
+# un número de generación; un diario de otra generación (caída a mitad
+# de una compactación) se ignora.
+#
+# Al arrancar se recuperan las carpetas cuyo candado se puede tomar (la
+# ventana dueña ya no existe); las de otra ventana abierta no se tocan.
+# =========================
+
+
+# carpeta de datos del usuario (no la del proyecto abierto: el texto
+# sin guardar no va a parar a otro repositorio y se recupera aunque el
+# IDE se abra desde otra carpeta)
+def journal_dir():
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericDataLocation)
+    return os.path.join(base or os.path.expanduser("~"), "IDECompilador", "journal")
+
+
+COMPACT_BYTES = 1 << 20
+
+SNAPSHOT_MAGIC = b"IDESNAP1"
+LOG_MAGIC = b"IDELOG01"
+
+# generación
+LOG_HEADER = struct.Struct("<Q")
+LOG_START = len(LOG_MAGIC) + LOG_HEADER.size
+# largo de los metadatos, largo del texto, CRC32 del texto
+SNAPSHOT_HEADER = struct.Struct("<IQI")
+# posición, quitados, bytes agregados, CRC32
+RECORD = struct.Struct("<IIII")
+
+
+def write_atomic(path, data):
+
+    folder = os.path.dirname(path)
+    fd, temp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def record_crc(position, removed, data):
+    return zlib.crc32(data, zlib.crc32(struct.pack("<III", position, removed, len(data))))
+
+
+# tamaño y fecha del archivo en disco, para saber si sigue igual
+def file_stamp(path):
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return [info.st_size, info.st_mtime_ns]
+
+
+class EditJournal:
+
+    def __init__(self, root, key=None):
+        self.root = root
+        self.key = key or uuid.uuid4().hex
+        self.generation = 0
+        self.log = None
+        self.log_bytes = 0
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.root, f"{self.key}.snap")
+
+    @property
+    def log_path(self):
+        return os.path.join(self.root, f"{self.key}.log")
+
+    # =========================
+    # BASE
+    # meta: path, title, encoding. Sin text la base es el archivo de
+    # meta["path"] tal como está en disco. records: registros que ya
+    # van en el diario nuevo (ver rebase)
+    # =========================
+    def start(self, meta, text=None, records=b""):
+
+        self.close()
+        self.generation += 1
+
+        meta = dict(meta, generation=self.generation)
+
+        if text is None:
+            meta["stamp"] = file_stamp(meta["path"])
+            data = b""
+        else:
+            data = text.encode("utf-8", "surrogatepass")
+
+        header = json.dumps(meta).encode("utf-8")
+
+        os.makedirs(self.root, exist_ok=True)
+        write_atomic(self.snapshot_path, b"".join((
+            SNAPSHOT_MAGIC,
+            SNAPSHOT_HEADER.pack(len(header), len(data), zlib.crc32(data)),
+            header,
+            data,
+        )))
+
+        self.log = open(self.log_path, "wb")
+        self.log.write(LOG_MAGIC + LOG_HEADER.pack(self.generation) + records)
+        self.log.flush()
+        self.log_bytes = len(records)
+        self.meta = meta
+
+    # posición del diario en este momento (p. ej. al copiar el texto
+    # para guardarlo)
+    def mark(self):
+        return self.generation, self.log_bytes
+
+    # el archivo en disco ya tiene el texto del momento de mark(): pasa
+    # a ser la base y se conservan solo los cambios posteriores
+    def rebase(self, meta, mark):
+
+        generation, offset = mark
+
+        # después de mark() hubo otra base (compactación o guardado):
+        # la actual ya incluye esos cambios
+        if self.log is None or generation != self.generation:
+            return
+
+        with open(self.log_path, "rb") as f:
+            f.seek(LOG_START + offset)
+            records = f.read()
+
+        self.start(meta, records=records)
+
+    # =========================
+    # CAMBIOS
+    # Cada registro se pasa al sistema operativo con flush (sobrevive a
+    # una caída del IDE); el fsync queda para las compactaciones.
+    # Devuelve True cuando conviene compactar.
+    # =========================
+    def record(self, position, removed, text):
+
+        if self.log is None:
+            return False
+
+        data = text.encode("utf-8", "surrogatepass")
+        crc = record_crc(position, removed, data)
+
+        self.log.write(RECORD.pack(position, removed, len(data), crc) + data)
+        self.log.flush()
+        self.log_bytes += RECORD.size + len(data)
+
+        return self.log_bytes > COMPACT_BYTES
+
+    def compact(self, text):
+        meta = {key: self.meta.get(key) for key in ("path", "title", "encoding")}
+        self.start(meta, text)
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+    def discard(self):
+        self.close()
+        for path in (self.snapshot_path, self.log_path):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+# =========================
+# RECUPERACIÓN
+# =========================
+
+def read_snapshot(path):
+
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if not data.startswith(SNAPSHOT_MAGIC):
+        return None
+
+    offset = len(SNAPSHOT_MAGIC)
+    meta_size, text_size, crc = SNAPSHOT_HEADER.unpack_from(data, offset)
+    offset += SNAPSHOT_HEADER.size
+
+    meta = json.loads(data[offset:offset + meta_size])
+    offset += meta_size
+
+    text = data[offset:offset + text_size]
+    if len(text) != text_size or zlib.crc32(text) != crc:
+        return None
+
+    return meta, text.decode("utf-8", "surrogatepass")
+
+
+# texto base de un diario sobre un archivo en disco; None si el archivo
+# cambió desde que se abrió el diario
+def read_base_file(meta):
+
+    path = meta.get("path")
+    if not path or file_stamp(path) != meta.get("stamp"):
+        return None
+
+    with open(path, "r", encoding=meta.get("encoding") or "utf-8", errors=DECODE_ERRORS) as f:
+        return f.read()
+
+
+def replay(path, generation, text):
+
+    # posiciones de Qt: unidades UTF-16 (2 bytes cada una)
+    buffer = bytearray(text.encode("utf-16-le", "surrogatepass"))
+
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        data = b""
+
+    if not data.startswith(LOG_MAGIC) or len(data) < LOG_START:
+        return text
+    if LOG_HEADER.unpack_from(data, len(LOG_MAGIC))[0] != generation:
+        return text
+
+    offset = LOG_START
+    while offset + RECORD.size <= len(data):
+        position, removed, size, crc = RECORD.unpack_from(data, offset)
+        added = data[offset + RECORD.size:offset + RECORD.size + size]
+
+        # registro cortado o dañado: termina aquí
+        if len(added) != size or record_crc(position, removed, added) != crc:
+            break
+
+        begin = position * 2
+        buffer[begin:begin + removed * 2] = added.decode("utf-8", "surrogatepass").encode("utf-16-le", "surrogatepass")
+        offset += RECORD.size + size
+
+    return buffer.decode("utf-16-le", "surrogatepass")
+
+
+# (meta, texto) de cada diario de la carpeta con cambios sin guardar
+def recover(root):
+
+    recovered = []
+
+    try:
+        names = sorted(os.listdir(root))
+    except OSError:
+        return recovered
+
+    for name in names:
+        if not name.endswith(".snap"):
+            continue
+
+        journal = EditJournal(root, name[:-len(".snap")])
+
+        try:
+            snapshot = read_snapshot(journal.snapshot_path)
+            if snapshot is not None:
+                meta, text = snapshot
+                base = text if meta.get("stamp") is None else read_base_file(meta)
+
+                if base is not None:
+                    text = replay(journal.log_path, meta.get("generation"), base)
+
+                    # algo distinto de lo que hay en disco
+                    if text != base or (meta.get("stamp") is None and text):
+                        recovered.append((meta, text))
+        except (OSError, ValueError, struct.error):
+            pass
+
+    return recovered
+
+
+class JournalSession:
+
+    def __init__(self, root=None):
+        self.root = root or journal_dir()
+        self.key = uuid.uuid4().hex
+        self.folder = os.path.join(self.root, self.key)
+        # (carpeta, candado) leídos por recover() y todavía sin borrar
+        self.recovered = []
+
+        # el candado va antes que la carpeta: otra ventana que arranca
+        # al mismo tiempo no la toma por abandonada
+        os.makedirs(self.root, exist_ok=True)
+        self.lock = QLockFile(self.lock_path(self.key))
+        # solo se considera abandonado si su proceso ya no existe
+        self.lock.setStaleLockTime(0)
+        self.lock.tryLock(0)
+        os.makedirs(self.folder)
+
+    def lock_path(self, key):
+        return os.path.join(self.root, f"{key}.lock")
+
+    def journal(self):
+        return EditJournal(self.folder)
+
+    # diarios de ventanas que se cerraron sin terminar. Las carpetas
+    # leídas quedan tomadas y en disco hasta discard_recovered(), que se
+    # llama cuando el texto recuperado ya está en los diarios de esta
+    # sesión: una caída en el medio no pierde la única copia
+    def recover(self):
+
+        recovered = []
+
+        for name in sorted(os.listdir(self.root)):
+            folder = os.path.join(self.root, name)
+            if name == self.key or not os.path.isdir(folder):
+                continue
+
+            lock = QLockFile(self.lock_path(name))
+            lock.setStaleLockTime(0)
+            if not lock.tryLock(0):
+                continue
+
+            recovered.extend(recover(folder))
+            self.recovered.append((folder, lock))
+
+        return recovered
+
+    def discard_recovered(self):
+        for folder, lock in self.recovered:
+            shutil.rmtree(folder, ignore_errors=True)
+            lock.unlock()
+        self.recovered = []
+
+    # cierre normal: no queda nada que recuperar
+    def close(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+        self.lock.unlock()
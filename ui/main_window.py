@@ -2,6 +2,14 @@ from PyQt6.QtWidgets import *
 from PyQt6.QtCore import Qt, QSettings, QTimer, QDir
 from PyQt6.QtGui import QAction, QKeySequence, QIcon, QFileSystemModel
 from ui.editor import CodeEditor
+from ui.compiler_service import CompilerService
+from ui.symbol_table import SymbolTableModel
+from ui.profiler_panel import ProfilerPanel
+from ui.file_loader import FileLoader
+from ui.autosave import AutoSaver
+from ui.journal import JournalSession
+from ui.closed_tabs import ClosedTabHistory, DISK_BYTES, MAX_ENTRIES, MEMORY_BYTES
+from compiler.profiler import span
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import QProcess
 from PyQt6.QtWidgets import QFileDialog
@@ -9,6 +17,16 @@ from PyQt6.QtGui import QColor
 import locale
 import subprocess
 import os
+from functools import partial
+from itertools import islice
+
+# líneas que se agregan a un dock por vuelta del event loop
+STREAM_BATCH = 2000
+
+
+# un archivo se guarda con la codificación con que se abrió
+def file_encoding(editor):
+    return getattr(editor, "encoding", "utf-8")
 
 class MainWindow(QMainWindow):
 
@@ -19,7 +37,12 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("IDE Compilador")
         self.resize(1200, 800)
 
-        self.closed_tabs = []
+        # pestañas cerradas, comprimidas y con límites (ver ui/closed_tabs.py)
+        self.closed_tabs = ClosedTabHistory(
+            int(self.settings.value("closed_tabs/max_entries", MAX_ENTRIES)),
+            int(self.settings.value("closed_tabs/memory_bytes", MEMORY_BYTES)),
+            int(self.settings.value("closed_tabs/disk_bytes", DISK_BYTES)),
+        )
 
         self.tabs = QTabWidget()
         self.tabs.setTabsClosable(True)
@@ -33,15 +56,46 @@ class MainWindow(QMainWindow):
         self.init_terminal()
         self.create_file_explorer()
 
+        self.compiler = CompilerService(self)
+        self.compiler.finished.connect(self.show_phase_result)
+        self.streams = {}
+
+        # carga de archivos en segundo plano con barra de progreso
+        self.loader = FileLoader(self)
+        self.loader.progress.connect(self.show_load_progress)
+        self.loader.loaded.connect(self.file_loaded)
+        self.loader.failed.connect(self.file_load_failed)
+
+        self.load_progress = QProgressBar()
+        self.load_progress.setMaximumWidth(200)
+        self.load_progress.setRange(0, 1000)
+        self.load_cancel = QToolButton()
+        self.load_cancel.setText("Cancelar carga")
+        self.load_cancel.clicked.connect(self.cancel_loads)
+        self.statusBar().addPermanentWidget(self.load_progress)
+        self.statusBar().addPermanentWidget(self.load_cancel)
+        self.load_progress.hide()
+        self.load_cancel.hide()
+
+        # autoguardado de las pestañas modificadas (ver ui/autosave.py)
+        self.autosaver = AutoSaver(self.open_editors, self)
+        self.autosaver.copied.connect(self.auto_save_copied)
+        self.autosaver.saved.connect(self.auto_saved)
+        self.autosaver.failed.connect(self.auto_save_failed)
+
+        # diario de ediciones para recuperar lo no guardado tras una caída
+        try:
+            self.journals = JournalSession()
+        except OSError as e:
+            self.journals = None
+            self.err.append(f"Diario de ediciones: {e}")
+
         self.new_file()
+        self.recover_journals()
 
         saved_theme = self.settings.value("theme", "dark")
         self.set_theme(saved_theme)
 
-        self.autosave_timer = QTimer()
-        self.autosave_timer.timeout.connect(self.auto_save)
-        self.autosave_timer.start(5000)  # cada 5 segundos
-
         # Restaurar geometría de la ventana
         geometry = self.settings.value("geometry")
         if geometry:
@@ -74,38 +128,86 @@ class MainWindow(QMainWindow):
         index = self.tabs.addTab(editor, "Sin título")
         self.tabs.setCurrentIndex(index)
         editor.cursorPositionChanged.connect(self.update_cursor)
+        self.watch_editor(editor)
+        self.start_journal(editor, "")
 
     def open_file(self):
         file, _ = QFileDialog.getOpenFileName(self, "Abrir")
 
         if file:
-            with open(file, "r") as f:
-                content = f.read()
-
-            editor = CodeEditor()
-            editor.setPlainText(content)
-
             filename = os.path.basename(file)
             # si quieres forzar extensión .py por defecto:
             if not os.path.splitext(filename)[1]:
                 filename += ".py"
 
-            index = self.tabs.addTab(editor, filename)
-            self.tabs.setCurrentIndex(index)
+            index = self.load_file(file, filename)
 
             name, ext = os.path.splitext(filename)
             self.tabs.setTabText(index, name + ext)
             self.tabs.tabBar().setTabTextColor(index, QColor("red"))
 
-            editor.file_path = file
-            editor.cursorPositionChanged.connect(self.update_cursor)
+    # =========================
+    # CARGA EN SEGUNDO PLANO
+    # La pestaña aparece enseguida y el texto llega por partes desde
+    # FileLoader. file_path se asigna al terminar: hasta entonces ni
+    # guardar ni el autoguardado pueden escribir un archivo a medias.
+    # =========================
+
+    def load_file(self, path, title):
+        editor = CodeEditor()
+        index = self.tabs.addTab(editor, title)
+        self.tabs.setCurrentIndex(index)
+        editor.cursorPositionChanged.connect(self.update_cursor)
+        self.watch_editor(editor)
+
+        try:
+            self.loader.load(path, editor)
+        except OSError as e:
+            self.file_load_failed(editor, path, str(e))
+            return self.tabs.indexOf(editor)
+
+        self.load_progress.setValue(0)
+        self.load_progress.show()
+        self.load_cancel.show()
+        return index
+
+    def show_load_progress(self, editor, done, total):
+        self.load_progress.setValue(int(done * 1000 / total) if total else 1000)
+
+    def file_loaded(self, editor, path, encoding):
+        editor.file_path = path
+        editor.encoding = encoding
+        self.start_journal(editor)
+        self.hide_load_progress()
+
+    def file_load_failed(self, editor, path, message):
+        self.remove_editor(editor)
+        self.hide_load_progress()
+        QMessageBox.warning(self, "Abrir", f"No se pudo abrir {path}:\n{message}")
+
+    def cancel_loads(self):
+        for editor in self.loader.cancel_all():
+            self.remove_editor(editor)
+        self.hide_load_progress()
+
+    def hide_load_progress(self):
+        if not self.loader.jobs:
+            self.load_progress.hide()
+            self.load_cancel.hide()
+
+    def remove_editor(self, editor):
+        index = self.tabs.indexOf(editor)
+        if index != -1:
+            self.tabs.removeTab(index)
+        editor.deleteLater()
 
     def save_file(self):
         editor = self.current_editor()
 
         if hasattr(editor, "file_path"):
-            with open(editor.file_path, "w") as f:
-                f.write(editor.toPlainText())
+            if self.write_file(editor, editor.file_path):
+                editor.document().setModified(False)
+                self.start_journal(editor)
         else:
             self.save_as_file()
 
@@ -118,65 +220,212 @@ class MainWindow(QMainWindow):
             if not os.path.splitext(file)[1]:
                 file += ".py"
 
-            with open(file, "w") as f:
-                f.write(editor.toPlainText())
+            if not self.write_file(editor, file):
+                return
 
+            editor.document().setModified(False)
             editor.file_path = file
             filename = os.path.basename(file)
             self.tabs.setTabText(self.tabs.currentIndex(), filename)
+            self.start_journal(editor)
     
+    # por la cola del autoguardado, en orden con sus escrituras; el
+    # archivo anterior queda intacto si algo falla (ver atomic_write)
+    def write_file(self, editor, path):
+        encoding = file_encoding(editor)
+
+        try:
+            self.autosaver.write(path, editor.toPlainText(), encoding)
+        except UnicodeEncodeError:
+            QMessageBox.warning(
+                self, "Guardar",
+                f"No se pudo guardar {path}: el texto tiene caracteres que {encoding} no puede representar.",
+            )
+            return False
+        except OSError as e:
+            QMessageBox.warning(self, "Guardar", f"No se pudo guardar {path}:\n{e}")
+            return False
+
+        return True
+
     def close_tab(self, index):
         editor = self.tabs.widget(index)
 
-        if editor:
-            self.closed_tabs.append({
-                "content": editor.toPlainText(),
-                "title": self.tabs.tabText(index),
-                "file_path": getattr(editor, "file_path", None)
-            })
+        if not editor:
+            self.tabs.removeTab(index)
+            return
+
+        # una pestaña a medio cargar no va al historial
+        if self.loader.is_loading(editor):
+            self.loader.cancel(editor)
+            self.remove_editor(editor)
+            self.hide_load_progress()
+            return
+
+        self.discard_journal(editor)
+        self.closed_tabs.push(
+            editor.toPlainText(),
+            self.tabs.tabText(index),
+            getattr(editor, "file_path", None),
+            file_encoding(editor),
+        )
 
-        self.tabs.removeTab(index)
+        # removeTab no borra el editor: sin deleteLater su documento
+        # seguiría en memoria además de la copia del historial
+        self.remove_editor(editor)
 
+    # mismo camino que la × de la pestaña: historial y deleteLater
     def close_file(self):
         index = self.tabs.currentIndex()
         if index != -1:
-            self.tabs.removeTab(index)
+            self.close_tab(index)
 
     def reopen_last_tab(self):
-        if not self.closed_tabs:
-            return
-
         data = self.closed_tabs.pop()
+        if data is None:
+            return
 
         editor = CodeEditor()
         editor.setPlainText(data["content"])
 
         if data["file_path"]:
             editor.file_path = data["file_path"]
+            editor.encoding = data["encoding"]
 
         index = self.tabs.addTab(editor, data["title"])
         self.tabs.setCurrentIndex(index)
 
         editor.cursorPositionChanged.connect(self.update_cursor)
+        self.watch_editor(editor)
+        self.start_journal(editor, data["content"])
 
     # =========================
     # AUTOGUARDADO
     # =========================
 
-    def auto_save(self):
+    def open_editors(self):
+        editors = (self.tabs.widget(i) for i in range(self.tabs.count()))
+        return [editor for editor in editors if isinstance(editor, CodeEditor)]
 
-        editor = self.current_editor()
+    def watch_editor(self, editor):
+        self.autosaver.watch(editor)
 
-        if editor and hasattr(editor, "file_path"):
+    # posición del diario para cada revisión que se está escribiendo
+    def auto_save_copied(self, editor, revision):
+        journal = getattr(editor, "journal", None)
+        if journal is not None:
+            editor.journal_marks = getattr(editor, "journal_marks", {})
+            editor.journal_marks[revision] = journal.mark()
 
+    # el archivo en disco tiene ahora el texto de esa revisión: es la
+    # nueva base del diario, con los cambios hechos mientras se escribía
+    def auto_saved(self, editor, revision):
+        marks = getattr(editor, "journal_marks", {})
+        mark = marks.pop(revision, None)
+
+        # copias más viejas que el escritor reemplazó sin escribirlas
+        for older in [r for r in marks if r < revision]:
+            del marks[older]
+
+        if mark is not None:
             try:
-                with open(editor.file_path, "w") as f:
-                    f.write(editor.toPlainText())
+                editor.journal.rebase(self.journal_meta(editor), mark)
+            except OSError as e:
+                self.journal_failed(editor.journal, e)
 
-                self.statusBar().showMessage("Autoguardado ✔", 2000)
+        self.statusBar().showMessage("Autoguardado ✔", 2000)
 
-            except:
-                pass
+    def auto_save_failed(self, editor, path, message):
+        self.statusBar().showMessage(f"No se pudo autoguardar {os.path.basename(path)}: {message}", 10000)
+        self.err.append(f"Autoguardado: {path}: {message}")
+
+    # =========================
+    # DIARIO DE EDICIONES (ver ui/journal.py)
+    # Base: el archivo en disco si la pestaña está guardada, o una copia
+    # del texto (text) si no tiene archivo o tiene cambios sin guardar.
+    # =========================
+
+    def start_journal(self, editor, text=None):
+        if self.journals is None:
+            return
+
+        journal = getattr(editor, "journal", None)
+        if journal is None:
+            journal = editor.journal = self.journals.journal()
+            editor.edited.connect(partial(self.record_edit, editor))
+
+        try:
+            journal.start(self.journal_meta(editor), text)
+        except OSError as e:
+            self.journal_failed(journal, e)
+            return False
+
+        return True
+
+    def journal_meta(self, editor):
+        return {
+            "path": getattr(editor, "file_path", None),
+            "title": self.tabs.tabText(self.tabs.indexOf(editor)),
+            "encoding": file_encoding(editor),
+        }
+
+    def record_edit(self, editor, position, removed, text):
+        journal = editor.journal
+
+        try:
+            if journal.record(position, removed, text):
+                with span("journal.compact", "ide"):
+                    journal.compact(editor.toPlainText())
+        except OSError as e:
+            self.journal_failed(journal, e)
+
+    # sin espacio o sin permisos: la pestaña sigue sin diario (y no se
+    # deja uno a medias que se recupere después)
+    def journal_failed(self, journal, error):
+        journal.discard()
+        self.err.append(f"Diario de ediciones: {error}")
+
+    def discard_journal(self, editor):
+        journal = getattr(editor, "journal", None)
+        if journal is not None:
+            journal.discard()
+
+    # pestañas con cambios sin guardar de una sesión que terminó mal
+    def recover_journals(self):
+        if self.journals is None:
+            return
+
+        try:
+            recovered = self.journals.recover()
+        except OSError as e:
+            self.err.append(f"Diario de ediciones: {e}")
+            return
+
+        journaled = True
+
+        for meta, text in recovered:
+            editor = CodeEditor()
+            editor.setPlainText(text)
+
+            if meta.get("path"):
+                editor.file_path = meta["path"]
+                editor.encoding = meta.get("encoding") or "utf-8"
+
+            index = self.tabs.addTab(editor, meta.get("title") or "Sin título")
+            self.tabs.setCurrentIndex(index)
+            editor.document().setModified(True)
+
+            editor.cursorPositionChanged.connect(self.update_cursor)
+            self.watch_editor(editor)
+            journaled = self.start_journal(editor, text) and journaled
+
+        # los diarios viejos se borran solo si todo quedó en los nuevos;
+        # si no, se vuelven a recuperar en la próxima sesión
+        if journaled:
+            self.journals.discard_recovered()
+
+        if recovered:
+            self.statusBar().showMessage(f"Recuperadas {len(recovered)} pestañas con cambios sin guardar", 10000)
 
     # =========================
     # EDITAR FUNCIONES
@@ -477,7 +726,11 @@ class MainWindow(QMainWindow):
         self.syn = QTextEdit(); self.syn.setReadOnly(True)
         self.sem = QTextEdit(); self.sem.setReadOnly(True)
         self.inter = QTextEdit(); self.inter.setReadOnly(True)
-        self.sym = QTextEdit(); self.sym.setReadOnly(True)
+        self.sym_model = SymbolTableModel(self)
+        self.sym = QTableView(); self.sym.setModel(self.sym_model)
+        self.sym.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        # filas de alto fijo: la vista no mide cada fila del modelo
+        self.sym.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.err = QTextEdit(); self.err.setReadOnly(True)
         self.console = QPlainTextEdit()
         self.console.setStyleSheet("background:black; color:#00ff00;")
@@ -492,6 +745,17 @@ class MainWindow(QMainWindow):
         self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.createDock("Errores", self.err, "dock_err"))
         self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.createDock("Consola", self.console, "dock_console"))
 
+        # perfilador: resumen por tramo y exportación de la traza
+        self.profiler = ProfilerPanel()
+        self.profile_status = QLabel()
+        self.statusBar().addPermanentWidget(self.profile_status)
+        self.profiler.summary_changed.connect(self.profile_status.setText)
+        self.profiler.enabled.setChecked(self.settings.value("profiling", False, type=bool))
+        self.profiler.enabled.toggled.connect(
+            lambda enabled: self.settings.setValue("profiling", enabled)
+        )
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.createDock("Perfilador", self.profiler, "dock_profiler"))
+
         # Restaurar geometría y estado si existía
         if self.settings.contains("geometry"):
             self.restoreGeometry(self.settings.value("geometry"))
@@ -542,10 +806,35 @@ class MainWindow(QMainWindow):
         self.toolbar.addAction(self.int_btn)
         self.toolbar.addAction(self.exe_btn)
 
+        # nivel de optimización para Intermedio y Ejecutar
+        self.opt_level = QComboBox()
+        self.opt_level.addItems(["-O0", "-O1", "-O2"])
+        self.opt_level.setCurrentIndex(int(self.settings.value("opt_level", 1)))
+        self.opt_level.currentIndexChanged.connect(
+            lambda level: self.settings.setValue("opt_level", level)
+        )
+        self.toolbar.addSeparator()
+        self.toolbar.addWidget(self.opt_level)
+
+        # Ejecutar con la máquina virtual o como bytecode de CPython
+        self.backend = QComboBox()
+        self.backend.addItems(["VM", "CPython"])
+        self.backend.setCurrentIndex(int(self.settings.value("backend", 0)))
+        self.backend.currentIndexChanged.connect(
+            lambda index: self.settings.setValue("backend", index)
+        )
+        self.toolbar.addWidget(self.backend)
+
     # =========================
     # SOBRESCRIBIR CLOSEEVENT PARA GUARDAR ESTADO
     # =========================
     def closeEvent(self, event):
+        # escribir lo que falte antes de salir
+        self.autosaver.close()
+        if self.journals is not None:
+            self.journals.close()
+        self.closed_tabs.clear()
+
         # Guardar geometría y estado de docks/toolbar
         self.settings.setValue("geometry", self.saveGeometry())
         self.settings.setValue("windowState", self.saveState())
@@ -608,13 +897,76 @@ class MainWindow(QMainWindow):
 
         self.process.start()
 
-    def run_lexer(self):
-        self.run_process("lexer.py", self.lex)
+    # fases que corren dentro del IDE con CompilerService
+    def run_phase(self, phase):
+        editor = self.current_editor()
+
+        if not editor:
+            return
+
+        self.compiler.run(
+            phase, editor.toPlainText(), self.opt_level.currentIndex()
+        )
+
+    def show_phase_result(self, phase, result):
+        with span("ui.result", "ide", phase=phase):
+            self.display_result(phase, result)
+
+    def display_result(self, phase, result):
+        output = {
+            "lexer": self.lex, "parser": self.syn,
+            "semantic": self.sem, "intermediate": self.inter,
+            "execution": self.console, "native-execution": self.console,
+        }[phase]
+        output.setPlainText(result["text"])
+        self.streams.pop(output, None)
 
-    def run_parser(self): self.run_process("parser.py", self.syn)
-    def run_semantic(self): self.run_process("semantic.py", self.sem)
-    def run_intermediate(self): self.run_process("intermediate.py", self.inter)
-    def run_execution(self): self.run_process("executor.py", self.console)
+        if phase == "semantic":
+            self.sym_model.set_symbols(result.get("symbols", []))
+
+        if phase == "intermediate" and result.get("code") is not None:
+            self.stream_output(output, result["code"].lines())
+
+        self.err.setPlainText("\n".join(
+            e["message"] for e in result["errors"]
+        ))
+
+        ms = result["elapsed"] * 1000
+        self.statusBar().showMessage(f"{phase}: {ms:.1f} ms", 3000)
+
+    # salida larga por partes: STREAM_BATCH líneas por vuelta del event
+    # loop, así la ventana sigue respondiendo mientras se llena el dock
+    def stream_output(self, output, lines):
+        self.streams[output] = lines
+        QTimer.singleShot(0, lambda: self.stream_batch(output, lines))
+
+    def stream_batch(self, output, lines):
+
+        # un resultado más nuevo reemplazó a este
+        if self.streams.get(output) is not lines:
+            return
+
+        batch = list(islice(lines, STREAM_BATCH))
+
+        if not batch:
+            del self.streams[output]
+            return
+
+        cursor = output.textCursor()
+        cursor.movePosition(cursor.MoveOperation.End)
+        cursor.insertText("\n" + "\n".join(batch))
+
+        QTimer.singleShot(0, lambda: self.stream_batch(output, lines))
+
+    def run_lexer(self): self.run_phase("lexer")
+    def run_parser(self): self.run_phase("parser")
+    def run_semantic(self): self.run_phase("semantic")
+    def run_intermediate(self): self.run_phase("intermediate")
+    def run_execution(self):
+        if self.backend.currentText() == "CPython":
+            self.run_phase("native-execution")
+        else:
+            self.run_phase("execution")
 
     # =========================
     # TEMAS
@@ -748,19 +1100,7 @@ class MainWindow(QMainWindow):
 
         if os.path.isfile(file_path):
 
-            with open(file_path, "r") as f:
-                content = f.read()
-
-            editor = CodeEditor()
-            editor.setPlainText(content)
-            editor.file_path = file_path
-
-            filename = os.path.basename(file_path)
-
-            i = self.tabs.addTab(editor, filename)
-            self.tabs.setCurrentIndex(i)
-
-            editor.cursorPositionChanged.connect(self.update_cursor)
+            self.load_file(file_path, os.path.basename(file_path))
    
     def init_terminal(self):
         self.process = QProcess(self)
@@ -827,5 +1167,8 @@ class MainWindow(QMainWindow):
             self.err.appendPlainText(err)
 
     def run_execution(self):
-        self.run_process("executor.py", self.console)
+        if self.backend.currentText() == "CPython":
+            self.run_phase("native-execution")
+        else:
+            self.run_phase("execution")
  
\ No newline at end of file
@@ -0,0 +1,151 @@
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer, pyqtSignal
+from PyQt6.QtWidgets import (
+    QAbstractItemView, QCheckBox, QFileDialog, QHBoxLayout, QMessageBox, QPushButton,
+    QTableView, QVBoxLayout, QWidget,
+)
+from compiler.profiler import PROFILER
+
+
+# =========================
+# DOCK DEL PERFILADOR
+# Tabla con el resumen de PROFILER (un renglón por tramo) que se
+# refresca mientras el perfilador está activo, y exportación de la
+# traza en formato de Chrome.
+# =========================
+
+# milisegundos entre refrescos de la tabla
+REFRESH_INTERVAL = 1000
+
+
+class ProfilerModel(QAbstractTableModel):
+
+    COLUMNS = ("Tramo", "Llamadas", "Total ms", "Media ms", "Máx ms", "Bloques netos")
+    FIELDS = ("name", "calls", "total", "mean", "max", "net_blocks")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+
+        if not index.isValid():
+            return None
+
+        if role == Qt.ItemDataRole.TextAlignmentRole and index.column() > 0:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        field = self.FIELDS[index.column()]
+        value = self.rows[index.row()][field]
+
+        if field in ("total", "mean", "max"):
+            return f"{value * 1000:.2f}"
+
+        return str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        if orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+
+        return str(section + 1)
+
+
+class ProfilerPanel(QWidget):
+
+    # texto corto para la barra de estado
+    summary_changed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.model = ProfilerModel(self)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+
+        self.enabled = QCheckBox("Activar")
+        self.enabled.toggled.connect(self.set_enabled)
+
+        clear = QPushButton("Limpiar")
+        clear.clicked.connect(self.clear)
+
+        export = QPushButton("Exportar traza")
+        export.clicked.connect(self.export_trace)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.enabled)
+        buttons.addStretch()
+        buttons.addWidget(clear)
+        buttons.addWidget(export)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        layout.addLayout(buttons)
+        layout.addWidget(self.table)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_INTERVAL)
+        self.timer.timeout.connect(self.refresh)
+
+    def set_enabled(self, enabled):
+
+        PROFILER.enable(enabled)
+
+        if enabled:
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+        self.refresh()
+
+    def clear(self):
+        PROFILER.clear()
+        self.refresh()
+
+    def refresh(self):
+
+        rows = PROFILER.summary()
+        self.model.set_rows(rows)
+
+        if not PROFILER.enabled:
+            self.summary_changed.emit("")
+            return
+
+        calls = sum(row["calls"] for row in rows)
+        text = f"Perfil: {calls} tramos"
+        if rows:
+            text += f", {rows[0]['name']} {rows[0]['total'] * 1000:.1f} ms"
+        self.summary_changed.emit(text)
+
+    def export_trace(self):
+
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Exportar traza", "traza.json",
+            filter="Chrome Trace (*.json);;All Files (*)",
+        )
+
+        if not path:
+            return
+
+        try:
+            PROFILER.export(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Exportar traza", f"No se pudo guardar: {e}")
@@ -0,0 +1,47 @@
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+# =========================
+# MODELO DE LA TABLA DE SÍMBOLOS
+# La vista solo pide las filas visibles, así un programa con un millón
+# de símbolos se muestra sin crear un widget ni un texto por fila.
+# =========================
+
+class SymbolTableModel(QAbstractTableModel):
+
+    COLUMNS = ("Nombre", "Tipo", "Ámbito", "Línea", "Columna")
+    FIELDS = ("name", "type", "scope", "line", "col")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.symbols = []
+
+    def set_symbols(self, symbols):
+        self.beginResetModel()
+        self.symbols = symbols
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.symbols)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+
+        symbol = self.symbols[index.row()]
+        value = getattr(symbol, self.FIELDS[index.column()])
+        return "" if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        if orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+
+        return str(section + 1)
@@ -1,52 +1,185 @@
-from PyQt6.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QFont
-import re
+import time
 
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtGui import QSyntaxHighlighter, QTextCharFormat, QTextLayout, QColor, QFont
+
+from compiler.lexer import GROUP_NAMES, MASTER_PATTERN
+from compiler.profiler import span
+
+
+# =========================
+# RESALTADO DE SINTAXIS
+# Cada bloque se recorre una sola vez con el mismo patrón maestro del
+# lexer (construido desde TOKEN_TYPES): el editor y el compilador ven
+# las mismas palabras reservadas, números y caracteres desconocidos.
+#
+# Ningún token del lenguaje ocupa más de una línea, así que el estado
+# de todos los bloques es el mismo (NORMAL): al editar una línea Qt no
+# vuelve a resaltar las siguientes.
+# =========================
+
+NORMAL = 0
 
-class SyntaxHighlighter(QSyntaxHighlighter):
 
-    def __init__(self, document):
-        super().__init__(document)
+def char_format(color=None, bold=False, underline=None):
 
-        self.rules = []
+    fmt = QTextCharFormat()
 
-        # ===== KEYWORDS =====
-        keyword_format = QTextCharFormat()
-        keyword_format.setForeground(QColor("#569CD6"))
-        keyword_format.setFontWeight(QFont.Weight.Bold)
+    if color:
+        fmt.setForeground(QColor(color))
+    if bold:
+        fmt.setFontWeight(QFont.Weight.Bold)
+    if underline:
+        fmt.setUnderlineStyle(QTextCharFormat.UnderlineStyle.WaveUnderline)
+        fmt.setUnderlineColor(QColor(underline))
 
-        keywords = [
-            "if", "else", "while", "for",
-            "return", "int", "float",
-            "string", "print"
-        ]
+    return fmt
 
-        for word in keywords:
-            pattern = rf"\b{word}\b"
-            self.rules.append((re.compile(pattern), keyword_format))
 
-        # ===== NUMBERS =====
-        number_format = QTextCharFormat()
-        number_format.setForeground(QColor("#008f39"))
+# tipo de token -> formato; los que no están se dejan sin formato
+TOKEN_FORMATS = {
+    "KEYWORD": char_format("#569CD6", bold=True),
+    "NUMBER": char_format("#008f39"),
+    "RELOP": char_format("#D4D4D4"),
+    "ASSIGN": char_format("#D4D4D4"),
+    "OPERATOR": char_format("#D4D4D4"),
+    "MISMATCH": char_format("#F44747", underline="#F44747"),
+}
 
-        self.rules.append((re.compile(r"\b\d+\b"), number_format))
+# número de grupo del patrón maestro -> formato (None sin formato)
+GROUP_FORMATS = [None] * (max(GROUP_NAMES) + 1)
+for group, name in GROUP_NAMES.items():
+    GROUP_FORMATS[group] = TOKEN_FORMATS.get(name)
 
-        # ===== STRINGS =====
-        string_format = QTextCharFormat()
-        string_format.setForeground(QColor("#CE9178"))
 
-        self.rules.append((re.compile(r'"[^"]*"'), string_format))
+# (inicio, largo, formato) de cada token con formato de una línea
+def token_formats(text):
 
-        # ===== COMMENTS =====
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor("#6A9955"))
-        comment_format.setFontItalic(True)
+    formats = GROUP_FORMATS
 
-        self.rules.append((re.compile(r"//.*"), comment_format))
+    for match in MASTER_PATTERN.finditer(text):
+        group = match.lastindex
+        fmt = formats[group]
+        if fmt is not None:
+            start, end = match.span(group)
+            yield start, end - start, fmt
 
-    # ------------------------
+
+class SyntaxHighlighter(QSyntaxHighlighter):
 
     def highlightBlock(self, text):
-        for pattern, fmt in self.rules:
-            for match in pattern.finditer(text):
-                start, end = match.span()
-                self.setFormat(start, end - start, fmt)
\ No newline at end of file
+        with span("highlight", "ide"):
+            set_format = self.setFormat
+
+            for start, length, fmt in token_formats(text):
+                set_format(start, length, fmt)
+
+            self.setCurrentBlockState(NORMAL)
+
+
+# =========================
+# RESALTADO PEREZOSO (archivos grandes)
+# QSyntaxHighlighter resalta todo el documento de una vez al cargarlo.
+# Aquí los formatos se ponen directo en el QTextLayout de cada bloque
+# (lo mismo que hace QSyntaxHighlighter por dentro), pero solo de los
+# bloques visibles y PREFETCH bloques alrededor.
+#
+# El trabajo corre en porciones de a lo más SLICE segundos desde un
+# QTimer, entre eventos de la ventana. En cada porción la lista de
+# bloques se vuelve a calcular desde la vista actual: lo que salió de
+# la pantalla simplemente deja de estar en la lista.
+#
+# userState del bloque: DIRTY (el valor inicial de Qt) si falta
+# resaltarlo, CLEAN si sus formatos están al día.
+# =========================
+
+DIRTY = -1
+CLEAN = 1
+
+SLICE = 0.008
+PREFETCH = 200
+
+
+class LazyHighlighter(QObject):
+
+    def __init__(self, editor):
+        super().__init__(editor)
+        self.editor = editor
+        self.document = editor.document()
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.run)
+
+        self.document.contentsChange.connect(self.invalidate)
+        editor.verticalScrollBar().valueChanged.connect(self.schedule)
+
+    def schedule(self, *_):
+        if not self.timer.isActive():
+            self.timer.start()
+
+    # los bloques tocados por una edición se vuelven a resaltar
+    def invalidate(self, position, removed, added):
+
+        # texto nuevo completo (setPlainText): los bloques recién
+        # creados ya valen DIRTY
+        if added < self.document.characterCount() - 1:
+            block = self.document.findBlock(position)
+            last = self.document.findBlock(position + added)
+
+            while block.isValid():
+                block.setUserState(DIRTY)
+                if block == last:
+                    break
+                block = block.next()
+
+        self.schedule()
+
+    # rangos (primer bloque, cantidad) en orden de prioridad
+    def ranges(self):
+
+        editor = self.editor
+        first = editor.firstVisibleBlock().blockNumber()
+        rows = editor.viewport().height() // max(editor.fontMetrics().height(), 1) + 1
+
+        return (
+            (first, rows),
+            (first + rows, PREFETCH),
+            (max(first - PREFETCH, 0), min(PREFETCH, first)),
+        )
+
+    def run(self):
+        with span("highlight.slice", "ide"):
+            deadline = time.perf_counter() + SLICE
+
+            for start, count in self.ranges():
+                block = self.document.findBlockByNumber(start)
+
+                for _ in range(count):
+                    if not block.isValid():
+                        break
+
+                    if block.userState() == DIRTY:
+                        self.highlight(block)
+
+                        # se acabó el tiempo: seguir en la próxima vuelta
+                        if time.perf_counter() > deadline:
+                            self.timer.start()
+                            return
+
+                    block = block.next()
+
+    def highlight(self, block):
+
+        ranges = []
+        for start, length, fmt in token_formats(block.text()):
+            format_range = QTextLayout.FormatRange()
+            format_range.start = start
+            format_range.length = length
+            format_range.format = fmt
+            ranges.append(format_range)
+
+        block.layout().setFormats(ranges)
+        block.setUserState(CLEAN)
+        self.document.markContentsDirty(block.position(), block.length())